@@ -0,0 +1,239 @@
+# api.py — ISI PERUT
+# Layanan HTTP JSON tanpa Streamlit untuk SIMRS / sistem lain: skoring dan
+# surat PDF lewat endpoint stateless (tanpa sesi, tanpa websocket), jadi
+# bisa diperbanyak di belakang load balancer sesuka hati.
+#
+#   python api.py --port 8080 --workers 4
+#
+# Endpoint:
+#   POST /score            satu respons -> satu hasil JSON
+#   POST /score/batch      {"responses": [...]} -> {"results": [...]}, tiap
+#                          hasil berkolom sama dengan /score
+#                          (skoring vektor cohort.py, hingga MAX_BATCH baris)
+#   POST /pdf/letterhead   satu respons -> surat hasil skrining (PDF)
+#   POST /pdf/apcs         satu respons -> surat APCS (PDF)
+#   GET  /healthz          200 selama proses hidup
+#   GET  /metrics          format teks Prometheus (metrics.py, per worker)
+#   GET  /metrics.json
+#
+# Respons memakai kolom yang sama dengan masukan batch.py (age, sex,
+# gerdq1..gerdq6, egd_alarm_0.., family_history, smoker, [name, today]),
+# atau cukup {"kode": "4000-0002-T1V"} (response_code.py) + nama. Kolom
+# tidak dikenal, nilai objek/daftar, atau age/sex yang kosong dijawab 400.
+#
+# Model proses: pra-fork. Proses induk membuka soket, memuat ReportLab + kop
+# surat sekali (diwarisi semua worker lewat fork), lalu menjalankan
+# --workers proses yang melayani soket yang sama; worker yang mati diganti.
+# Tiap worker melayani koneksi keep-alive di thread masing-masing.
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pdf_queue
+from batch import (
+    LOGOS,
+    check_fields,
+    default_workers,
+    parse_row,
+    pdf_kwargs,
+    result_record,
+    result_records,
+)
+from cohort import arrays_from_inputs, score_cohort
+from metrics import get_registry, timed
+from pdf_cache import cached_pdf
+from pdf_loader import HAS_RL, build_pdf_apcs, build_pdf_letterhead
+from response_code import decode
+from prefork import prefork, preload_pdf_stack
+from scoring import ScreeningInput, screen
+
+MAX_BODY = 16 * 1024 * 1024   # bytes per permintaan
+MAX_BATCH = 10_000            # respons per /score/batch
+KODE_FIELDS = ("kode", "name", "today")
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ------------------ ENDPOINT ------------------
+def parse_response(obj) -> tuple[str, str | None, ScreeningInput]:
+    """(nama, tanggal, ScreeningInput) dari satu objek JSON respons."""
+    if not isinstance(obj, dict):
+        raise ApiError(400, "respons harus berupa objek JSON")
+    try:
+        if "kode" not in obj:
+            return parse_row(obj)
+        check_fields(obj, KODE_FIELDS, required=("kode",))
+        if not isinstance(obj["kode"], str):
+            raise ValueError("kolom 'kode': harus teks")
+        inp = decode(obj["kode"])
+    except ValueError as exc:
+        raise ApiError(400, str(exc)) from None
+    return (obj.get("name") or "").strip(), (obj.get("today") or "").strip() or None, inp
+
+
+def score_one(obj) -> dict:
+    name, _, inp = parse_response(obj)
+    return result_record(name, inp, screen(inp))
+
+
+def score_batch(obj) -> dict:
+    responses = obj.get("responses") if isinstance(obj, dict) and obj.keys() == {"responses"} else obj
+    if not isinstance(responses, list):
+        raise ApiError(400, "badan permintaan harus {\"responses\": [...]}")
+    if len(responses) > MAX_BATCH:
+        raise ApiError(413, f"paling banyak {MAX_BATCH} respons per permintaan")
+    names, inputs = [], []
+    for i, item in enumerate(responses):
+        try:
+            name, _, inp = parse_response(item)
+        except ApiError as exc:
+            raise ApiError(exc.status, f"respons #{i}: {exc}") from None
+        names.append(name)
+        inputs.append(inp)
+    if not inputs:
+        return {"results": []}
+    res = score_cohort(**arrays_from_inputs(inputs))
+    return {"results": list(result_records(names, inputs, res))}
+
+
+def _pdf(kind: str, obj) -> bytes:
+    if not HAS_RL:
+        raise ApiError(503, "paket reportlab tidak terpasang")
+    name, today, inp = parse_response(obj)
+    letter, apcs = pdf_kwargs(name, today or time.strftime("%d %b %Y"), inp)
+    if kind == "letterhead":
+        return cached_pdf("letterhead", build_pdf_letterhead, **letter, **LOGOS)
+    return cached_pdf("apcs", build_pdf_apcs, **apcs, **LOGOS)
+
+
+# path -> (fungsi, jenis balasan); fungsi menerima JSON badan permintaan
+POST_ROUTES = {
+    "/score": (score_one, "json"),
+    "/score/batch": (score_batch, "json"),
+    "/pdf/letterhead": (lambda obj: _pdf("letterhead", obj), "pdf"),
+    "/pdf/apcs": (lambda obj: _pdf("apcs", obj), "pdf"),
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive
+    server_version = "ISI-PERUT-API/1"
+    disable_nagle_algorithm = True
+
+    def _reply(self, status: int, body: bytes, ctype: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, obj) -> None:
+        body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._reply(status, body, "application/json; charset=utf-8")
+
+    def _error(self, status: int, message: str) -> None:
+        get_registry().incr("api_errors")
+        self._json(status, {"error": message})
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            self._json(200, {"status": "ok", "pid": os.getpid()})
+        elif path == "/metrics":
+            self._reply(200, get_registry().prometheus().encode("utf-8"), "text/plain; version=0.0.4")
+        elif path == "/metrics.json":
+            self._json(200, get_registry().snapshot())
+        elif path in POST_ROUTES:
+            self._error(405, "gunakan POST")
+        else:
+            self._error(404, "endpoint tidak dikenal")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        route = POST_ROUTES.get(path)
+        # Badan permintaan yang ditolak tidak dibaca: koneksi ditutup
+        if route is None:
+            self.close_connection = True
+            self._error(404, "endpoint tidak dikenal")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.close_connection = True
+            self._error(411, "Content-Length wajib ada")
+            return
+        if length < 0:
+            self.close_connection = True
+            self._error(400, "Content-Length tidak valid")
+            return
+        if length > MAX_BODY:
+            self.close_connection = True
+            self._error(413, f"badan permintaan maksimal {MAX_BODY // (1024 * 1024)} MB")
+            return
+        fn, kind = route
+        try:
+            with timed(f"api_{path.strip('/').replace('/', '_')}"):
+                try:
+                    obj = json.loads(self.rfile.read(length))
+                except ValueError:
+                    raise ApiError(400, "badan permintaan bukan JSON yang valid") from None
+                out = fn(obj)
+        except ApiError as exc:
+            self._error(exc.status, str(exc))
+            return
+        except Exception:  # noqa: BLE001
+            traceback.print_exc()
+            self._error(500, "galat internal")
+            return
+        get_registry().incr("api_requests")
+        if kind == "pdf":
+            self._reply(200, out, "application/pdf")
+        else:
+            self._json(200, out)
+
+    def log_message(self, *args):
+        pass
+
+
+# ------------------ PROSES ------------------
+def _serve_socket(sock: socket.socket) -> None:
+    server = ThreadingHTTPServer(sock.getsockname()[:2], Handler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    server.serve_forever()
+
+
+def serve(host: str, port: int, workers: int, preload: bool = True) -> None:
+    sock = socket.create_server((host, port), backlog=1024)
+    # ReportLab + kop surat dimuat sebelum fork; mode antrean: PDF dibangun
+    # tier worker pdf_queue.py, bukan di sini
+    if preload and not pdf_queue.ENABLED:
+        preload_pdf_stack()
+    print(f"[api] http://{host}:{sock.getsockname()[1]} — {workers} worker", file=sys.stderr)
+    prefork(workers, lambda: _serve_socket(sock), "api")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Layanan HTTP JSON skoring & PDF ISI PERUT (tanpa Streamlit)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--workers", type=int, default=default_workers(),
+                    help="jumlah proses worker (bawaan: jumlah core)")
+    ap.add_argument("--no-preload", action="store_true",
+                    help="jangan muat ReportLab sebelum fork (start lebih cepat, PDF pertama lebih lambat)")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, args.workers, preload=not args.no_preload)
+
+
+if __name__ == "__main__":
+    main()
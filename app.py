@@ -2,27 +2,27 @@
 # Instrumen Skrining dan Informasi Penyakit Saluran Cerna Untukmu
 # © 2025 dr. Danu Kamajaya, Sp.PD – RSUP Dr. Kariadi Semarang
 
+import os
 import streamlit as st
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
-from pathlib import Path
-from io import BytesIO
+from functools import partial
+
+import pdf_queue
+import questionnaires
+import response_code
+import rules
+from assets import current_manifest
+from metrics import RunTimings, get_registry
+from pdf_cache import cached_pdf
+from render_pool import LiveDocumentSet
+from scoring import SEX_OPTIONS, verdict
+from web_images import CONTAINER_WIDTH, picture_html, pick as web_image
+import warmup
 
 # ==== Optional PDF dependency (graceful) ====
-HAS_RL = True
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.platypus import (
-        SimpleDocTemplate,
-        Paragraph,
-        Spacer,
-        Image,
-        Table,
-        TableStyle,
-    )
-    from reportlab.lib import colors
-except Exception:
-    HAS_RL = False
+# ReportLab baru diimpor saat PDF pertama dibangun (lihat pdf_loader.py)
+from pdf_loader import HAS_RL, build_pdf_apcs, build_pdf_letterhead
 
 # ------------------ PAGE CONFIG ------------------
 st.set_page_config(
@@ -31,22 +31,63 @@ st.set_page_config(
     layout="wide",
 )
 
+# Waktu per bagian rerun ini (panel debug: ?debug=1, lihat metrics.py).
+# Fragment mengambilnya lewat session_state (fragment_timings), bukan dari
+# variabel modul ini: saat fragment dijalankan ulang sendiri, variabel modul
+# masih menunjuk RunTimings run penuh sebelumnya
+timings = st.session_state["run_timings"] = RunTimings()
+
+# Pemanasan di proses ini hanya bila diminta (ISI_PERUT_WARMUP=1); bawaannya
+# lewat `python warmup.py --serve`, yang sudah memulainya sebelum rerun pertama
+if warmup.ENABLED:
+    warmup.start_background()
+
+# Mode formulir: tiap kuesioner (GERD-Q, EGD, kolonoskopi, APCS) dikirim
+# sekali lewat tombol, bukan satu rerun per klik (±30 → 4 rerun per skrining)
+FORM_MODE = os.environ.get("ISI_PERUT_FORM_MODE", "0") == "1"
+
 # ------------------ HELPER ------------------
-def pick_first_existing(paths):
-    for p in paths:
-        if Path(p).exists():
-            return p
-    return None
+@contextmanager
+def questionnaire_form(key, submit_label):
+    """st.form + tombol kirim bila FORM_MODE aktif, selain itu blok biasa."""
+    if not FORM_MODE:
+        yield
+        return
+    with st.form(key):
+        yield
+        st.form_submit_button(submit_label)
 
 # ------------------ ASSET PATHS ------------------
+# Di-resolve sekali per proses (assets.py); rerun hanya satu stat direktori
+manifest = current_manifest()
+
 # logo header gabungan
-logo_header = pick_first_existing(["logo_header.png", "Logo_Header.png"])
+logo_header = manifest.path("logo_header")
 
 # (opsional) tetap dipakai untuk keperluan PDF
-logo_kariadi = pick_first_existing(["logo_kariadi.png"])
-logo_isi = pick_first_existing(["logo_isi_perut.png"])
+logo_kariadi = manifest.path("logo_kariadi")
+logo_isi = manifest.path("logo_isi")
+
+endo_img = manifest.path("ilustrasi_endoskopi")
 
-endo_img = pick_first_existing(["ilustrasi_endoskopi.png", "ilustrasi_endoskopi.jpg"])
+# Gambar di halaman dikirim sebagai varian terkecil yang cukup untuk lebar
+# tampilnya (lihat web_images.py), bukan PNG aslinya. Bila static serving
+# aktif (.streamlit/config.toml), gambar dirujuk lewat URL statis ber-hash
+# yang bisa di-cache browser/proxy selamanya, bukan diunggah ulang lewat
+# media file manager untuk tiap sesi.
+STATIC_IMAGES = bool(st.get_option("server.enableStaticServing"))
+
+
+def show_image(src, width=None, caption=None, lazy=False):
+    if STATIC_IMAGES:
+        cap = f"<div class='illustration-cap'>{caption}</div>" if caption else ""
+        st.markdown(
+            picture_html(src, width or CONTAINER_WIDTH, alt=caption or "", lazy=lazy) + cap,
+            unsafe_allow_html=True,
+        )
+    else:
+        # Tanpa lebar: selebar kolom, seperti use_column_width=True semula
+        st.image(web_image(src, width or CONTAINER_WIDTH), width=width or "stretch", caption=caption)
 
 # Link e-book
 EBOOK_URL = "https://read.bookcreator.com/RNDNIaOmuObU91dWx81iBOosFZP2/f0KVVnM6SNysvTmFOPMOWA"
@@ -192,10 +233,10 @@ h2, h3 { font-weight:700; }
 st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # ------------------ HEADER ------------------
-with st.container():
+with timings.section("header"), st.container():
     if logo_header:
         st.markdown("<div class='header-logo'>", unsafe_allow_html=True)
-        st.image(logo_header, use_column_width=True)
+        show_image(logo_header)
         st.markdown("</div>", unsafe_allow_html=True)
 
     st.markdown(
@@ -212,17 +253,18 @@ with st.container():
     )
 
 # ------------------ ILUSTRASI ------------------
-if endo_img:
-    st.markdown(
-        "<div class='illustrations'><div class='illustration'>",
-        unsafe_allow_html=True,
-    )
-    st.image(endo_img)
-    st.markdown(
-        "<div class='illustration-cap'>Ilustrasi pemeriksaan endoskopi saluran cerna atas dan bawah</div>"
-        "</div></div>",
-        unsafe_allow_html=True,
-    )
+with timings.section("illustration"):
+    if endo_img:
+        st.markdown(
+            "<div class='illustrations'><div class='illustration'>",
+            unsafe_allow_html=True,
+        )
+        show_image(endo_img)
+        st.markdown(
+            "<div class='illustration-cap'>Ilustrasi pemeriksaan endoskopi saluran cerna atas dan bawah</div>"
+            "</div></div>",
+            unsafe_allow_html=True,
+        )
 
 # ------------------ KARTU E-BOOK ------------------
 st.markdown(
@@ -254,324 +296,210 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+# ------------------ KODE RESPONS (?kode=...) ------------------
+# Kode dari surat PDF (response_code.py) memuat ulang semua jawaban sekali
+# per kode, sebelum widget dibuat; setelahnya jawaban bebas diubah lagi.
+kode_url = st.query_params.get("kode")
+if kode_url and st.session_state.get("kode_dimuat") != kode_url:
+    st.session_state["kode_dimuat"] = kode_url
+    try:
+        st.session_state.update(response_code.widget_state(response_code.decode(kode_url)))
+    except ValueError as exc:
+        st.error(f"Jawaban tidak dapat dimuat: {exc}.", icon="⚠️")
+
+# Usia awal lewat session_state (bukan value=) agar bisa diisi dari kode
+st.session_state.setdefault("age", response_code.DEFAULT_AGE)
+
 # ------------------ DATA PRIBADI ------------------
 st.markdown("### 🧑‍⚕️ Data Pribadi")
 
 name = st.text_input("Nama lengkap")
 col_x, col_y = st.columns(2)
 with col_x:
-    age = st.number_input("Usia (tahun)", min_value=0, max_value=120, value=45, step=1)
+    age = st.number_input("Usia (tahun)", min_value=0, max_value=120, step=1, key="age")
 with col_y:
-    sex = st.selectbox("Jenis kelamin", ["Laki-laki", "Perempuan", "Lainnya"], index=0)
+    sex = st.selectbox("Jenis kelamin", SEX_OPTIONS, index=0, key="sex")
 
 today = datetime.today().strftime("%d %b %Y")
 
 st.markdown("---")
 
-# ------------------ GERD-Q ------------------
-GERDQ_OPTIONS = ["0 hari", "1 hari", "2–3 hari", "4–7 hari"]
-gerd_q_summary = ""  # akan terisi bila formulir diisi
+# ------------------ KUESIONER (FRAGMENT) ------------------
+# Tiap kuesioner adalah fragment: klik di dalamnya hanya menjalankan ulang
+# bagian itu, bukan header/ilustrasi/bagian lain. Hasilnya disimpan di
+# `hasil` (session_state) untuk ringkasan & PDF; rerun penuh hanya bila
+# verdikt yang tampil di ringkasan berubah.
+hasil = st.session_state.setdefault("hasil", {})
+hasil["rerun_penuh"] = True  # dikembalikan False setelah ringkasan digambar
 
-with st.expander(
-    "Apakah Saya mengidap GERD (Gastroesophageal Reflux Disease)?",
-    expanded=False,
-):
-    st.write(
-        "Jawablah seberapa sering dalam **1 minggu terakhir** Anda mengalami keluhan berikut:"
-    )
 
-    q1 = st.radio(
-        "1. Seberapa sering Anda mengalami rasa terbakar di bagian belakang tulang dada (heartburn)?",
-        GERDQ_OPTIONS,
-        index=0,
-        key="gerdq1",
-    )
-    q2 = st.radio(
-        "2. Seberapa sering Anda mengalami naiknya isi lambung ke arah tenggorokan atau mulut (regurgitasi asam)?",
-        GERDQ_OPTIONS,
-        index=0,
-        key="gerdq2",
-    )
-    q3 = st.radio(
-        "3. Seberapa sering Anda mengalami nyeri ulu hati?",
-        GERDQ_OPTIONS,
-        index=0,
-        key="gerdq3",
-    )
-    q4 = st.radio(
-        "4. Seberapa sering Anda mengalami mual?",
-        GERDQ_OPTIONS,
-        index=0,
-        key="gerdq4",
-    )
-    q5 = st.radio(
-        "5. Seberapa sering keluhan di dada atau perut mengganggu tidur malam Anda?",
-        GERDQ_OPTIONS,
-        index=0,
-        key="gerdq5",
-    )
-    q6 = st.radio(
-        "6. Seberapa sering Anda minum obat tambahan (misal obat maag bebas) untuk mengurangi keluhan di dada atau perut?",
-        GERDQ_OPTIONS,
-        index=0,
-        key="gerdq6",
-    )
+def refresh_summary():
+    """Rerun penuh bila verdikt EGD/kolonoskopi beda dari yang tampil di ringkasan."""
+    if hasil.get("rerun_penuh"):
+        return  # ringkasan di bawah akan ikut dijalankan pada rerun ini
+    if hasil.get("ringkasan") != (hasil.get("egd"), hasil.get("colo")):
+        st.rerun()
 
-    # Skoring sesuai tabel GERD-Q:
-    # Q1,2,5,6: 0,1,2,3
-    # Q3,4 (nyeri ulu hati & mual): 3,2,1,0
-    def score_pos(ans: str) -> int:
-        return GERDQ_OPTIONS.index(ans)
-
-    def score_neg(ans: str) -> int:
-        idx = GERDQ_OPTIONS.index(ans)
-        return [3, 2, 1, 0][idx]
-
-    gerd_q_score = (
-        score_pos(q1)
-        + score_pos(q2)
-        + score_neg(q3)
-        + score_neg(q4)
-        + score_pos(q5)
-        + score_pos(q6)
-    )
 
-    if gerd_q_score >= 8:
-        badge_gerd = "badge badge-red"
-        gerd_title = f"Skor GERD-Q: {gerd_q_score} — kemungkinan **menderita GERD**."
-        gerd_text = (
-            "Skor ≥8 meningkatkan kemungkinan adanya penyakit refluks asam lambung "
-            "(GERD). Konsultasikan hasil ini ke dokter untuk evaluasi dan penatalaksanaan lebih lanjut."
-        )
-        gerd_q_summary = (
-            f"Skor GERD-Q {gerd_q_score} (≥8) – hasil mengarah ke penyakit refluks asam lambung (GERD)."
-        )
+# Semua kuesioner (GERD-Q, EGD, kolonoskopi, APCS, dan instrumen baru) berasal
+# dari questionnaires.json yang dikompilasi sekali per proses, lalu dirender &
+# diskor oleh satu jalur generik di bawah ini sesuai jenisnya.
+QUESTIONNAIRES = questionnaires.load()
+# Tabel keputusan verdikt per checklist (rules.json, dikompilasi sekali per proses)
+TRIAGE = {i: rules.load().for_instrument(i) for i, inst in QUESTIONNAIRES.items() if inst.kind == "checklist"}
+
+# Data pribadi yang dipakai butir kuesioner ber-`source` (usia & jenis kelamin APCS)
+profil = {"age": int(age), "sex": sex}
+
+
+@contextmanager
+def questionnaire_container(inst):
+    """Expander untuk kuesioner gejala, bagian bertajuk biasa (APCS) selain itu."""
+    if inst.expander:
+        with st.expander(inst.title, expanded=False):
+            yield
     else:
-        badge_gerd = "badge badge-green"
-        gerd_title = f"Skor GERD-Q: {gerd_q_score} — kemungkinan **tidak menderita GERD bermakna**."
-        gerd_text = (
-            "Skor <8 membuat kemungkinan GERD menurun. Namun bila keluhan menetap atau berat, "
-            "tetap dianjurkan berkonsultasi ke dokter."
-        )
-        gerd_q_summary = (
-            f"Skor GERD-Q {gerd_q_score} (<8) – kemungkinan kecil penyakit refluks asam lambung (GERD)."
+        st.markdown("---")
+        st.markdown(f"### {inst.title}")
+        yield
+
+
+def render_frequency(inst):
+    return [st.radio(q.text, inst.options, index=0, key=q.key) for q in inst.questions]
+
+
+def render_checklist(inst):
+    """{key_prefix: [centang per butir]}; kategori berdampingan bila inst.columns."""
+    n = len(inst.categories)
+    slots = st.columns(n) if inst.columns else [nullcontext()] * n
+    checked = {}
+    for cat, slot in zip(inst.categories, slots):
+        with slot:
+            st.subheader(cat.title)
+            if cat.caption:
+                st.caption(cat.caption)
+            checked[cat.key_prefix] = [st.checkbox(q, key=k) for q, k in zip(cat.items, cat.keys)]
+    return checked
+
+
+def render_points(inst):
+    return {
+        item.id: (
+            profil[item.source] if item.source
+            else st.radio(item.text, item.options, index=0, key=item.key)
         )
+        for item in inst.items
+    }
 
-    st.markdown(
-        f"""
-        <div class="result-card">
-          <span class="{badge_gerd}">{gerd_title}</span><br/>
-          {gerd_text}
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
 
-# ------------------ PERTANYAAN EGD ------------------
-ALARM_EGD = [
-    "Usia saya **≥50 tahun** dengan keluhan rasa tidak nyaman di ulu hati, perut terasa penuh/kembung, cepat kenyang, atau nyeri/panas di perut bagian atas (dispepsia).",
-    "Ada **riwayat keluarga derajat pertama** (orang tua / saudara kandung) dengan **keganasan saluran cerna atas**.",
-    "Berat badan saya **turun tanpa sebab jelas**.",
-    "Saya mengalami **perdarahan saluran cerna** atau diberitahu ada **anemia defisiensi besi**.",
-    "Saya **kesulitan menelan**, makanan/minuman terasa tersangkut di tenggorokan atau dada (**disfagia**).",
-    "Saya **nyeri saat menelan**, seperti rasa perih/terbakar/menusuk di dada atau kerongkongan saat makanan/minuman lewat (**odynofagia**).",
-    "Saya mengalami **muntah menetap / persisten**.",
-]
-
-egd_alarm_sel = []
-
-with st.expander(
-    "Apakah GERD Saya perlu teropong saluran cerna atas (EGD)?",
-    expanded=False,
-):
-    st.subheader("1. Gejala yang Perlu Dievaluasi Lebih Lanjut")
-    for i, q in enumerate(ALARM_EGD):
-        if st.checkbox(q, key=f"egd_alarm_{i}"):
-            egd_alarm_sel.append(q)
+RENDERERS = {"frequency": render_frequency, "checklist": render_checklist, "points": render_points}
 
-    st.markdown(
-        """
-        **Istilah penting:**
-        - **Dispepsia**: rasa tidak nyaman di ulu hati, perut terasa penuh/kembung, cepat kenyang, atau nyeri/panas di perut bagian atas.
-        - **Disfagia**: kesulitan menelan, makanan/minuman terasa tersangkut di tenggorokan atau dada.
-        - **Odynofagia**: nyeri saat menelan, seperti rasa perih/terbakar/menusuk ketika makanan atau minuman lewat di kerongkongan.
-        """,
-        unsafe_allow_html=False,
-    )
 
-# ------------------ PERTANYAAN KOLO ------------------
-ALARM_COLO = [
-    "Saya **keluar darah segar dari dubur** sedang–berat / **menetes**.",
-    "Saya **anemia defisiensi besi** atau tampak pucat/lemas disertai keluhan penyebab yang belum jelas (bukan karena haid banyak, operasi, atau perdarahan lain yang sudah diketahui) terutama bila disertai keluhan saluran cerna (misalnya nyeri perut, perubahan BAB, apalagi ada darah di tinja).",
-    "Berat badan saya **turun tanpa sebab jelas** tanpa diet/olahraga khusus, terutama bila disertai keluhan saluran cerna (misalnya nyeri perut, perubahan BAB, atau darah di tinja).",
-    "Terjadi **perubahan pola BAB progresif** (>4–6 minggu) disertai darah.",
-    "Nyeri perut berat menetap, **diare berdarah/demam** (curiga kolitis/IBD berat).",
-]
-RISK_COLO = [
-    "Usia **≥50 tahun** dengan keluhan saluran cerna bawah (BAB cair terus menerus, sembelit, atau pola BAB berubah-ubah antara BAB cair dan sembelit).",
-    "Ada **keluarga dekat** dengan **kanker kolorektal atau polip adenoma**.",
-    "**Pemeriksaan tinja darah samar positif**.",
-    "Riwayat **IBD** (kolitis ulseratif atau penyakit Crohn) — evaluasi/monitoring.",
-    "Riwayat **polip atau operasi kanker kolorektal** — perlu **surveilans** berkala.",
-]
-OTHER_COLO = [
-    "**Perubahan pola BAB (antara sembelit dan BAB cair)** >4–6 minggu tanpa darah atau demam.",
-    "**Konstipasi kronik** (sembelit yang berlangsung lebih dari 3 bulan) tidak membaik dengan pengobatan awal.",
-    "**Diare kronik** (>4 minggu) tanpa penyebab jelas.",
-    "Nyeri perut bawah berulang disertai perubahan pola BAB (sembelit, BAB cair).",
-    "Keluar **lendir/darah sedikit** berulang dari anus.",
-]
-
-colo_alarm_sel, colo_risk_sel, colo_other_sel = [], [], []
-
-with st.expander(
-    "Apakah Saya perlu teropong saluran cerna bawah (Kolonoskopi)?",
-    expanded=False,
-):
-    c1, c2, c3 = st.columns(3)
-
-    with c1:
-        st.subheader("1. Gejala yang Perlu Dievaluasi Lebih Lanjut")
-        for i, q in enumerate(ALARM_COLO):
-            if st.checkbox(q, key=f"colo_alarm_{i}"):
-                colo_alarm_sel.append(q)
-
-    with c2:
-        st.subheader("2. Keluhan atau Kondisi yang Dapat Ditangani Secara Elektif")
-        st.caption(
-            "Keluhan ini umumnya tidak mendesak, tetapi bila berlangsung menetap atau mengganggu, "
-            "kolonoskopi dapat membantu mencari penyebabnya."
-        )
-        for i, q in enumerate(OTHER_COLO):
-            if st.checkbox(q, key=f"colo_other_{i}"):
-                colo_other_sel.append(q)
+def update_verdicts():
+    """
+    Verdikt tiap checklist dari tabel keputusan (rules.json) dengan skor
+    instrumen terbaru; dijalankan setelah setiap kuesioner karena aturan boleh
+    memakai skor instrumen lain (mis. APCS). Verdikt yang skornya belum ada
+    (awal rerun penuh) menunggu kuesioner berikutnya.
+    """
+    scores = {
+        i: hasil[i].score for i, inst in QUESTIONNAIRES.items() if inst.kind != "checklist" and i in hasil
+    }
+    for inst in QUESTIONNAIRES.values():
+        facts = hasil.get(f"{inst.id}_fakta")
+        if facts is not None and all(s in scores for s in TRIAGE[inst.id].scores):
+            hasil[inst.id] = verdict(*facts, inst.organ, scores)
 
-    with c3:
-        st.subheader("3. Faktor Risiko yang Perlu Diperhatikan")
-        for i, q in enumerate(RISK_COLO):
-            if st.checkbox(q, key=f"colo_risk_{i}"):
-                colo_risk_sel.append(q)
 
+def result_card(outcome):
     st.markdown(
-        """
-        **Keterangan:**
-        - **IBD (Inflammatory Bowel Disease)** adalah peradangan kronik pada usus, misalnya kolitis ulseratif atau penyakit Crohn,
-          yang meningkatkan risiko kanker kolorektal.
-        - **CRC (Colorectal Cancer)** adalah kanker yang berasal dari usus besar atau rektum. Banyak kasus berawal dari polip
-          yang tumbuh perlahan dan dapat dideteksi serta diangkat dengan kolonoskopi.
+        f"""
+        <div class="result-card">
+          <span class="{outcome.badge}">{outcome.title}</span><br/>
+          {outcome.text}
+        </div>
         """,
-        unsafe_allow_html=False,
+        unsafe_allow_html=True,
     )
 
-# ------------------ APCS ------------------
-st.markdown("---")
-st.markdown("### 📊 Skrining Risiko Kanker Kolorektal (APCS)")
-
-if age < 45:
-    age_score = 0
-elif 45 <= age <= 69:
-    age_score = 2
-else:  # age >= 70
-    age_score = 3
-
-sex_score = 1 if sex == "Laki-laki" else 0
-
-fhx = st.radio(
-    "Riwayat keluarga kanker kolorektal derajat pertama (Ayah/Ibu/Kakak/Adik kandung)",
-    ["Tidak ada", "Ada"],
-    index=0,
-)
-fhx_score = 0 if fhx == "Tidak ada" else 2
-
-smoke = st.radio(
-    "Riwayat merokok",
-    ["Tidak pernah merokok", "Saat ini merokok atau dulu pernah merokok"],
-    index=0,
-)
-smoke_score = 0 if smoke.startswith("Tidak") else 1
 
-score_apcs = age_score + sex_score + fhx_score + smoke_score
-
-if score_apcs <= 1:
-    kategori_apcs = "Risiko Rendah (0–1)"
-    pesan_apcs = (
-        "Anda termasuk kelompok risiko rendah kanker kolorektal berdasarkan skor APCS. "
-        "Tetap jaga pola hidup sehat dan lakukan penilaian ulang secara berkala sesuai anjuran tenaga kesehatan."
-    )
-    badge_apcs = "badge badge-green"
-elif score_apcs <= 3:
-    kategori_apcs = "Risiko Sedang (2–3)"
-    pesan_apcs = (
-        "Anda termasuk kelompok risiko sedang. Disarankan berkonsultasi ke fasilitas kesehatan "
-        "untuk mempertimbangkan skrining Tes Darah Samar Feses (iFOBT) secara berkala."
-    )
-    badge_apcs = "badge badge-gray"
-else:
-    kategori_apcs = "Risiko Tinggi (4–7)"
-    pesan_apcs = (
-        "Anda termasuk kelompok risiko tinggi kanker kolorektal. Disarankan berkonsultasi ke fasilitas kesehatan "
-        "untuk pemeriksaan lebih lanjut, seperti colok dubur, Tes Darah Samar Feses (iFOBT), dan kemungkinan kolonoskopi."
-    )
-    badge_apcs = "badge badge-red"
-
-st.markdown(
-    f"""
-    <div class="result-card">
-      <span class="{badge_apcs}">Skor APCS: <b>{score_apcs}</b> — {kategori_apcs}</span><br/>
-      {pesan_apcs}
-    </div>
-    """,
-    unsafe_allow_html=True,
-)
+@contextmanager
+def fragment_timings():
+    """
+    RunTimings untuk kode di dalam fragment: milik run penuh yang sedang
+    berjalan, atau RunTimings baru (di-finish setelahnya) bila hanya
+    fragment yang dijalankan ulang.
+    """
+    run = st.session_state["run_timings"]
+    if not run.finished:
+        yield run
+        return
+    run = RunTimings()
+    try:
+        yield run
+    finally:
+        run.finish()
+
+
+@st.fragment
+def questionnaire_section(inst_id):
+    inst = QUESTIONNAIRES[inst_id]
+    with fragment_timings() as timings:
+        with timings.section(inst.id), questionnaire_container(inst):
+            image = manifest.path(inst.image.asset) if inst.image else None
+            if image:
+                # lazy: di dalam expander, baru diunduh saat expander dibuka
+                show_image(image, inst.image.width, caption=inst.image.caption, lazy=True)
+            if inst.intro:
+                st.write(inst.intro)
+
+            with questionnaire_form(f"form_{inst.id}", inst.submit_label):
+                answers = RENDERERS[inst.kind](inst)
+
+            if inst.kind == "checklist":
+                sel = inst.select(answers)
+            else:
+                hasil[inst.id] = inst.score(answers)
+                result_card(hasil[inst.id])
+
+            if inst.notes:
+                st.markdown(inst.notes, unsafe_allow_html=False)
+
+        if inst.kind == "checklist":
+            # Butir terpilih (alarm, risiko, lain) untuk PDF & tabel keputusan
+            hasil[f"{inst.id}_sel"] = sel["alarm"] + sel["risk"] + sel["other"]
+            hasil[f"{inst.id}_fakta"] = (sel["alarm"], sel["risk"], sel["other"])
+        update_verdicts()
+
+        # Kode respons untuk PDF, dari nilai widget terbaru (termasuk usia & jenis kelamin)
+        hasil["kode"] = response_code.encode(response_code.from_widget_state(st.session_state))
+        refresh_summary()
+
+
+for inst_id in QUESTIONNAIRES:
+    questionnaire_section(inst_id)
 
 # ------------------ HASIL SKRINING EGD & KOLO ------------------
-def verdict(alarm, risk, other, organ):
-    if alarm:
-        return (
-            f"🔴 Anda **perlu {organ} segera**",
-            "badge badge-red",
-            "Segera konsultasi ke dokter penyakit dalam atau IGD, terutama bila keluhan berat atau mendadak.",
+# Verdikt murni dari gejala (EGD + Kolonoskopi) — dipakai juga untuk PDF.
+# Yang ditampilkan di layar juga TIDAK dimodifikasi oleh APCS.
+v_egd, b_egd, a_egd, *_ = hasil["egd"]
+v_colo, b_colo, a_colo, *_ = hasil["colo"]
+hasil["ringkasan"] = (hasil["egd"], hasil["colo"])
+hasil["rerun_penuh"] = False
+
+with timings.section("summary"):
+    st.subheader("📋 Ringkasan Hasil Skrining Endoskopi")
+    colA, colB = st.columns(2)
+    with colA:
+        st.markdown(
+            f'<div class="result-card"><span class="{b_egd}">{v_egd}</span><br/>{a_egd}</div>',
+            unsafe_allow_html=True,
         )
-    elif risk or other:
-        return (
-            f"🟢 Anda **dapat menjadwalkan {organ} (elektif)**",
-            "badge badge-green",
-            "Buat janji di poliklinik untuk pemeriksaan dan penilaian lebih lanjut.",
+    with colB:
+        st.markdown(
+            f'<div class="result-card"><span class="{b_colo}">{v_colo}</span><br/>{a_colo}</div>',
+            unsafe_allow_html=True,
         )
-    else:
-        return (
-            f"⚪ Saat ini **belum tampak kebutuhan mendesak untuk {organ}**",
-            "badge badge-gray",
-            "Lanjutkan pemantauan dan pengobatan rutin. Bila keluhan menetap >4–6 minggu atau muncul gejala yang perlu dievaluasi lebih lanjut, segera konsultasi ke dokter.",
-        )
-
-# Verdikt murni dari gejala (EGD + Kolonoskopi) — dipakai juga untuk PDF
-v_egd, b_egd, a_egd = verdict(
-    egd_alarm_sel, [], [], "endoskopi saluran cerna atas (EGD)"
-)
-
-v_colo_pdf, b_colo_pdf, a_colo_pdf = verdict(
-    colo_alarm_sel,
-    colo_risk_sel,
-    colo_other_sel,
-    "kolonoskopi (saluran cerna bawah)",
-)
-
-# Verdikt yang ditampilkan di layar (TIDAK dimodifikasi oleh APCS)
-v_colo, b_colo, a_colo = v_colo_pdf, b_colo_pdf, a_colo_pdf
-
-st.subheader("📋 Ringkasan Hasil Skrining Endoskopi")
-colA, colB = st.columns(2)
-with colA:
-    st.markdown(
-        f'<div class="result-card"><span class="{b_egd}">{v_egd}</span><br/>{a_egd}</div>',
-        unsafe_allow_html=True,
-    )
-with colB:
-    st.markdown(
-        f'<div class="result-card"><span class="{b_colo}">{v_colo}</span><br/>{a_colo}</div>',
-        unsafe_allow_html=True,
-    )
 
 # ---------- KARTU INFORMASI PAKET HARGA ----------
 st.markdown(
@@ -587,376 +515,81 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-# ------------------ PDF EXPORT (kop surat RS Kariadi) ------------------
-def build_pdf_letterhead(
-    name: str,
-    age: int,
-    sex: str,
-    today: str,
-    v_egd: str,
-    a_egd: str,
-    r_egd: list,
-    gerd_q_summary: str,
-    v_colo: str,
-    a_colo: str,
-    r_colo: list,
-    logo_rs_path: str | None,
-    logo_isi_path: str | None,
-) -> bytes:
-    """
-    Bangun PDF hasil skrining:
-    1) Hasil skrining GERD (GERD-Q)
-    2) Kebutuhan EGD
-    3) Kebutuhan kolonoskopi
-    """
-    buf = BytesIO()
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=A4,
-        leftMargin=40,   # sedikit lebih lebar
-        rightMargin=40,
-        topMargin=30,
-        bottomMargin=28,
-    )
-
-    styles = getSampleStyleSheet()
-    styles.add(
-        ParagraphStyle(
-            name="H1C",
-            parent=styles["Title"],
-            alignment=1,
-            leading=22,
-            spaceAfter=12,
-        )
-    )
-    styles.add(
-        ParagraphStyle(
-            name="SmallGray",
-            parent=styles["Normal"],
-            textColor=colors.HexColor("#444"),
-            fontSize=10,
-        )
-    )
-    styles.add(ParagraphStyle(name="Label", parent=styles["Normal"], spaceAfter=2))
-    styles.add(
-        ParagraphStyle(
-            name="Bold",
-            parent=styles["Normal"],
-            fontName=styles["Heading4"].fontName,
-            spaceAfter=4,
-        )
-    )
-
-    elems = []
-
-    left_img = (
-        Image(logo_rs_path, width=130, height=55)
-        if logo_rs_path and Path(logo_rs_path).exists()
-        else ""
-    )
-    right_img = (
-        Image(logo_isi_path, width=145, height=145)
-        if logo_isi_path and Path(logo_isi_path).exists()
-        else ""
-    )
-
-    kop_text = Paragraph(
-        "<para align='center'>"
-        "<b>RUMAH SAKIT UMUM PUSAT DOKTER KARIADI</b><br/>"
-        "Jalan Dr. Sutomo No 16 Semarang PO BOX 1104<br/>"
-        "Telepon: (024) 8413993<br/>"
-        "Website: www.rskariadi.co.id"
-        "</para>",
-        styles["Normal"],
-    )
-
-    # Lebar konten 555 pt, dengan kolom kiri & kanan agak lebih ke dalam
-    header_tbl = Table(
-        [[left_img, kop_text, right_img]],
-        colWidths=[150, 255, 150],
-        hAlign="CENTER",
-    )
-    header_tbl.setStyle(
-        TableStyle(
-            [
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("ALIGN", (1, 0), (1, 0), "CENTER"),
-                # Logo kiri agak masuk ke dalam
-                ("LEFTPADDING", (0, 0), (0, 0), 14),
-                ("RIGHTPADDING", (0, 0), (0, 0), 0),
-                # Logo kanan agak masuk ke dalam
-                ("LEFTPADDING", (2, 0), (2, 0), 0),
-                ("RIGHTPADDING", (2, 0), (2, 0), 20),
-            ]
-        )
-    )
-
-    elems.append(header_tbl)
-    elems += [
-        Spacer(1, 8),   # jarak kop -> garis hijau
-        Table(
-            [[""]],
-            colWidths=[555],
-            style=[("LINEBELOW", (0, 0), (0, 0), 2, colors.HexColor("#2fa3a0"))],
-        ),
-        Spacer(1, 20),  # jarak garis hijau -> judul
-    ]
-
-    elems.append(Paragraph("HASIL SKRINING SALURAN CERNA", styles["H1C"]))
-    elems.append(Paragraph("(GERD, kebutuhan EGD, dan kolonoskopi)", styles["SmallGray"]))
-    elems.append(Spacer(1, 6))
-
-    ident = [
-        Paragraph(f"<b>Tanggal:</b> {today}", styles["Label"]),
-        Paragraph(f"<b>Nama:</b> {name if name else '-'}", styles["Label"]),
-        Paragraph(f"<b>Usia:</b> {age} tahun", styles["Label"]),
-        Paragraph(f"<b>Jenis kelamin:</b> {sex}", styles["Label"]),
-    ]
-    elems.extend(ident)
-    elems.append(Spacer(1, 10))
-
-    # 1) Hasil skrining GERD (GERD-Q)
-    elems.append(Paragraph("<b>1) Hasil Skrining GERD (GERD-Q)</b>", styles["Bold"]))
-    if gerd_q_summary:
-        elems.append(Paragraph(gerd_q_summary, styles["Label"]))
-    else:
-        elems.append(
-            Paragraph(
-                "Formulir GERD-Q belum terisi lengkap pada saat skrining.",
-                styles["Label"],
-            )
-        )
-    elems.append(Spacer(1, 8))
-
-    # 2) Kebutuhan EGD
-    elems.append(
-        Paragraph("<b>2) Kebutuhan Endoskopi Saluran Cerna Atas (EGD)</b>", styles["Bold"])
-    )
-    elems.append(Paragraph(f"<b>Kesimpulan:</b> {v_egd}", styles["Label"]))
-    elems.append(Paragraph(a_egd, styles["Label"]))
-    if r_egd:
-        elems.append(Spacer(1, 2))
-        elems.append(Paragraph("<b>Gejala yang terdeteksi:</b>", styles["Label"]))
-        for r in r_egd:
-            elems.append(Paragraph(f"• {r}", styles["Label"]))
-
-    elems.append(Spacer(1, 8))
-
-    # 3) Kebutuhan kolonoskopi
-    elems.append(
-        Paragraph("<b>3) Kebutuhan Kolonoskopi (Saluran Cerna Bawah)</b>", styles["Bold"])
-    )
-    elems.append(Paragraph(f"<b>Kesimpulan:</b> {v_colo}", styles["Label"]))
-    elems.append(Paragraph(a_colo, styles["Label"]))
-    if r_colo:
-        elems.append(Spacer(1, 2))
-        elems.append(
-            Paragraph("<b>Gejala / faktor yang terdeteksi:</b>", styles["Label"])
-        )
-        for r in r_colo:
-            elems.append(Paragraph(f"• {r}", styles["Label"]))
-    elems.append(Spacer(1, 12))
-
-    elems.append(
-        Paragraph(
-            "Hasil ini bersifat edukatif dan tidak menggantikan penilaian dokter. "
-            "Jika keluhan berat, mendadak, atau menetap, segera konsultasikan ke dokter penyakit dalam.",
-            styles["SmallGray"],
-        )
-    )
-
-    doc.build(elems)
-    return buf.getvalue()
-
-
-def build_pdf_apcs(
-    name: str,
-    age: int,
-    sex: str,
-    today: str,
-    score_apcs: int,
-    kategori_apcs: str,
-    pesan_apcs: str,
-    logo_rs_path: str | None,
-    logo_isi_path: str | None,
-) -> bytes:
-    """Bangun PDF hasil skrining risiko kanker kolorektal (APCS)."""
-    buf = BytesIO()
-    doc = SimpleDocTemplate(
-        buf,
-        pagesize=A4,
-        leftMargin=40,
-        rightMargin=40,
-        topMargin=30,
-        bottomMargin=28,
-    )
-
-    styles = getSampleStyleSheet()
-    styles.add(
-        ParagraphStyle(
-            name="Judul",
-            parent=styles["Title"],
-            alignment=1,
-            fontSize=14,
-            leading=18,
-        )
-    )
-    styles.add(
-        ParagraphStyle(
-            name="Small",
-            parent=styles["Normal"],
-            fontSize=10,
-            textColor=colors.HexColor("#555"),
-        )
-    )
-    styles.add(
-        ParagraphStyle(name="Label", parent=styles["Normal"], fontSize=11, spaceAfter=4)
-    )
-
-    elems = []
-
-    left_img = (
-        Image(logo_rs_path, width=130, height=55)
-        if logo_rs_path and Path(logo_rs_path).exists()
-        else ""
-    )
-    right_img = (
-        Image(logo_isi_path, width=145, height=145)
-        if logo_isi_path and Path(logo_isi_path).exists()
-        else ""
-    )
-
-    kop_text = Paragraph(
-        "<para align='center'>"
-        "<b>RUMAH SAKIT UMUM PUSAT DOKTER KARIADI</b><br/>"
-        "Jalan Dr. Sutomo No 16 Semarang PO BOX 1104<br/>"
-        "Telepon: (024) 8413993<br/>Website: www.rskariadi.co.id"
-        "</para>",
-        styles["Small"],
-    )
-
-    header_tbl = Table(
-        [[left_img, kop_text, right_img]],
-        colWidths=[150, 255, 150],
-        hAlign="CENTER",
-    )
-    header_tbl.setStyle(
-        TableStyle(
-            [
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("ALIGN", (1, 0), (1, 0), "CENTER"),
-                ("LEFTPADDING", (0, 0), (0, 0), 14),
-                ("RIGHTPADDING", (0, 0), (0, 0), 0),
-                ("LEFTPADDING", (2, 0), (2, 0), 0),
-                ("RIGHTPADDING", (2, 0), (2, 0), 20),
-            ]
-        )
-    )
-
-    elems.append(header_tbl)
-    elems.append(Spacer(1, 8))  # jarak kop -> garis
-
-    elems.append(
-        Table(
-            [[""]],  # garis horizontal
-            colWidths=[555],
-            style=[("LINEBELOW", (0, 0), (0, 0), 2, colors.HexColor("#2fa3a0"))],
-        )
-    )
-    elems.append(Spacer(1, 20))  # jarak garis hijau -> judul
-
-    elems.append(
-        Paragraph("HASIL SKRINING RISIKO KANKER KOLOREKTAL", styles["Judul"])
-    )
-    elems.append(
-        Paragraph("(APCS – Asia-Pacific Colorectal Screening Score)", styles["Small"])
-    )
-    elems.append(Spacer(1, 12))
-
-    elems.append(Paragraph(f"<b>Tanggal:</b> {today}", styles["Label"]))
-    elems.append(Paragraph(f"<b>Nama:</b> {name}", styles["Label"]))
-    elems.append(Paragraph(f"<b>Usia:</b> {age} tahun", styles["Label"]))
-    elems.append(Paragraph(f"<b>Jenis Kelamin:</b> {sex}", styles["Label"]))
-    elems.append(Spacer(1, 12))
-
-    elems.append(Paragraph("<b>Hasil Perhitungan APCS:</b>", styles["Label"]))
-    elems.append(
-        Paragraph(
-            f"<b>Skor:</b> {score_apcs} — <b>Kategori Risiko:</b> {kategori_apcs}",
-            styles["Label"],
-        )
-    )
-    elems.append(Spacer(1, 6))
-    elems.append(Paragraph(pesan_apcs, styles["Label"]))
-    elems.append(Spacer(1, 12))
-
-    elems.append(
-        Paragraph(
-            "Catatan: Hasil ini merupakan skrining awal berdasarkan formulir APCS. "
-            "Pemeriksaan lanjutan seperti Tes Darah Samar Feses (iFOBT), colok dubur, "
-            "atau kolonoskopi akan ditentukan oleh dokter sesuai protokol nasional.",
-            styles["Small"],
-        )
-    )
-
-    doc.build(elems)
-    return buf.getvalue()
-
-
-r_egd_all = egd_alarm_sel
-r_colo_all = colo_alarm_sel + colo_risk_sel + colo_other_sel
-
 st.markdown("")
 
 if HAS_RL:
-    pdf_bytes = build_pdf_letterhead(
-        name or "",
-        int(age),
-        sex,
-        today,
-        v_egd,
-        a_egd,
-        r_egd_all,
-        gerd_q_summary,
-        v_colo_pdf,   # gunakan verdikt murni gejala untuk PDF
-        a_colo_pdf,
-        r_colo_all,
-        logo_kariadi,
-        logo_isi,
-    )
-
-    pdf_apcs_bytes = build_pdf_apcs(
-        name=name or "",
-        age=int(age),
-        sex=sex,
-        today=today,
-        score_apcs=score_apcs,
-        kategori_apcs=kategori_apcs,
-        pesan_apcs=pesan_apcs,
-        logo_rs_path=logo_kariadi,
-        logo_isi_path=logo_isi,
-    )
-
-    col_pdf1, col_pdf2 = st.columns(2)
-    with col_pdf1:
-        st.download_button(
-            "⬇️ Unduh Surat Hasil Endoskopi (PDF)",
-            data=pdf_bytes,
-            file_name=f"Hasil_Skrining_ISI_PERUT_{today.replace(' ','_')}.pdf",
-            mime="application/pdf",
+    # PDF dibangun saat tombol unduh diklik (data berupa callable), bukan di
+    # setiap rerun — mayoritas pengguna tidak pernah mengunduh. Jawaban dibaca
+    # dari `hasil` saat klik, jadi perubahan di fragment tetap ikut tanpa
+    # rerun penuh. Surat dengan argumen identik diambil dari cache PDF lintas
+    # sesi (pdf_cache.py); waktu build-nya tercatat sebagai pdf_letterhead /
+    # pdf_apcs.
+    def pdf_jobs():
+        egd, colo, apcs = hasil["egd"], hasil["colo"], hasil["apcs"]
+        pdf_letterhead = partial(
+            cached_pdf,
+            "letterhead",
+            build_pdf_letterhead,
+            name=name or "",
+            age=int(age),
+            sex=sex,
+            today=today,
+            v_egd=egd.text,
+            a_egd=egd.advice,
+            r_egd=hasil["egd_sel"],
+            gerd_q_summary=hasil["gerdq"].summary,
+            v_colo=colo.text,   # gunakan verdikt murni gejala untuk PDF
+            a_colo=colo.advice,
+            r_colo=hasil["colo_sel"],
+            logo_rs_path=logo_kariadi,
+            logo_isi_path=logo_isi,
+            response_code=hasil["kode"],
         )
-    with col_pdf2:
-        st.download_button(
-            "⬇️ Unduh Surat Hasil Risiko Kanker Kolorektal (APCS)",
-            data=pdf_apcs_bytes,
-            file_name=f"Hasil_APCS_{today.replace(' ','_')}.pdf",
-            mime="application/pdf",
+
+        pdf_apcs = partial(
+            cached_pdf,
+            "apcs",
+            build_pdf_apcs,
+            name=name or "",
+            age=int(age),
+            sex=sex,
+            today=today,
+            score_apcs=apcs.score,
+            kategori_apcs=apcs.label,
+            pesan_apcs=apcs.text,
+            logo_rs_path=logo_kariadi,
+            logo_isi_path=logo_isi,
+            response_code=hasil["kode"],
         )
+        return {"letterhead": pdf_letterhead, "apcs": pdf_apcs}
+
+    # Klik unduh pertama memulai kedua build sekaligus di pool PDF bersama
+    # (konkurensi & antrean dibatasi, lihat render_pool.py)
+    pdf_docs = LiveDocumentSet(pdf_jobs)
+
+    with timings.section("downloads"):
+        col_pdf1, col_pdf2 = st.columns(2)
+        with col_pdf1:
+            st.download_button(
+                "⬇️ Unduh Surat Hasil Endoskopi (PDF)",
+                data=pdf_docs.getter("letterhead"),
+                file_name=f"Hasil_Skrining_ISI_PERUT_{today.replace(' ','_')}.pdf",
+                mime="application/pdf",
+                on_click="ignore",
+            )
+        with col_pdf2:
+            st.download_button(
+                "⬇️ Unduh Surat Hasil Risiko Kanker Kolorektal (APCS)",
+                data=pdf_docs.getter("apcs"),
+                file_name=f"Hasil_APCS_{today.replace(' ','_')}.pdf",
+                mime="application/pdf",
+                on_click="ignore",
+            )
 else:
     st.info(
         "Fitur unduh PDF membutuhkan paket **reportlab**.\n\n"
         "Tambahkan file `requirements.txt` dengan isi:\n"
-        "`streamlit>=1.37` dan `reportlab>=3.6.12`, lalu deploy ulang.",
+        "`streamlit>=1.52` dan `reportlab>=3.6.12`, lalu deploy ulang.",
         icon="ℹ️",
     )
 
@@ -980,3 +613,29 @@ st.markdown("---")
 st.caption(
     "© 2025 | Aplikasi edukasi oleh **dr. Danu Kamajaya, Sp.PD** – RSUP Dr. Kariadi Semarang – Versi Awam"
 )
+
+# ------------------ PANEL DEBUG (?debug=1) ------------------
+timings.finish()
+
+if st.query_params.get("debug") == "1":
+    with st.expander("🛠️ Debug: waktu per bagian", expanded=True):
+        rows = "\n".join(
+            f"| {k} | {v:.1f} |" for k, v in timings.sections.items()
+        )
+        st.markdown(f"**Rerun ini**\n\n| bagian | ms |\n|---|---:|\n{rows}")
+
+        snap = get_registry().snapshot()
+        rows = "\n".join(
+            f"| {k} | {h['count']} | {h['p50_ms']:.1f} | {h['p90_ms']:.1f} | {h['p99_ms']:.1f} | {h['max_ms']:.1f} |"
+            for k, h in snap["sections"].items()
+        )
+        st.markdown(
+            f"**Seluruh sesi** (proses ini, {snap['uptime_s']:.0f} detik)\n\n"
+            f"| bagian | n | p50 | p90 | p99 | maks |\n|---|---:|---:|---:|---:|---:|\n{rows}"
+        )
+        st.json(snap["counters"])
+        if pdf_queue.ENABLED:
+            st.caption(f"Antrean PDF ({pdf_queue.QUEUE_DB}): {pdf_queue.get_queue().stats()}")
+        st.caption(f"Kode respons: {response_code.display(hasil['kode'])}")
+        if manifest.missing:
+            st.warning("Aset tidak ditemukan: " + ", ".join(manifest.missing))
@@ -0,0 +1,138 @@
+# assets.py — ISI PERUT
+# Manifest aset gambar (logo & ilustrasi) yang di-resolve sekali per proses:
+# path, ukuran berkas, SHA-256 isi, dan dimensi hasil decode. Dipakai bersama
+# oleh halaman (app.py), varian web (web_images.py), dan logo PDF
+# (pdf_images.py), sehingga rerun tidak lagi mem-probe filesystem satu per
+# satu dan aset yang hilang langsung ketahuan saat proses mulai.
+#
+#   python assets.py    # cetak manifest; keluar dengan kode 1 bila ada yang hilang
+
+import hashlib
+import logging
+import sys
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image as PILImage
+
+ASSET_DIR = Path(__file__).resolve().parent
+
+# nama aset -> kandidat nama berkas (yang pertama ada dipakai)
+CANDIDATES = {
+    "logo_header": ("logo_header.png", "Logo_Header.png"),
+    "logo_kariadi": ("logo_kariadi.png",),
+    "logo_isi": ("logo_isi_perut.png",),
+    "ilustrasi_endoskopi": ("ilustrasi_endoskopi.png", "ilustrasi_endoskopi.jpg"),
+    "ilustrasi_egd": ("ilustrasi_egd.png",),
+    "ilustrasi_kolonoskopi": ("ilustrasi_kolonoskopi.png",),
+}
+
+log = logging.getLogger("isi_perut.assets")
+
+
+class Asset(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    width: int
+    height: int
+
+
+def describe(path) -> Asset:
+    """Baca satu berkas gambar menjadi Asset (hash isi + dimensi)."""
+    p = Path(path).resolve()
+    st = p.stat()
+    data = p.read_bytes()
+    with PILImage.open(p) as im:  # hanya header; piksel tidak di-decode
+        width, height = im.size
+    return Asset(str(p), st.st_size, st.st_mtime_ns, hashlib.sha256(data).hexdigest(), width, height)
+
+
+class Manifest:
+    """Aset yang ditemukan di `directory`, plus daftar yang tidak ada."""
+
+    def __init__(self, directory=ASSET_DIR, candidates=CANDIDATES):
+        self.directory = Path(directory)
+        self.assets: dict[str, Asset] = {}
+        self.missing: list[str] = []
+        for name, files in candidates.items():
+            found = next((self.directory / f for f in files if (self.directory / f).is_file()), None)
+            if found is None:
+                self.missing.append(name)
+            else:
+                self.assets[name] = describe(found)
+        self._by_path = {a.path: a for a in self.assets.values()}
+        self.dir_mtime_ns = self.directory.stat().st_mtime_ns
+
+    def path(self, name: str) -> str | None:
+        """Path absolut aset `name`, atau None bila tidak ada."""
+        asset = self.assets.get(name)
+        return asset.path if asset else None
+
+    def by_path(self, path) -> Asset | None:
+        return self._by_path.get(str(path)) or self._by_path.get(str(Path(path).resolve()))
+
+
+_lock = threading.Lock()
+_extra: dict[tuple, Asset] = {}  # berkas di luar manifest: (path, mtime_ns, size) -> Asset
+
+
+@lru_cache(maxsize=1)
+def get_manifest() -> Manifest:
+    """Manifest bersama per proses; aset yang hilang dicatat di log sekali."""
+    manifest = Manifest()
+    for name in manifest.missing:
+        log.warning("aset %s tidak ditemukan (dicari: %s)", name, ", ".join(CANDIDATES[name]))
+    return manifest
+
+
+def current_manifest() -> Manifest:
+    """
+    Bangun ulang manifest bila isi direktori aset berubah (berkas ditambah,
+    dihapus, atau diganti lewat rename). Satu stat per panggilan.
+    """
+    manifest = get_manifest()
+    if manifest.directory.stat().st_mtime_ns != manifest.dir_mtime_ns:
+        with _lock:
+            get_manifest.cache_clear()
+            manifest = get_manifest()
+    return manifest
+
+
+def lookup(path) -> Asset | None:
+    """
+    Asset untuk `path`: dari manifest bila termasuk aset aplikasi (tanpa
+    stat), selain itu dibaca & di-memo per (path, mtime, ukuran).
+    None bila `path` kosong atau berkasnya tidak ada.
+    """
+    if not path:
+        return None
+    asset = get_manifest().by_path(path)
+    if asset is not None:
+        return asset
+    p = Path(path).resolve()
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    key = (str(p), st.st_mtime_ns, st.st_size)
+    asset = _extra.get(key)
+    if asset is None:
+        asset = _extra[key] = describe(p)
+    return asset
+
+
+def main():
+    manifest = get_manifest()
+    for name, a in manifest.assets.items():
+        print(f"{name:22} {Path(a.path).name:28} {a.width:5}x{a.height:<5} {a.size / 1024:7.0f} KiB  {a.sha256[:12]}")
+    for name in manifest.missing:
+        print(f"{name:22} TIDAK ADA ({', '.join(CANDIDATES[name])})")
+    return 1 if manifest.missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+# batch.py — ISI PERUT
+# Skrining massal tanpa UI: baca CSV/JSONL jawaban pasien, tulis satu berkas
+# hasil, dan (opsional) surat PDF per pasien secara paralel — sebagai berkas
+# terpisah, satu arsip ZIP, atau PDF gabungan per jilid. Tiap surat dirender
+# sekali; bytes yang sama dipakai semua keluaran yang diminta.
+#
+#   python batch.py pasien.csv -o hasil.csv
+#   python batch.py pasien.jsonl -o hasil.jsonl --pdf-dir surat/ --workers 8
+#   python batch.py pasien.csv -o hasil.csv --zip surat.zip --merged surat.pdf
+#
+# Kolom masukan mengikuti key widget di app.py:
+#   name, age, sex, gerdq1..gerdq6, egd_alarm_0..6, colo_alarm_0..4,
+#   colo_risk_0..4, colo_other_0..4, family_history, smoker, [today]
+# Jawaban GERD-Q boleh teks ("2–3 hari") atau indeks 0–3; checklist bernilai
+# 1/0, ya/tidak, true/false. age & sex wajib diisi; kolom lain yang kosong
+# dianggap jawaban bawaan UI. Kolom yang tidak dikenal ditolak (salah ketik
+# nama kolom tidak boleh diam-diam menjadi jawaban "tidak").
+# Berkas hasil & surat memuat kode respons pasien (response_code.py) untuk
+# membuka jawabannya di aplikasi lewat ?kode=...
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+
+from assets import get_manifest
+from bundle import (
+    DEFAULT_VOLUME_SIZE,
+    VolumeWriter,
+    ZipBundleWriter,
+    bounded_map,
+)
+from cohort import APCS_CATEGORIES, VERDICT_LABELS, arrays_from_inputs, score_cohort
+from response_code import display, encode as response_code
+from scoring import (
+    ALARM_COLO,
+    ALARM_EGD,
+    GERDQ_OPTIONS,
+    OTHER_COLO,
+    RISK_COLO,
+    SEX_OPTIONS,
+    SMOKE_OPTIONS,
+    ScreeningInput,
+    ScreeningResult,
+    screen,
+)
+
+LOGOS = dict(
+    logo_rs_path=get_manifest().path("logo_kariadi"),
+    logo_isi_path=get_manifest().path("logo_isi"),
+)
+
+SEX_ALIASES = {"l": "laki-laki", "p": "perempuan"}
+TRUTHY = {"1", "true", "ya", "y", "yes", "x", "v", "✓", "ada"}
+
+CHECKLISTS = (
+    ("egd_alarm", ALARM_EGD),
+    ("colo_alarm", ALARM_COLO),
+    ("colo_risk", RISK_COLO),
+    ("colo_other", OTHER_COLO),
+)
+
+GERDQ_FIELDS = tuple(f"gerdq{i}" for i in range(1, 7))
+FIELDS = (
+    "name",
+    "age",
+    "sex",
+    *GERDQ_FIELDS,
+    *(f"{prefix}_{i}" for prefix, catalog in CHECKLISTS for i in range(len(catalog))),
+    "family_history",
+    "smoker",
+    "today",
+)
+REQUIRED_FIELDS = ("age", "sex")
+NUMBER_FIELDS = frozenset(("age", *GERDQ_FIELDS))  # true/false bukan angka
+TEXT_FIELDS = frozenset(("name", "today"))
+
+
+# ------------------ MEMBACA MASUKAN ------------------
+def read_rows(path: Path):
+    """Baris masukan sebagai dict, dari CSV atau JSONL (menurut ekstensi)."""
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+
+
+def _blank(v) -> bool:
+    return v is None or (isinstance(v, str) and not v.strip())
+
+
+def _truthy(v) -> bool:
+    if isinstance(v, bool):
+        return v
+    if _blank(v):
+        return False
+    return str(v).strip().lower() in TRUTHY
+
+
+def _age(v) -> int:
+    age = int(float(v))
+    if not 0 <= age <= 120:
+        raise ValueError(f"usia harus 0–120, diterima {age}")
+    return age
+
+
+def _gerdq_answer(v) -> int:
+    if _blank(v):
+        return 0
+    s = str(v).strip()
+    if s in GERDQ_OPTIONS:
+        return GERDQ_OPTIONS.index(s)
+    idx = int(s)
+    if not 0 <= idx <= 3:
+        raise ValueError(f"jawaban GERD-Q harus 0–3, diterima {s!r}")
+    return idx
+
+
+def _sex(v) -> str:
+    s = str(v).strip().lower()
+    s = SEX_ALIASES.get(s, s)
+    for opt in SEX_OPTIONS:
+        if s == opt.lower():
+            return opt
+    raise ValueError(f"jenis kelamin tidak dikenal: {v!r}")
+
+
+def _field(row: dict, key: str, convert):
+    # Galat konversi selalu menyebut nama kolomnya
+    try:
+        return convert(row.get(key))
+    except (ValueError, TypeError, OverflowError) as exc:  # usia 1e400 -> OverflowError
+        raise ValueError(f"kolom {key!r}: {exc}") from None
+
+
+def check_fields(row: dict, fields=FIELDS, required=REQUIRED_FIELDS) -> None:
+    """
+    ValueError bila ada kolom tidak dikenal, nilai bukan skalar (objek/daftar),
+    true/false di kolom angka, nilai bukan teks di kolom teks, atau kolom
+    wajib yang kosong.
+    """
+    unknown = [k for k in row if k not in fields]
+    if unknown:
+        raise ValueError(f"kolom tidak dikenal: {', '.join(map(repr, unknown))}")
+    for key, v in row.items():
+        if v is None:
+            continue
+        if not isinstance(v, (str, int, float)):
+            raise ValueError(f"kolom {key!r}: harus teks atau angka, diterima {type(v).__name__}")
+        if isinstance(v, bool) and key in NUMBER_FIELDS:
+            raise ValueError(f"kolom {key!r}: harus angka, diterima {json.dumps(v)}")
+        if not isinstance(v, str) and key in TEXT_FIELDS:
+            raise ValueError(f"kolom {key!r}: harus teks, diterima {type(v).__name__}")
+    for key in required:
+        if _blank(row.get(key)):
+            raise ValueError(f"kolom {key!r} wajib diisi")
+
+
+def parse_row(row: dict) -> tuple[str, str | None, ScreeningInput]:
+    """(nama, tanggal, ScreeningInput) dari satu baris masukan (lihat check_fields)."""
+    check_fields(row)
+    smoker = row.get("smoker")
+    selected = {
+        prefix: tuple(
+            q for i, q in enumerate(catalog) if _truthy(row.get(f"{prefix}_{i}"))
+        )
+        for prefix, catalog in CHECKLISTS
+    }
+    inp = ScreeningInput(
+        age=_field(row, "age", _age),
+        sex=_field(row, "sex", _sex),
+        gerdq_answers=tuple(_field(row, key, _gerdq_answer) for key in GERDQ_FIELDS),
+        family_history=_truthy(row.get("family_history")),
+        smoker=smoker == SMOKE_OPTIONS[1] or _truthy(smoker),
+        **selected,
+    )
+    today = None if _blank(row.get("today")) else row["today"].strip()
+    return (row.get("name") or "").strip(), today, inp
+
+
+# ------------------ PDF (dijalankan di proses worker) ------------------
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")[:40] or "pasien"
+
+
+def pdf_names(row_no: int, name: str) -> tuple[str, str]:
+    stem = f"{row_no:05d}_{_slug(name)}"
+    return f"Hasil_Skrining_ISI_PERUT_{stem}.pdf", f"Hasil_APCS_{stem}.pdf"
+
+
+def pdf_kwargs(name: str, today: str, inp: ScreeningInput) -> tuple[dict, dict]:
+    """Argumen surat hasil skrining & surat APCS (tanpa logo) untuk satu pasien."""
+    res = screen(inp)
+    code = response_code(inp)
+    letter = dict(
+        name=name,
+        age=inp.age,
+        sex=inp.sex,
+        today=today,
+        v_egd=res.egd.text,
+        a_egd=res.egd.advice,
+        r_egd=res.r_egd,
+        gerd_q_summary=res.gerdq.summary,
+        v_colo=res.colo.text,
+        a_colo=res.colo.advice,
+        r_colo=res.r_colo,
+        response_code=code,
+    )
+    apcs = dict(
+        name=name,
+        age=inp.age,
+        sex=inp.sex,
+        today=today,
+        score_apcs=res.apcs.score,
+        kategori_apcs=res.apcs.kategori,
+        pesan_apcs=res.apcs.pesan,
+        response_code=code,
+    )
+    return letter, apcs
+
+
+def render_documents(name: str, today: str, inp: ScreeningInput) -> tuple[bytes, bytes]:
+    """Kedua surat PDF untuk satu pasien: (surat hasil skrining, surat APCS)."""
+    from pdf_report import build_pdf_apcs, build_pdf_letterhead
+
+    letter, apcs = pdf_kwargs(name, today, inp)
+    return build_pdf_letterhead(**letter, **LOGOS), build_pdf_apcs(**apcs, **LOGOS)
+
+
+def _warm_worker():
+    # Siapkan kop surat & turunan logo sekali per proses worker
+    from pdf_report import get_letterhead
+
+    get_letterhead(LOGOS["logo_rs_path"], LOGOS["logo_isi_path"])
+
+
+def _render_pdfs(job) -> tuple[tuple[str, str], tuple[bytes, bytes]]:
+    row_no, name, today, inp = job
+    return pdf_names(row_no, name), render_documents(name, today, inp)
+
+
+def default_workers() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # bukan Linux
+        return os.cpu_count() or 1
+
+
+# ------------------ HASIL ------------------
+RESULT_FIELDS = [
+    "row",
+    "name",
+    "age",
+    "sex",
+    "kode",
+    "gerdq_score",
+    "gerdq_positive",
+    "apcs_score",
+    "apcs_kategori",
+    "egd_verdict",
+    "colo_verdict",
+    "pdf_letterhead",
+    "pdf_apcs",
+]
+
+
+def result_record(name: str, inp: ScreeningInput, res: ScreeningResult) -> dict:
+    """Satu baris hasil (tanpa kolom row & PDF) dari screen()."""
+    return {
+        "name": name,
+        "age": inp.age,
+        "sex": inp.sex,
+        "kode": display(response_code(inp)),
+        "gerdq_score": res.gerdq.score,
+        "gerdq_positive": res.gerdq.positive,
+        "apcs_score": res.apcs.score,
+        "apcs_kategori": res.apcs.kategori,
+        "egd_verdict": res.egd.label,
+        "colo_verdict": res.colo.label,
+    }
+
+
+def result_records(names: list[str], inputs: list[ScreeningInput], res):
+    """Baris hasil dari score_cohort(), urut masukan; kolomnya sama dengan result_record()."""
+    for i, inp in enumerate(inputs):
+        yield {
+            "name": names[i],
+            "age": inp.age,
+            "sex": inp.sex,
+            "kode": display(response_code(inp)),
+            "gerdq_score": int(res.gerdq_score[i]),
+            "gerdq_positive": bool(res.gerdq_positive[i]),
+            "apcs_score": int(res.apcs_score[i]),
+            "apcs_kategori": APCS_CATEGORIES[res.apcs_category[i]],
+            "egd_verdict": VERDICT_LABELS[res.egd_verdict[i]],
+            "colo_verdict": VERDICT_LABELS[res.colo_verdict[i]],
+        }
+
+
+def write_results(path: Path, records):
+    if path.suffix.lower() in (".jsonl", ".ndjson"):
+        with open(path, "w", encoding="utf-8") as f:
+            for rec in records:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            w.writeheader()
+            w.writerows(records)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Skrining ISI PERUT massal dari CSV/JSONL (tanpa Streamlit)."
+    )
+    ap.add_argument("input", type=Path, help="berkas jawaban pasien (.csv / .jsonl)")
+    ap.add_argument("-o", "--output", type=Path, required=True,
+                    help="berkas hasil (.csv / .jsonl)")
+    ap.add_argument("--pdf-dir", type=Path,
+                    help="buat surat PDF per pasien di direktori ini")
+    ap.add_argument("--zip", type=Path,
+                    help="kumpulkan surat PDF per pasien ke arsip ZIP ini")
+    ap.add_argument("--merged", type=Path,
+                    help="gabungkan surat semua pasien ke PDF ini (per jilid)")
+    ap.add_argument("--volume-size", type=int, default=DEFAULT_VOLUME_SIZE,
+                    help=f"pasien per jilid PDF gabungan (bawaan: {DEFAULT_VOLUME_SIZE})")
+    ap.add_argument("--workers", type=int, default=default_workers(),
+                    help="jumlah proses pembuat PDF (bawaan: jumlah core)")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    today_default = datetime.today().strftime("%d %b %Y")
+    names, dates, inputs = [], [], []
+    for row_no, row in enumerate(read_rows(args.input), start=1):
+        try:
+            name, today, inp = parse_row(row)
+        except ValueError as e:
+            ap.exit(2, f"{args.input}: baris {row_no}: {e}\n")
+        names.append(name)
+        dates.append(today or today_default)
+        inputs.append(inp)
+
+    res = score_cohort(**arrays_from_inputs(inputs)) if inputs else None
+
+    pdf_files = [("", "")] * len(inputs)
+    rows = list(zip(range(1, len(inputs) + 1), names, dates, inputs))
+    workers = max(1, args.workers)
+    window = workers * 4  # tugas yang boleh antre / hasil yang boleh menunggu
+
+    if inputs and (args.pdf_dir or args.zip or args.merged):
+        # Tiap surat dirender sekali; bytes yang sama dikirim ke semua keluaran
+        with ExitStack() as stack:
+            if args.pdf_dir:
+                args.pdf_dir.mkdir(parents=True, exist_ok=True)
+            z = stack.enter_context(ZipBundleWriter(args.zip)) if args.zip else None
+            volumes = (
+                stack.enter_context(VolumeWriter(args.merged, len(rows), args.volume_size))
+                if args.merged else None
+            )
+            ex = stack.enter_context(ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker))
+            for i, (arcnames, docs) in enumerate(bounded_map(ex, _render_pdfs, rows, window)):
+                for arcname, data in zip(arcnames, docs):
+                    if args.pdf_dir:
+                        (args.pdf_dir / arcname).write_bytes(data)
+                    if z is not None:
+                        z.add(arcname, data)
+                if volumes is not None:
+                    vol = volumes.add(docs)
+                pdf_files[i] = arcnames if args.pdf_dir or args.zip else (vol, vol)
+
+    records = (
+        dict(row=i + 1, **rec, pdf_letterhead=pdf_files[i][0], pdf_apcs=pdf_files[i][1])
+        for i, rec in enumerate(result_records(names, inputs, res))
+    )
+    write_results(args.output, records)
+
+    print(
+        f"{len(inputs)} pasien diskrining dalam {time.perf_counter() - t0:.1f} s"
+        + "".join(
+            f"; {label} {path}"
+            for label, path in (
+                ("PDF di", args.pdf_dir),
+                ("ZIP", args.zip),
+                ("PDF gabungan", args.merged),
+            )
+            if path
+        ),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
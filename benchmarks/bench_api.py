@@ -0,0 +1,129 @@
+# bench_api.py — throughput & latensi layanan HTTP api.py (ISI PERUT)
+#
+# Menjalankan `python api.py --workers N` di port bebas, lalu beberapa proses
+# klien (koneksi keep-alive masing-masing) mengirim permintaan secepatnya
+# selama --seconds detik. Dicetak: permintaan/detik dan persentil latensi.
+#
+# Jalankan dari root repo:
+#   python benchmarks/bench_api.py --workers 4 --clients 8
+#   python benchmarks/bench_api.py --endpoint /score/batch --batch 1000
+#
+# Klien berbagi core dengan server: di mesin dengan sedikit core angkanya
+# batas bawah.
+
+import argparse
+import http.client
+import json
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def random_response(rng: random.Random) -> dict:
+    row = {
+        "age": rng.randint(18, 90),
+        "sex": rng.choice(["L", "P"]),
+        "family_history": rng.random() < 0.1,
+        "smoker": rng.random() < 0.3,
+    }
+    row.update({f"gerdq{i}": rng.randint(0, 3) for i in range(1, 7)})
+    for prefix, n in (("egd_alarm", 7), ("colo_alarm", 5), ("colo_risk", 5), ("colo_other", 5)):
+        row.update({f"{prefix}_{i}": 1 for i in range(n) if rng.random() < 0.1})
+    return row
+
+
+def client(args) -> list[float]:
+    """Satu klien keep-alive; latensi (ms) tiap permintaan."""
+    port, endpoint, batch, seconds, seed = args
+    rng = random.Random(seed)
+    if batch:
+        bodies = [json.dumps({"responses": [random_response(rng) for _ in range(batch)]})]
+    else:
+        bodies = [json.dumps(random_response(rng)) for _ in range(256)]
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Content-Type": "application/json"}
+    lat = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        conn.request("POST", endpoint, bodies[i % len(bodies)], headers)
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status != 200:
+            raise SystemExit(f"{endpoint}: HTTP {resp.status}")
+        lat.append((time.perf_counter() - t0) * 1000)
+        i += 1
+    conn.close()
+    return lat
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/healthz")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit("api.py tidak menjawab /healthz")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark layanan HTTP api.py")
+    ap.add_argument("--workers", type=int, default=2, help="worker api.py (bawaan 2)")
+    ap.add_argument("--clients", type=int, default=4, help="proses klien (bawaan 4)")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--endpoint", default="/score", choices=["/score", "/score/batch", "/pdf/letterhead"])
+    ap.add_argument("--batch", type=int, default=0, help="respons per permintaan /score/batch")
+    args = ap.parse_args()
+    if args.endpoint == "/score/batch" and not args.batch:
+        args.batch = 1000
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, str(ROOT / "api.py"), "--port", str(port), "--workers", str(args.workers)],
+        cwd=ROOT,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        jobs = [(port, args.endpoint, args.batch, args.seconds, seed) for seed in range(args.clients)]
+        with ProcessPoolExecutor(args.clients) as ex:
+            t0 = time.perf_counter()
+            lat = [ms for part in ex.map(client, jobs) for ms in part]
+            elapsed = time.perf_counter() - t0
+    finally:
+        server.terminate()
+        server.wait(10)
+
+    lat.sort()
+    per = args.batch or 1
+    print(f"{args.endpoint} — {args.workers} worker, {args.clients} klien, {elapsed:.1f} s")
+    print(f"  permintaan/detik : {len(lat) / elapsed:10.0f}")
+    if args.batch:
+        print(f"  respons/detik    : {len(lat) * per / elapsed:10.0f}  ({per} per permintaan)")
+    print(
+        f"  latensi ms       : p50 {statistics.median(lat):.2f}  "
+        f"p90 {lat[int(len(lat) * 0.9)]:.2f}  p99 {lat[int(len(lat) * 0.99)]:.2f}  maks {lat[-1]:.2f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
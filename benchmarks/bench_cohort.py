@@ -0,0 +1,89 @@
+# bench_cohort.py — skoring kohort vektor (cohort.py) vs jalur interaktif
+#
+# Membangkitkan kohort acak, memastikan hasil score_cohort() identik dengan
+# scoring.screen() per baris, lalu membandingkan waktunya.
+#
+# Jalankan dari root repo:
+#   python benchmarks/bench_cohort.py --rows 50000
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cohort import (  # noqa: E402
+    APCS_CATEGORIES,
+    arrays_from_inputs,
+    score_cohort,
+    verdict_for_class,
+)
+from scoring import (  # noqa: E402
+    ALARM_COLO,
+    ALARM_EGD,
+    ORGAN_COLO,
+    ORGAN_EGD,
+    OTHER_COLO,
+    RISK_COLO,
+    SEX_OPTIONS,
+    ScreeningInput,
+    screen,
+)
+
+
+def random_inputs(n: int, seed: int = 0) -> list[ScreeningInput]:
+    rng = np.random.default_rng(seed)
+
+    def pick(catalog, p):
+        return tuple(q for q in catalog if rng.random() < p)
+
+    return [
+        ScreeningInput(
+            age=int(rng.integers(18, 95)),
+            sex=SEX_OPTIONS[rng.integers(0, 3)],
+            gerdq_answers=tuple(int(a) for a in rng.integers(0, 4, 6)),
+            egd_alarm=pick(ALARM_EGD, 0.05),
+            colo_alarm=pick(ALARM_COLO, 0.05),
+            colo_risk=pick(RISK_COLO, 0.1),
+            colo_other=pick(OTHER_COLO, 0.1),
+            family_history=bool(rng.random() < 0.2),
+            smoker=bool(rng.random() < 0.3),
+        )
+        for _ in range(n)
+    ]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rows", type=int, default=50_000)
+    args = ap.parse_args()
+
+    inputs = random_inputs(args.rows)
+    arrays = arrays_from_inputs(inputs)
+
+    t0 = time.perf_counter()
+    ref = [screen(inp) for inp in inputs]
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    res = score_cohort(**arrays)
+    t_vec = time.perf_counter() - t0
+
+    for i, r in enumerate(ref):
+        assert res.gerdq_score[i] == r.gerdq.score, i
+        assert res.gerdq_positive[i] == r.gerdq.positive, i
+        assert res.apcs_score[i] == r.apcs.score, i
+        assert APCS_CATEGORIES[res.apcs_category[i]] == r.apcs.kategori, i
+        assert verdict_for_class(res.egd_verdict[i], ORGAN_EGD) == r.egd, i
+        assert verdict_for_class(res.colo_verdict[i], ORGAN_COLO) == r.colo, i
+
+    print(f"{args.rows} baris — hasil identik dengan scoring.screen()")
+    print(f"  loop per baris : {t_loop * 1000:8.1f} ms")
+    print(f"  score_cohort   : {t_vec * 1000:8.1f} ms  ({t_loop / t_vec:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
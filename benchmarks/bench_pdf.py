@@ -0,0 +1,92 @@
+# bench_pdf.py — ukur biaya build per PDF (surat hasil skrining & APCS)
+#
+# "tanpa cache" membangun ulang stylesheet + kop surat di setiap dokumen
+# (perilaku lama); "dengan cache" memakai LetterheadTemplate bersama.
+# Turunan logo (pdf_images) sudah hangat di kedua mode. Sampel memuat kode
+# respons (QR); "kode baru" = dengan cache, tetapi QR-nya belum pernah
+# di-encode (pasien baru).
+#
+# Jalankan dari root repo:
+#   python benchmarks/bench_pdf.py --runs 50
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import pdf_report  # noqa: E402
+
+LOGO_RS = str(ROOT / "logo_kariadi.png")
+LOGO_ISI = str(ROOT / "logo_isi_perut.png")
+
+SAMPLE_LETTERHEAD = dict(
+    name="Pasien Contoh",
+    age=56,
+    sex="Laki-laki",
+    today="17 Oct 2026",
+    v_egd="🔴 Anda **perlu endoskopi saluran cerna atas (EGD) segera**",
+    a_egd="Segera konsultasi ke dokter penyakit dalam atau IGD.",
+    r_egd=["Berat badan saya **turun tanpa sebab jelas**."],
+    gerd_q_summary="Skor GERD-Q 9 (≥8) – hasil mengarah ke penyakit refluks asam lambung (GERD).",
+    v_colo="🟢 Anda **dapat menjadwalkan kolonoskopi (saluran cerna bawah) (elektif)**",
+    a_colo="Buat janji di poliklinik untuk pemeriksaan dan penilaian lebih lanjut.",
+    r_colo=["**Diare kronik** (>4 minggu) tanpa penyebab jelas."],
+    logo_rs_path=LOGO_RS,
+    logo_isi_path=LOGO_ISI,
+    response_code="4000-0002-T1V",
+)
+
+SAMPLE_APCS = dict(
+    name="Pasien Contoh",
+    age=56,
+    sex="Laki-laki",
+    today="17 Oct 2026",
+    score_apcs=4,
+    kategori_apcs="Risiko Tinggi (4–7)",
+    pesan_apcs="Anda termasuk kelompok risiko tinggi kanker kolorektal.",
+    logo_rs_path=LOGO_RS,
+    logo_isi_path=LOGO_ISI,
+    response_code="4000-0002-T1V",
+)
+
+CASES = [
+    ("letterhead", pdf_report.build_pdf_letterhead, SAMPLE_LETTERHEAD),
+    ("apcs", pdf_report.build_pdf_apcs, SAMPLE_APCS),
+]
+
+
+def timed(fn, kwargs, runs, cold, new_code=False) -> list[float]:
+    times = []
+    for _ in range(runs):
+        if cold:
+            pdf_report.get_letterhead.cache_clear()
+        if new_code:
+            pdf_report.qr_path.cache_clear()
+        t0 = time.perf_counter()
+        fn(**kwargs)
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--runs", type=int, default=50)
+    args = ap.parse_args()
+
+    for label, fn, kwargs in CASES:
+        fn(**kwargs)  # pemanasan: turunan logo, font, dsb.
+        cold = statistics.median(timed(fn, kwargs, args.runs, cold=True))
+        warm = statistics.median(timed(fn, kwargs, args.runs, cold=False))
+        new = statistics.median(timed(fn, kwargs, args.runs, cold=False, new_code=True))
+        print(
+            f"{label:<11} tanpa cache {cold:7.2f} ms | dengan cache {warm:7.2f} ms "
+            f"| hemat {cold - warm:6.2f} ms ({(cold - warm) / cold:5.1%}) | kode baru {new:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# bench_rerun.py — suite benchmark rerun app.py (ISI PERUT) memakai AppTest
+#
+# Tiap skenario meniru urutan interaksi pengguna sungguhan (isi GERD-Q,
+# centang gejala EGD/kolonoskopi, ubah usia untuk APCS, unduh PDF) dan
+# mencatat per langkah: waktu dinding, waktu CPU, dan alokasi memori
+# (puncak & yang masih tertahan setelah rerun, diukur di putaran terpisah dengan tracemalloc supaya
+# tidak mengganggu pengukuran waktu).
+#
+# Catatan: expander di Streamlit dibuka/ditutup di browser saja; AppTest
+# selalu merender isinya, jadi "membuka expander GERD-Q" = menjawab radio
+# di dalamnya. AppTest juga selalu menjalankan script penuh (klik di dalam
+# st.fragment tetap diukur sebagai rerun penuh), jadi angka di sini adalah
+# batas atas biaya per interaksi.
+#
+# Jalankan dari root repo:
+#   python benchmarks/bench_rerun.py --rounds 5 --save-baseline
+#   (ubah CSS / expander / kode PDF ...)
+#   python benchmarks/bench_rerun.py --rounds 5 --threshold 1.25
+#
+# Keluar dengan kode 1 bila median langkah mana pun melebihi baseline ×
+# threshold, atau melebihi --budget-ms (batas absolut per rerun).
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import mock
+
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / "app.py"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / ".rerun_baseline.json"
+
+# app.py dijalankan AppTest di proses ini; pastikan modulnya (pdf_cache, ...)
+# sama dengan yang diimpor di sini.
+sys.path.insert(0, str(ROOT))
+
+# Ukur konfigurasi bawaan (tanpa pemanasan latar di proses app), apa pun isi
+# ISI_PERUT_WARMUP di shell
+os.environ.pop("ISI_PERUT_WARMUP", None)
+
+class _RecordingMediaFileManager(MediaFileManager):
+    """MediaFileManager AppTest yang diingat, agar unduhan (callable
+    tertunda) bisa dijalankan lewat jalur yang sama dengan server."""
+
+    last = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        type(self).last = self
+
+
+# ------------------ LANGKAH INTERAKSI ------------------
+def set_value(key, value):
+    def step(at):
+        _widget(at, key).set_value(value)
+        at.run()
+    return step
+
+
+def _widget(at, key):
+    for kind in ("radio", "checkbox", "number_input", "selectbox", "text_input"):
+        try:
+            return getattr(at, kind)(key=key)
+        except KeyError:
+            continue
+    raise KeyError(key)
+
+
+def set_age(value):
+    def step(at):
+        at.number_input[0].set_value(value)
+        at.run()
+    return step
+
+
+def download(index):
+    """Klik tombol unduh ke-`index`: jalankan callable PDF-nya sampai selesai."""
+
+    def step(at):
+        button = at.get("download_button")[index]
+        _RecordingMediaFileManager.last.execute_deferred(button.proto.deferred_file_id)
+    return step
+
+
+def cold_run(at):
+    at.run()
+
+
+SCENARIOS = {
+    "gerdq": [
+        ("gerdq1=1 hari", set_value("gerdq1", "1 hari")),
+        ("gerdq2=2–3 hari", set_value("gerdq2", "2–3 hari")),
+        ("gerdq3=4–7 hari", set_value("gerdq3", "4–7 hari")),
+        ("gerdq5=4–7 hari", set_value("gerdq5", "4–7 hari")),
+    ],
+    "egd": [
+        ("egd_alarm_0", set_value("egd_alarm_0", True)),
+        ("egd_alarm_3", set_value("egd_alarm_3", True)),
+        ("egd_alarm_0 off", set_value("egd_alarm_0", False)),
+    ],
+    "colo": [
+        ("colo_other_1", set_value("colo_other_1", True)),
+        ("colo_risk_2", set_value("colo_risk_2", True)),
+        ("colo_alarm_0", set_value("colo_alarm_0", True)),
+    ],
+    "apcs": [
+        ("usia 30", set_age(30)),
+        ("usia 50", set_age(50)),
+        ("usia 72", set_age(72)),
+    ],
+    "download": [
+        ("egd_alarm_1", set_value("egd_alarm_1", True)),
+        ("unduh surat", download(0)),
+        ("unduh APCS", download(1)),
+    ],
+}
+
+
+# ------------------ PENGUKURAN ------------------
+def _fresh_app() -> AppTest:
+    # PDF yang sama dari putaran sebelumnya tidak boleh ikut ter-cache
+    from pdf_cache import get_cache
+
+    get_cache().clear()
+    return AppTest.from_file(str(APP_PATH), default_timeout=60)
+
+
+def _timed(fn, at) -> dict:
+    w0, c0 = time.perf_counter(), time.process_time()
+    fn(at)
+    return {
+        "wall_ms": (time.perf_counter() - w0) * 1000,
+        "cpu_ms": (time.process_time() - c0) * 1000,
+    }
+
+
+def _traced(fn, at) -> dict:
+    tracemalloc.start()
+    try:
+        fn(at)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib": peak / 1024, "retained_kib": retained / 1024}
+
+
+def run_scenario(steps, measure) -> list[dict]:
+    """Satu putaran skenario dari sesi baru; langkah pertama selalu cold run."""
+    at = _fresh_app()
+    rows = [measure(cold_run, at)]
+    for _, fn in steps:
+        rows.append(measure(fn, at))
+        assert not at.exception, at.exception
+    return rows
+
+
+def run_suite(names, rounds: int, trace: bool = True) -> dict:
+    """
+    {"skenario/langkah": {"wall_ms": [...], "cpu_ms": [...], ...}} untuk
+    `rounds` putaran tiap skenario.
+    """
+    samples: dict[str, dict[str, list[float]]] = {}
+    with mock.patch("streamlit.testing.v1.app_test.MediaFileManager", _RecordingMediaFileManager):
+        # Impor modul & pemanasan proses tidak dihitung: "cold" = sesi baru
+        _fresh_app().run()
+        for name in names:
+            steps = SCENARIOS[name]
+            labels = [f"{name}/cold"] + [f"{name}/{label}" for label, _ in steps]
+            for _ in range(rounds):
+                passes = [run_scenario(steps, _timed)]
+                if trace:
+                    passes.append(run_scenario(steps, _traced))
+                for rows in passes:
+                    for label, row in zip(labels, rows):
+                        for metric, value in row.items():
+                            samples.setdefault(label, {}).setdefault(metric, []).append(value)
+    return samples
+
+
+def summarize(samples: dict) -> dict:
+    return {
+        label: {m: statistics.median(v) for m, v in metrics.items()}
+        for label, metrics in samples.items()
+    }
+
+
+def regressions(current: dict, baseline: dict, threshold: float, budget_ms: float | None):
+    """Daftar (langkah, metrik, sekarang, batas) yang melampaui batas."""
+    out = []
+    for label, metrics in current.items():
+        for metric, value in metrics.items():
+            base = baseline.get(label, {}).get(metric)
+            if base is not None and base > 0 and value > base * threshold:
+                out.append((label, metric, value, base * threshold))
+        if budget_ms is not None and not label.endswith("/cold"):
+            if metrics["wall_ms"] > budget_ms:
+                out.append((label, "wall_ms", metrics["wall_ms"], budget_ms))
+    return out
+
+
+def _kib(value) -> str:
+    return f"{value:7.0f}KiB" if value is not None else f"{'-':>10}"
+
+
+def print_table(current: dict, baseline: dict):
+    print(f"{'langkah':32} {'dinding':>9} {'CPU':>9} {'puncak':>10} {'tertahan':>10} {'vs baseline':>12}")
+    for label, m in current.items():
+        base = baseline.get(label, {}).get("wall_ms")
+        ratio = f"{m['wall_ms'] / base:>11.2f}x" if base else f"{'-':>12}"
+        print(
+            f"{label:32} {m['wall_ms']:7.1f}ms {m['cpu_ms']:7.1f}ms "
+            f"{_kib(m.get('peak_kib'))} {_kib(m.get('retained_kib'))} {ratio}"
+        )
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark rerun app.py dengan AppTest")
+    ap.add_argument("--rounds", type=int, default=5, help="putaran per skenario (bawaan 5)")
+    ap.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="jalankan skenario ini saja (boleh diulang)",
+    )
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="simpan hasil sebagai baseline baru")
+    ap.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="gagal bila median > baseline × threshold (bawaan 1.25)",
+    )
+    ap.add_argument("--budget-ms", type=float, help="batas absolut waktu dinding per rerun")
+    ap.add_argument("--no-trace", action="store_true", help="lewati putaran tracemalloc")
+    ap.add_argument("--json", type=Path, help="tulis semua sampel mentah ke file JSON")
+    args = ap.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    samples = run_suite(names, args.rounds, trace=not args.no_trace)
+    current = summarize(samples)
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+
+    print(f"rerun app.py — {args.rounds} putaran per skenario (median)")
+    print_table(current, baseline)
+
+    if args.json:
+        args.json.write_text(json.dumps(samples, indent=1))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, indent=1, sort_keys=True))
+        print(f"\nbaseline disimpan: {args.baseline}")
+        return 0
+
+    failed = regressions(current, baseline, args.threshold, args.budget_ms)
+    if failed:
+        print(f"\nREGRESI ({len(failed)}):")
+        for label, metric, value, limit in failed:
+            print(f"  {label:32} {metric:9} {value:9.1f} > {limit:9.1f}")
+        return 1
+    if not baseline:
+        print("\n(belum ada baseline; jalankan dengan --save-baseline)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+# bench_startup.py — waktu cold start app.py (ISI PERUT): dari proses Python
+# baru sampai halaman pertama selesai dirender
+#
+# Tiap putaran menjalankan proses baru (AppTest, cwd = root repo sehingga
+# .streamlit/config.toml ikut terbaca) dan mencatat:
+#   - impor   : proses mulai -> streamlit & AppTest selesai diimpor
+#   - render  : proses mulai -> run pertama app.py selesai (halaman lengkap)
+# Satu putaran tambahan dengan `python -X importtime` memberi rincian impor
+# tingkat atas terberat, dan memeriksa bahwa ReportLab TIDAK ikut termuat
+# sebelum ada yang mengunduh PDF (lihat pdf_loader.py).
+#
+# Jalankan dari root repo:
+#   python benchmarks/bench_startup.py --rounds 5 --save-baseline
+#   (ubah impor di app.py ...)
+#   python benchmarks/bench_startup.py --rounds 5 --threshold 1.25
+#
+# Keluar dengan kode 1 bila median melebihi baseline × threshold, melebihi
+# --budget-ms, atau ReportLab termuat saat cold start.
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / "app.py"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / ".startup_baseline.json"
+
+# Modul yang seharusnya baru dimuat saat PDF pertama dibangun
+LAZY_MODULES = ("reportlab", "pdf_report")
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+# ------------------ PROSES ANAK ------------------
+def child(t0: float) -> None:
+    """Dijalankan di proses baru: impor, render halaman, laporkan ke stdout."""
+    sys.path.insert(0, str(ROOT))
+    from streamlit.testing.v1 import AppTest
+
+    imported = time.time()
+    at = AppTest.from_file(str(APP_PATH), default_timeout=60).run()
+    rendered = time.time()
+    if at.exception:
+        raise SystemExit(f"app.py gagal: {at.exception}")
+    print(json.dumps({
+        "import_ms": (imported - t0) * 1000,
+        "render_ms": (rendered - t0) * 1000,
+        "lazy_loaded": [m for m in LAZY_MODULES if m in sys.modules],
+    }))
+
+
+def spawn(importtime: bool = False) -> tuple[dict, str]:
+    """Satu proses baru; (hasil anak, stderr)."""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    # Waktu mulai diambil sebelum proses dibuat: start-up interpreter ikut terhitung
+    t0 = time.time()
+    cmd += [__file__, "--child", repr(t0)]
+    # Konfigurasi bawaan, apa pun isi ISI_PERUT_WARMUP di shell
+    env = {k: v for k, v in os.environ.items() if k != "ISI_PERUT_WARMUP"}
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, env=env)
+    if proc.returncode:
+        raise SystemExit(proc.stderr[-2000:])
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
+
+
+def top_imports(stderr: str, limit: int) -> list[tuple[str, float]]:
+    """Impor tingkat atas (kedalaman 0) terberat dari keluaran -X importtime, ms kumulatif."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m and len(m.group(3)) == 1:
+            rows.append((m.group(4), int(m.group(2)) / 1000))
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:limit]
+
+
+# ------------------ PENGUKURAN ------------------
+def run_rounds(rounds: int) -> dict:
+    samples = {"import_ms": [], "render_ms": []}
+    lazy = set()
+    for _ in range(rounds):
+        result, _ = spawn()
+        for k in samples:
+            samples[k].append(result[k])
+        lazy.update(result["lazy_loaded"])
+    return {"samples": samples, "lazy_loaded": sorted(lazy)}
+
+
+def regressions(current: dict, baseline: dict, threshold: float, budget_ms: float | None):
+    out = []
+    for metric, value in current.items():
+        base = baseline.get(metric)
+        if base and value > base * threshold:
+            out.append((metric, value, base * threshold))
+    if budget_ms is not None and current["render_ms"] > budget_ms:
+        out.append(("render_ms", current["render_ms"], budget_ms))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark cold start app.py")
+    ap.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    ap.add_argument("--rounds", type=int, default=5, help="jumlah proses baru (bawaan 5)")
+    ap.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="simpan hasil sebagai baseline baru")
+    ap.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="gagal bila median > baseline × threshold (bawaan 1.25)",
+    )
+    ap.add_argument("--budget-ms", type=float, help="batas absolut waktu sampai halaman pertama")
+    ap.add_argument("--top", type=int, default=12, help="jumlah impor terberat yang dicetak")
+    args = ap.parse_args()
+
+    if args.child is not None:
+        child(args.child)
+        return 0
+
+    measured = run_rounds(args.rounds)
+    current = {k: statistics.median(v) for k, v in measured["samples"].items()}
+    _, stderr = spawn(importtime=True)
+
+    baseline = {}
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+
+    print(f"cold start app.py — {args.rounds} proses (median)")
+    for metric, value in current.items():
+        base = baseline.get(metric)
+        ratio = f"  {value / base:.2f}x baseline" if base else ""
+        print(f"  {metric:10} {value:8.0f} ms{ratio}")
+    print("\nimpor tingkat atas terberat (-X importtime, kumulatif):")
+    for name, ms in top_imports(stderr, args.top):
+        print(f"  {name:40} {ms:8.1f} ms")
+
+    failed = regressions(current, baseline, args.threshold, args.budget_ms)
+    if measured["lazy_loaded"]:
+        print(f"\nTERMUAT SAAT COLD START: {', '.join(measured['lazy_loaded'])}")
+        return 1
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, indent=1, sort_keys=True))
+        print(f"\nbaseline disimpan: {args.baseline}")
+        return 0
+    if failed:
+        print(f"\nREGRESI ({len(failed)}):")
+        for metric, value, limit in failed:
+            print(f"  {metric:10} {value:8.0f} > {limit:8.0f}")
+        return 1
+    if not baseline:
+        print("\n(belum ada baseline; jalankan dengan --save-baseline)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
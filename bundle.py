@@ -0,0 +1,278 @@
+# bundle.py — ISI PERUT
+# Penulis bundel surat untuk proses batch dengan memori terbatas.
+#
+# - ZipBundleWriter: tiap PDF langsung ditulis ke arsip ZIP di disk begitu
+#   selesai, sehingga tidak ada kumpulan bytes PDF yang menumpuk di RAM.
+# - VolumeWriter / MergedPdfWriter: surat yang sudah dirender (bytes yang
+#   sama dengan yang masuk ZIP / direktori PDF, tanpa render ulang) digabung
+#   menjadi satu PDF per jilid (volume) berukuran tetap. Halaman disalin ke
+#   disk begitu surat datang, jadi memori sebanding satu surat, bukan satu
+#   jilid; logo & font yang sama disimpan sekali per jilid.
+
+import hashlib
+import re
+import threading
+import zipfile
+from collections import deque
+from pathlib import Path
+
+# Jumlah pasien per jilid PDF gabungan
+DEFAULT_VOLUME_SIZE = 250
+
+
+class ZipBundleWriter:
+    """
+    Arsip ZIP yang diisi satu per satu:
+
+        with ZipBundleWriter("surat.zip") as z:
+            z.add("Hasil_APCS_00001.pdf", pdf_bytes)
+
+    PDF sudah terkompresi, jadi entri disimpan tanpa kompresi ulang.
+    """
+
+    def __init__(self, path, compression=zipfile.ZIP_STORED):
+        self.path = Path(path)
+        self._zip = zipfile.ZipFile(self.path, "w", compression=compression)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, arcname: str, data: bytes) -> None:
+        with self._lock:
+            self._zip.writestr(arcname, data)
+            self.count += 1
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def volume_path(path, index: int, total: int) -> Path:
+    """`hasil.pdf` bila hanya satu jilid, selain itu `hasil-0001.pdf`, dst."""
+    path = Path(path)
+    if total <= 1:
+        return path
+    return path.with_name(f"{path.stem}-{index + 1:04d}{path.suffix}")
+
+
+# ------------------ PDF GABUNGAN ------------------
+# Pembaca minimal untuk keluaran ReportLab: xref klasik, objek tidak
+# terkompresi, /Length langsung, atribut halaman tidak diwarisi dari /Pages.
+_STARTXREF = re.compile(rb"startxref\s+(\d+)\s+%%EOF\s*$")
+_ROOT = re.compile(rb"/Root (\d+) 0 R")
+_PAGES = re.compile(rb"/Pages (\d+) 0 R")
+_KIDS = re.compile(rb"/Kids\s*\[([^\]]*)\]")
+_PAGE = re.compile(rb"/Type\s*/Page\b")
+_LENGTH = re.compile(rb"/Length (\d+)\b")
+_REF = re.compile(rb"(/Parent\s+)?\b(\d+) 0 R\b")
+_EOL = re.compile(rb"\r?\n")
+
+
+def _xref(data: bytes) -> tuple[int, dict[int, int]]:
+    """(nomor objek Catalog, {nomor objek: offset})."""
+    m = _STARTXREF.search(data)
+    if m is None:
+        raise ValueError("bukan PDF utuh (startxref tidak ada)")
+    pos = int(m.group(1))
+    trailer = data.find(b"trailer", pos)
+    if not data.startswith(b"xref", pos) or trailer < 0:
+        raise ValueError("hanya tabel xref klasik yang didukung")
+    words = data[pos + 4:trailer].split()
+    offsets = {}
+    i = 0
+    while i < len(words):
+        first, count = int(words[i]), int(words[i + 1])
+        for k in range(count):
+            off, _gen, kind = words[i + 2 + 3 * k:i + 5 + 3 * k]
+            if kind == b"n":
+                offsets[first + k] = int(off)
+        i += 2 + 3 * count
+    root = _ROOT.search(data, trailer)
+    if root is None:
+        raise ValueError("trailer PDF tanpa /Root")
+    return int(root.group(1)), offsets
+
+
+def _object(data: bytes, offset: int) -> tuple[bytes, bytes | None]:
+    """(isi objek tanpa stream, bytes stream atau None) di `offset`."""
+    start = data.index(b"obj", offset) + 3
+    end = data.index(b"endobj", start)
+    kw = data.find(b"stream", start, end)
+    if kw < 0:
+        return data[start:end].strip(), None
+    head = data[start:kw].strip()
+    length = _LENGTH.search(head)
+    if length is None:
+        raise ValueError("stream tanpa /Length langsung")
+    body = _EOL.match(data, kw + 6).end()
+    return head, data[body:body + int(length.group(1))]
+
+
+class _Objects(dict):
+    """{nomor objek: (isi, stream)} yang dibaca dari PDF saat pertama diminta."""
+
+    def __init__(self, data: bytes, offsets: dict[int, int]):
+        super().__init__()
+        self.data, self.offsets = data, offsets
+
+    def __missing__(self, num: int):
+        self[num] = obj = _object(self.data, self.offsets[num])
+        return obj
+
+
+def read_pages(data: bytes) -> tuple[list[int], _Objects]:
+    """(nomor objek halaman sesuai urutan pohon /Pages, objek-objek PDF)."""
+    root, offsets = _xref(data)
+    objects = _Objects(data, offsets)
+    pages, todo = [], [int(_PAGES.search(objects[root][0]).group(1))]
+    while todo:
+        num = todo.pop(0)
+        head = objects[num][0]
+        kids = _KIDS.search(head)
+        if kids is not None:
+            todo[:0] = [int(m.group(2)) for m in _REF.finditer(kids.group(1))]
+        elif _PAGE.search(head):
+            pages.append(num)
+    return pages, objects
+
+
+class MergedPdfWriter:
+    """
+    Satu PDF gabungan dari PDF-PDF utuh yang sudah dirender:
+
+        with MergedPdfWriter("surat.pdf") as w:
+            w.add(pdf_bytes)
+
+    Halaman tiap PDF beserta objek yang dirujuknya (isi, font, gambar)
+    disalin apa adanya dan langsung ditulis ke berkas; objek daun (tanpa
+    rujukan) yang identik, mis. logo & font, hanya ditulis sekali.
+    """
+
+    CATALOG, PAGES = 1, 2
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._f = open(self.path, "wb")
+        self._f.write(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+        self._offsets: dict[int, int] = {}
+        self._next = self.PAGES + 1
+        self._leaves: dict[bytes, int] = {}   # sha1 objek daun -> nomor objek
+        self.pages: list[int] = []
+
+    def _write(self, num: int, head: bytes, stream: bytes | None = None) -> None:
+        self._offsets[num] = self._f.tell()
+        self._f.write(b"%d 0 obj\n%s\n" % (num, head))
+        if stream is not None:
+            self._f.write(b"stream\n%s\nendstream\n" % stream)
+        self._f.write(b"endobj\n")
+
+    def add(self, pdf: bytes) -> int:
+        """Salin semua halaman `pdf` ke akhir berkas; jumlah halamannya."""
+        pages, objects = read_pages(pdf)
+        numbers: dict[int, int] = {}   # nomor di `pdf` -> nomor di berkas ini
+
+        def copy(num: int) -> int:
+            if num in numbers:
+                return numbers[num]
+            head, stream = objects[num]
+            refs = [int(m.group(2)) for m in _REF.finditer(head) if not m.group(1)]
+            if not refs and num not in pages:
+                key = hashlib.sha1(head + b"\0" + (b"S" + stream if stream is not None else b"-")).digest()
+                if key in self._leaves:
+                    numbers[num] = self._leaves[key]
+                    return numbers[num]
+                numbers[num] = self._leaves[key] = self._next
+                self._next += 1
+                self._write(numbers[num], head, stream)
+                return numbers[num]
+            numbers[num] = new = self._next
+            self._next += 1
+            for ref in refs:
+                copy(ref)
+            head = _REF.sub(
+                lambda m: b"/Parent %d 0 R" % self.PAGES if m.group(1) else b"%d 0 R" % numbers[int(m.group(2))],
+                head,
+            )
+            self._write(new, head, stream)
+            return new
+
+        self.pages.extend(copy(num) for num in pages)
+        return len(pages)
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        kids = b" ".join(b"%d 0 R" % n for n in self.pages)
+        self._write(self.PAGES, b"<< /Type /Pages /Count %d /Kids [ %s ] >>" % (len(self.pages), kids))
+        self._write(self.CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES)
+        xref = self._f.tell()
+        self._f.write(b"xref\n0 %d\n0000000000 65535 f \n" % self._next)
+        for num in range(1, self._next):
+            self._f.write(b"%010d 00000 n \n" % self._offsets[num])
+        self._f.write(
+            b"trailer\n<< /Root %d 0 R /Size %d >>\nstartxref\n%d\n%%%%EOF\n" % (self.CATALOG, self._next, xref)
+        )
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class VolumeWriter:
+    """
+    PDF gabungan yang dipecah per `volume_size` pasien (lihat volume_path);
+    hanya satu jilid yang terbuka pada satu waktu:
+
+        with VolumeWriter("surat.pdf", patients=1000, volume_size=250) as v:
+            v.add((letter_bytes, apcs_bytes))   # -> "surat-0001.pdf"
+    """
+
+    def __init__(self, path, patients: int, volume_size: int = DEFAULT_VOLUME_SIZE):
+        self.path = Path(path)
+        self.volume_size = max(1, volume_size)
+        self.total = -(-patients // self.volume_size)
+        self.count = 0
+        self._writer: MergedPdfWriter | None = None
+
+    def add(self, docs) -> str:
+        """Tambahkan surat-surat satu pasien; nama berkas jilidnya."""
+        if self.count % self.volume_size == 0:
+            self.close()
+            index = self.count // self.volume_size
+            self._writer = MergedPdfWriter(volume_path(self.path, index, self.total))
+        for pdf in docs:
+            self._writer.add(pdf)
+        self.count += 1
+        return self._writer.path.name
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def bounded_map(executor, fn, items, window: int):
+    """
+    Seperti executor.map, tetapi paling banyak `window` tugas yang berjalan
+    atau hasilnya menunggu diambil — hasil tidak menumpuk bila penulis lambat.
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,221 @@
+# cohort.py — ISI PERUT
+# Skoring kohort/registri secara vektor (NumPy): GERD-Q, APCS, dan kelas
+# verdikt EGD/kolonoskopi untuk puluhan ribu baris sekaligus.
+#
+# Aturan identik dengan scoring.py (jalur interaktif); kesamaan hasil
+# diperiksa di tests/test_cohort.py (dan benchmarks/bench_cohort.py).
+
+from dataclasses import dataclass
+
+import numpy as np
+
+import questionnaires
+import rules
+from scoring import (
+    ALARM_COLO,
+    ALARM_EGD,
+    GERDQ_THRESHOLD,
+    OTHER_COLO,
+    RISK_COLO,
+    SEX_OPTIONS,
+    ScreeningInput,
+    Verdict,
+    apcs_category,
+    gerdq_index,
+)
+
+# Kelas verdikt = `level` hasil di rules.json (urutan = tingkat kedaruratan)
+VERDICT_MONITOR, VERDICT_ELECTIVE, VERDICT_URGENT = 0, 1, 2
+_RULES = rules.load()
+_BY_LEVEL = sorted(_RULES.outcomes, key=lambda o: o.level)
+assert [o.level for o in _BY_LEVEL] == [VERDICT_MONITOR, VERDICT_ELECTIVE, VERDICT_URGENT]
+VERDICT_LABELS = tuple(o.label for o in _BY_LEVEL)   # pemantauan, elektif, segera
+_LEVELS = np.array([o.level for o in _RULES.outcomes], dtype=np.int8)  # level per indeks hasil
+
+# Kelas kategori APCS: 0 = rendah (0–1), 1 = sedang (2–3), 2 = tinggi (4–7)
+APCS_LOW, APCS_MEDIUM, APCS_HIGH = 0, 1, 2
+APCS_CATEGORIES = tuple(apcs_category(s)[0] for s in (0, 2, 4))
+
+# Tabel skor lengkap dari questionnaires.py (kode kombinasi -> skor) sebagai
+# array, jadi skoring kohort = satu indeks vektor per instrumen
+_GERDQ = questionnaires.get("gerdq")
+_APCS = questionnaires.get("apcs")
+_GERDQ_TABLE = np.frombuffer(_GERDQ.table, dtype=np.uint8)
+_GERDQ_STRIDES = len(_GERDQ.options) ** np.arange(len(_GERDQ.questions) - 1, -1, -1)
+_APCS_TABLE = np.frombuffer(_APCS.table, dtype=np.uint8)
+_APCS_STRIDES = np.cumprod([1] + [i.radix for i in _APCS.items[:0:-1]])[::-1]
+_AGE_EDGES = np.array([hi + 1 for hi, _ in _APCS.item("age").bands[:-1]])  # 45, 70
+# Opsi jenis kelamin = indeks SEX_OPTIONS; masukan bool: True = laki-laki (0),
+# False = perempuan (1)
+assert _APCS.item("sex").options[:2] == ("Laki-laki", "Perempuan")
+# Kelas kategori per skor APCS (0..7): indeks label kategori di APCS_CATEGORIES
+_APCS_CLASS = np.array([APCS_CATEGORIES.index(o.label) for o in _APCS.outcomes], dtype=np.int8)
+
+
+@dataclass(frozen=True)
+class CohortResult:
+    """Hasil per baris; semua atribut berupa array sepanjang n."""
+
+    gerdq_score: np.ndarray      # int8, 0–18
+    gerdq_positive: np.ndarray   # bool, skor ≥ 8
+    apcs_score: np.ndarray       # int8, 0–7
+    apcs_category: np.ndarray    # int8, APCS_LOW/MEDIUM/HIGH
+    egd_verdict: np.ndarray      # int8, VERDICT_*
+    colo_verdict: np.ndarray     # int8, VERDICT_*
+
+    def __len__(self):
+        return len(self.gerdq_score)
+
+
+def _bool_matrix(x, n: int, width: int) -> np.ndarray:
+    if x is None:
+        return np.zeros((n, width), dtype=bool)
+    m = np.asarray(x, dtype=bool).reshape(n, -1)
+    if m.shape[1] != width:
+        raise ValueError(f"diharapkan {width} kolom checklist, diterima {m.shape[1]}")
+    return m
+
+
+def _any(m, n: int) -> np.ndarray:
+    if m is None:
+        return np.zeros(n, dtype=bool)
+    return np.asarray(m, dtype=bool).reshape(n, -1).any(axis=1)
+
+
+def verdict_class(alarm, risk=None, other=None, instrument: str = "colo", scores=None) -> np.ndarray:
+    """
+    Kelas verdikt per baris dari tabel keputusan `instrument` (rules.json):
+    kode fakta (bit alarm/risk/other + bit skor) -> satu indeks vektor.
+    `scores` ({id instrumen: array skor}) hanya wajib bila tabelnya memakai skor.
+    """
+    table = _RULES.for_instrument(instrument)
+    alarm = np.asarray(alarm, dtype=bool)
+    n = alarm.shape[0]
+    code = np.zeros(n, dtype=np.intp)
+    for m, bit in zip((alarm, risk, other), table.level_bits):
+        if bit:
+            code |= _any(m, n) * bit
+    for source, bits in table.score_bits:
+        if scores is None or source not in scores:
+            raise ValueError(f"tabel '{table.id}' membutuhkan skor {source}")
+        code |= np.asarray(bits, dtype=np.intp)[np.asarray(scores[source])]
+    return _LEVELS[np.frombuffer(table.table, dtype=np.uint8)[code]]
+
+
+def _sex_index(sex: np.ndarray) -> np.ndarray:
+    """Indeks SEX_OPTIONS per baris; ValueError (dengan nomor baris) bila tidak dikenal."""
+    if sex.dtype == bool:
+        return np.where(sex, 0, 1)
+    index = np.full(sex.shape, -1, dtype=np.int8)
+    for i, opt in enumerate(SEX_OPTIONS):
+        index[sex == opt] = i
+    bad = np.flatnonzero(index < 0)
+    if bad.size:
+        shown = ", ".join(f"#{i} {str(sex[i])!r}" for i in bad[:5])
+        more = f" (+{bad.size - 5} lainnya)" if bad.size > 5 else ""
+        raise ValueError(f"jenis kelamin tidak dikenal di {bad.size} baris: {shown}{more}")
+    return index
+
+
+def score_cohort(
+    gerdq,
+    age,
+    sex,
+    family_history=None,
+    smoker=None,
+    egd_alarm=None,
+    colo_alarm=None,
+    colo_risk=None,
+    colo_other=None,
+) -> CohortResult:
+    """
+    Skor seluruh kohort sekaligus.
+
+    gerdq        : (n, 6) indeks jawaban 0–3 (Q1..Q6, sebelum skor terbalik)
+    age          : (n,) usia dalam tahun
+    sex          : (n,) teks SEX_OPTIONS, atau bool (True = laki-laki)
+    family_history, smoker : (n,) bool
+    egd_alarm    : (n, 7) bool; colo_alarm/colo_risk/colo_other : (n, 5) bool
+    """
+    # Rentang diperiksa pada nilai asli: int8 dulu akan membungkus 256 -> 0
+    raw = np.asarray(gerdq)
+    if raw.ndim != 2 or raw.shape[1] != 6:
+        raise ValueError("gerdq harus berbentuk (n, 6)")
+    if raw.size and raw.dtype.kind not in "iu":
+        raise ValueError(f"jawaban GERD-Q harus bilangan bulat, diterima {raw.dtype}")
+    if raw.size and (raw.min() < 0 or raw.max() > 3):
+        raise ValueError("jawaban GERD-Q harus 0–3")
+    answers = raw.astype(np.int8)
+    n = answers.shape[0]
+
+    # GERD-Q: kode kombinasi (basis 4, Q1 paling signifikan) -> skor
+    gerdq_score = _GERDQ_TABLE[answers.astype(np.intp) @ _GERDQ_STRIDES].astype(np.int8)
+
+    # APCS
+    age = np.asarray(age).reshape(n)
+    sex_index = _sex_index(np.asarray(sex).reshape(n))
+    fhx = _bool_matrix(family_history, n, 1)[:, 0]
+    smoke = _bool_matrix(smoker, n, 1)[:, 0]
+
+    # APCS: kode (pita usia, jenis kelamin, keluarga, rokok) -> skor
+    choices = np.stack([
+        np.searchsorted(_AGE_EDGES, age, side="right"),
+        sex_index,
+        fhx,
+        smoke,
+    ], axis=1).astype(np.intp)
+    apcs_score = _APCS_TABLE[choices @ _APCS_STRIDES].astype(np.int8)
+    apcs_cat = _APCS_CLASS[apcs_score]
+
+    # Verdikt EGD (hanya gejala alarm) dan kolonoskopi
+    scores = {"gerdq": gerdq_score, "apcs": apcs_score}
+    egd = verdict_class(_bool_matrix(egd_alarm, n, len(ALARM_EGD)), instrument="egd", scores=scores)
+    colo = verdict_class(
+        _bool_matrix(colo_alarm, n, len(ALARM_COLO)),
+        _bool_matrix(colo_risk, n, len(RISK_COLO)),
+        _bool_matrix(colo_other, n, len(OTHER_COLO)),
+        instrument="colo",
+        scores=scores,
+    )
+
+    return CohortResult(
+        gerdq_score=gerdq_score,
+        gerdq_positive=gerdq_score >= GERDQ_THRESHOLD,
+        apcs_score=apcs_score,
+        apcs_category=apcs_cat,
+        egd_verdict=egd,
+        colo_verdict=colo,
+    )
+
+
+def arrays_from_inputs(inputs: list[ScreeningInput]) -> dict:
+    """Ubah daftar ScreeningInput menjadi argumen score_cohort()."""
+
+    def checks(items, catalog):
+        m = np.zeros((len(inputs), len(catalog)), dtype=bool)
+        index = {q: j for j, q in enumerate(catalog)}
+        for i, inp in enumerate(inputs):
+            for q in getattr(inp, items):
+                m[i, index[q]] = True
+        return m
+
+    return dict(
+        gerdq=np.array(
+            [[gerdq_index(a) for a in inp.gerdq_answers] for inp in inputs],
+            dtype=np.int8,
+        ).reshape(len(inputs), 6),
+        age=np.array([inp.age for inp in inputs]),
+        sex=np.array([inp.sex for inp in inputs]),
+        family_history=np.array([inp.family_history for inp in inputs], dtype=bool),
+        smoker=np.array([inp.smoker for inp in inputs], dtype=bool),
+        egd_alarm=checks("egd_alarm", ALARM_EGD),
+        colo_alarm=checks("colo_alarm", ALARM_COLO),
+        colo_risk=checks("colo_risk", RISK_COLO),
+        colo_other=checks("colo_other", OTHER_COLO),
+    )
+
+
+def verdict_for_class(code: int, organ: str):
+    """Verdict jalur interaktif untuk satu kelas verdikt."""
+    outcome = _BY_LEVEL[code]
+    return Verdict(outcome.text.format(organ=organ), outcome.badge, outcome.advice, outcome.id, outcome.label)
@@ -0,0 +1,234 @@
+# metrics.py — ISI PERUT
+# Instrumentasi ringan: waktu per bagian halaman (header, GERD-Q, checklist,
+# APCS, build PDF, tombol unduh) dikumpulkan ke histogram & penghitung
+# bersama untuk seluruh sesi dalam proses ini.
+#
+# Cara membaca:
+#   - panel debug di halaman: buka aplikasi dengan ?debug=1
+#   - berkas JSON: set ISI_PERUT_METRICS_FILE=/path/metrics.json
+#     (ditulis ulang paling sering tiap ISI_PERUT_METRICS_FLUSH detik)
+#   - endpoint lokal: set ISI_PERUT_METRICS_PORT=9109, lalu
+#     curl http://127.0.0.1:9109/metrics        (format teks Prometheus)
+#     curl http://127.0.0.1:9109/metrics.json
+#     curl http://127.0.0.1:9109/ready          (200 setelah warmup.py selesai)
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+METRICS_FILE = os.environ.get("ISI_PERUT_METRICS_FILE")
+METRICS_PORT = os.environ.get("ISI_PERUT_METRICS_PORT")
+FLUSH_SECONDS = float(os.environ.get("ISI_PERUT_METRICS_FLUSH", 5))
+
+# Batas atas bucket histogram (ms); bucket terakhir = tak hingga
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Histogram bucket tetap (memori konstan) dengan estimasi persentil."""
+
+    def __init__(self, bounds=BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Perkiraan persentil q (0–1), interpolasi linear di dalam bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.bounds[i - 1] if i else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lo + (hi - lo) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum, 3),
+            "mean_ms": round(self.sum / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p90_ms": round(self.percentile(0.90), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max, 3),
+        }
+
+
+def _le_labels(h: Histogram) -> list[str]:
+    return [f"{b:g}" for b in h.bounds] + ["+Inf"]
+
+
+class Registry:
+    """Kumpulan histogram (per nama bagian) dan penghitung, thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+        self.started = time.time()
+        self.ready = False  # diset warmup.py setelah pemanasan selesai
+        self._flushed = 0.0
+
+    def observe(self, name: str, ms: float) -> None:
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram()
+            hist.observe(ms)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "uptime_s": round(time.time() - self.started, 1),
+                "ready": self.ready,
+                "counters": dict(self.counters),
+                "sections": {k: h.summary() for k, h in sorted(self.histograms.items())},
+            }
+
+    def prometheus(self) -> str:
+        """Format eksposisi teks Prometheus."""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"isi_perut_{name}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            lines.append("# TYPE isi_perut_section_ms histogram")
+            for name, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(_le_labels(h), h.counts):
+                    cumulative += n
+                    lines.append(f'isi_perut_section_ms_bucket{{section="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'isi_perut_section_ms_sum{{section="{name}"}} {h.sum:.3f}')
+                lines.append(f'isi_perut_section_ms_count{{section="{name}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def maybe_flush(self, path=METRICS_FILE, every: float = FLUSH_SECONDS) -> None:
+        """Tulis snapshot JSON ke `path` bila flush terakhir > `every` detik lalu."""
+        if not path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._flushed < every:
+                return
+            self._flushed = now
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self.snapshot(), indent=1))
+            os.replace(tmp, path)  # pembaca tidak pernah melihat berkas setengah jadi
+        except OSError:
+            pass
+
+
+@lru_cache(maxsize=1)
+def get_registry() -> Registry:
+    """Registry bersama untuk seluruh sesi dalam proses ini."""
+    registry = Registry()
+    if METRICS_PORT:
+        serve(registry, int(METRICS_PORT))
+    return registry
+
+
+@contextmanager
+def timed(name: str):
+    """Catat durasi blok ke histogram `name` (ms)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_registry().observe(name, (time.perf_counter() - t0) * 1000)
+
+
+class RunTimings:
+    """
+    Waktu per bagian untuk satu rerun; tiap bagian juga masuk registry.
+
+        timings = RunTimings()
+        with timings.section("gerdq"):
+            ...
+        timings.finish()
+    """
+
+    def __init__(self, registry: Registry | None = None):
+        self.registry = registry or get_registry()
+        self.sections: dict[str, float] = {}
+        self.finished = False
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def section(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - t0) * 1000
+            self.sections[name] = self.sections.get(name, 0.0) + ms
+            self.registry.observe(name, ms)
+
+    def finish(self) -> float:
+        """Catat total rerun, naikkan penghitung, dan flush berkas bila perlu."""
+        total = (time.perf_counter() - self._t0) * 1000
+        self.sections["rerun"] = total
+        self.registry.observe("rerun", total)
+        self.registry.incr("reruns")
+        self.registry.maybe_flush()
+        self.finished = True
+        return total
+
+
+def serve(registry: Registry, port: int, host: str = "127.0.0.1"):
+    """Endpoint metrik lokal (/metrics, /metrics.json, /ready) di thread daemon."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, ctype = registry.prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, ctype = json.dumps(registry.snapshot()), "application/json"
+            elif self.path == "/ready":
+                if not registry.ready:
+                    self.send_error(503, "pemanasan belum selesai")
+                    return
+                body, ctype = "ok\n", "text/plain"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError:
+        return None  # port sudah dipakai (mis. proses lain): lewati saja
+    threading.Thread(target=server.serve_forever, name="isi-perut-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,106 @@
+# pdf_cache.py — ISI PERUT
+# Cache PDF lintas sesi (LRU berbasis ukuran) dengan kunci sidik jari kanonik
+# dari seluruh argumen builder. Unduhan ulang dengan jawaban yang sama cukup
+# berupa satu lookup dict, bukan build ReportLab penuh.
+#
+#   ISI_PERUT_PDF_CACHE_MB   batas total ukuran PDF di cache (bawaan 64 MB)
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable
+
+from metrics import get_registry, timed
+
+MAX_BYTES = int(float(os.environ.get("ISI_PERUT_PDF_CACHE_MB", 64)) * 1024 * 1024)
+
+
+def fingerprint(kind: str, kwargs: dict) -> str:
+    """SHA-256 dari JSON kanonik (kunci terurut) jenis surat + argumennya."""
+    payload = json.dumps(
+        [kind, kwargs],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=list,  # tuple/set -> list
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """LRU thread-safe dengan batas total bytes dan penghitung hit/miss."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return  # lebih besar dari seluruh cache: jangan simpan
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> PdfCache:
+    """Cache bersama untuk seluruh sesi dalam proses ini."""
+    return PdfCache()
+
+
+def cached_pdf(kind: str, builder: Callable[..., bytes], **kwargs) -> bytes:
+    """`builder(**kwargs)`, atau hasil sebelumnya bila argumennya identik."""
+    cache = get_cache()
+    key = fingerprint(kind, kwargs)
+    data = cache.get(key)
+    if data is None:
+        with timed(f"pdf_{kind}"):
+            data = builder(**kwargs)
+        cache.put(key, data)
+        get_registry().incr("pdf_builds")
+    else:
+        get_registry().incr("pdf_cache_hits")
+    return data
@@ -0,0 +1,123 @@
+# pdf_images.py — ISI PERUT
+# Turunan logo beresolusi cetak untuk PDF.
+#
+# logo_kariadi.png aslinya 6554x2180 RGBA (±57 MB setelah di-decode), padahal
+# di kop surat hanya tampil 130x55 pt. Modul ini membuat salinan kecil sekali
+# saja (disimpan di disk, path-nya di-memo per proses), lalu semua builder PDF
+# menyematkan salinan tersebut.
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from PIL import Image as PILImage
+from reportlab import rl_config
+from reportlab.platypus import Flowable
+
+from assets import lookup
+
+# Stream gambar disimpan biner. Encoder ASCII85 bawaan ReportLab berjalan dalam
+# Python murni bila modul akselerator C tidak terpasang, dan justru menjadi
+# bagian terlama dari build PDF (serta membuat berkas ±25% lebih besar).
+rl_config.useA85 = 0
+
+# Resolusi cetak untuk turunan logo (titik per inci)
+PRINT_DPI = 300
+JPEG_QUALITY = 92
+
+CACHE_DIR = Path(
+    os.environ.get("ISI_PERUT_CACHE_DIR", Path(__file__).resolve().parent / ".cache")
+) / "pdf_img"
+
+_lock = threading.Lock()
+_derived: dict[tuple, str] = {}           # (sha256, w_px, h_px) -> path turunan
+
+
+def _target_px(width_pt: float, height_pt: float) -> tuple[int, int]:
+    scale = PRINT_DPI / 72.0
+    return max(1, round(width_pt * scale)), max(1, round(height_pt * scale))
+
+
+def _make_derivative(src: Path, digest: str, size: tuple[int, int]) -> str:
+    """
+    Path turunan JPEG di cache disk; dibuat dari berkas sumber bila belum ada.
+
+    JPEG disematkan ReportLab apa adanya (DCTDecode) sehingga build PDF tidak
+    perlu meng-compress ulang piksel logo. Transparansi diratakan ke putih —
+    kop surat selalu dicetak di atas kertas putih.
+    """
+    name = f"{src.stem}-{digest[:16]}-{size[0]}x{size[1]}.jpg"
+    cached = _cache_dir() / name
+    if cached.exists():
+        return str(cached)
+
+    with PILImage.open(src) as im:
+        im.draft("RGB", size)
+        small = im.convert("RGBA").resize(size, PILImage.LANCZOS)
+    flat = PILImage.new("RGB", size, "white")
+    flat.paste(small, mask=small.getchannel("A"))
+
+    tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+    flat.save(tmp, format="JPEG", quality=JPEG_QUALITY, subsampling=0, optimize=True)
+    os.replace(tmp, cached)
+    return str(cached)
+
+
+def _cache_dir() -> Path:
+    """CACHE_DIR, atau direktori sementara bila CACHE_DIR tidak bisa ditulisi."""
+    global CACHE_DIR
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        if not os.access(CACHE_DIR, os.W_OK):
+            raise PermissionError(CACHE_DIR)
+    except OSError:
+        CACHE_DIR = Path(tempfile.mkdtemp(prefix="isi_perut_pdf_img_"))
+    return CACHE_DIR
+
+
+def print_image(path, width_pt: float, height_pt: float) -> str | None:
+    """
+    Path turunan logo untuk `path` pada ukuran cetak `width_pt` x `height_pt`.
+    Kembalikan None bila berkas tidak ada.
+    """
+    asset = lookup(path)  # logo aplikasi: dari manifest, tanpa stat
+    if asset is None:
+        return None
+
+    digest = asset.sha256
+    size = _target_px(width_pt, height_pt)
+    key = (digest, *size)
+
+    derived = _derived.get(key)
+    if derived is not None:
+        return derived
+
+    with _lock:
+        derived = _derived.get(key)
+        if derived is None:
+            derived = _make_derivative(Path(asset.path), digest, size)
+            _derived[key] = derived
+    return derived
+
+
+class LogoFlowable(Flowable):
+    """Flowable gambar berukuran tetap dari turunan logo (lihat print_image)."""
+
+    def __init__(self, image: str, width: float, height: float):
+        super().__init__()
+        self.image = image
+        self.width = width
+        self.height = height
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(self.image, 0, 0, width=self.width, height=self.height)
+
+
+def logo_flowable(path, width: float, height: float):
+    """LogoFlowable untuk kop surat, atau "" bila logo tidak tersedia."""
+    image = print_image(path, width, height)
+    return LogoFlowable(image, width, height) if image else ""
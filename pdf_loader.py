@@ -0,0 +1,40 @@
+# pdf_loader.py — ISI PERUT
+# Builder PDF yang baru memuat ReportLab (pdf_report.py) saat pertama kali
+# dipanggil. Impor pdf_report ± 190 ms dan kebanyakan pengguna tidak pernah
+# mengunduh PDF, jadi cold start halaman tidak perlu menanggungnya.
+#
+# Bila ISI_PERUT_PDF_QUEUE_DB diisi, builder tidak membangun sendiri tetapi
+# mengirim job ke tier worker PDF (pdf_queue.py) dan menunggu hasilnya;
+# ReportLab tidak pernah dimuat di proses ini.
+#
+# HAS_RL = proses ini bisa menghasilkan PDF: reportlab terpasang (diperiksa
+# tanpa mengimpornya), atau mode antrean aktif — render terjadi di tier
+# worker, jadi proses UI/API boleh berjalan tanpa ReportLab. app.py
+# memakainya untuk menampilkan tombol unduh atau petunjuk instalasi.
+
+from functools import lru_cache
+from importlib.util import find_spec
+
+import pdf_queue
+
+HAS_RL = pdf_queue.ENABLED or find_spec("reportlab") is not None
+
+
+@lru_cache(maxsize=1)
+def load():
+    """Modul pdf_report (impor ReportLab terjadi di sini, sekali per proses)."""
+    import pdf_report
+
+    return pdf_report
+
+
+def build_pdf_letterhead(**kwargs) -> bytes:
+    if pdf_queue.ENABLED:
+        return pdf_queue.get_queue().run("letterhead", kwargs)
+    return load().build_pdf_letterhead(**kwargs)
+
+
+def build_pdf_apcs(**kwargs) -> bytes:
+    if pdf_queue.ENABLED:
+        return pdf_queue.get_queue().run("apcs", kwargs)
+    return load().build_pdf_apcs(**kwargs)
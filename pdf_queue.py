@@ -0,0 +1,277 @@
+# pdf_queue.py — ISI PERUT
+# Mode deploy opsional: build PDF (surat hasil & surat APCS) dikerjakan tier
+# proses worker terpisah lewat antrean job lokal berbasis SQLite, bukan di
+# proses UI Streamlit. Proses UI cukup menaruh job lalu menunggu hasilnya
+# berdasarkan id job; CPU untuk ReportLab bisa diperbanyak terpisah dari UI
+# (satu proses worker per core), dan satu antrean bisa dipakai bersama oleh
+# beberapa proses UI / api.py di mesin yang sama.
+#
+#   ISI_PERUT_PDF_QUEUE_DB        path berkas antrean. Bila diisi, pdf_loader
+#                                 mengirim semua build PDF ke antrean ini
+#                                 (kosong/bawaan: build di proses sendiri)
+#   ISI_PERUT_PDF_QUEUE_TIMEOUT   detik menunggu hasil satu job (bawaan 60)
+#
+#   python pdf_queue.py --workers 4    # tier worker (pra-fork, seperti api.py)
+#   python pdf_queue.py --stats        # jumlah job per status
+#
+# Worker yang mati di tengah job diganti; job-nya diantrekan ulang, dan
+# dianggap gagal bila sudah MAX_ATTEMPTS kali menjatuhkan worker. Hasil yang
+# tidak pernah diambil dihapus setelah RESULT_TTL detik.
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+from metrics import get_registry
+from prefork import prefork, preload_pdf_stack
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_DB = HERE / ".cache" / "pdf_queue.sqlite3"
+QUEUE_DB = os.environ.get("ISI_PERUT_PDF_QUEUE_DB", "")
+ENABLED = bool(QUEUE_DB)
+RESULT_TIMEOUT = float(os.environ.get("ISI_PERUT_PDF_QUEUE_TIMEOUT", 60))
+RESULT_TTL = 600.0     # detik
+MAX_ATTEMPTS = 3
+POLL_MIN, POLL_MAX = 0.005, 0.1   # detik, jeda polling (naik 2x tiap putaran)
+KINDS = ("letterhead", "apcs")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       TEXT PRIMARY KEY,
+    kind     TEXT NOT NULL,
+    args     TEXT NOT NULL,                   -- JSON argumen builder
+    status   TEXT NOT NULL DEFAULT 'queued',  -- queued / running / done / failed
+    result   BLOB,
+    error    TEXT,
+    worker   INTEGER,                         -- pid worker yang mengerjakan
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created  REAL NOT NULL,
+    started  REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+"""
+
+
+class JobFailed(RuntimeError):
+    """Build PDF di worker gagal; pesannya galat dari worker."""
+
+
+def _backoff():
+    delay = POLL_MIN
+    while True:
+        yield delay
+        delay = min(delay * 2, POLL_MAX)
+
+
+class JobQueue:
+    """
+    Antrean job PDF di satu berkas SQLite (mode WAL). Satu koneksi per
+    thread; setelah fork, proses anak harus membuat JobQueue sendiri.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ---- sisi UI / klien ----
+    def submit(self, kind: str, kwargs: dict) -> str:
+        """Taruh satu job build; kembalikan id job."""
+        if kind not in KINDS:
+            raise ValueError(f"jenis surat tidak dikenal: {kind!r} ({', '.join(KINDS)})")
+        job_id = uuid.uuid4().hex
+        args = json.dumps(kwargs, ensure_ascii=False, default=list)  # tuple -> list
+        self._conn().execute(
+            "INSERT INTO jobs (id, kind, args, created) VALUES (?, ?, ?, ?)",
+            (job_id, kind, args, time.time()),
+        )
+        get_registry().incr("pdf_queue_submitted")
+        return job_id
+
+    def status(self, job_id: str) -> str | None:
+        """queued / running / done / failed, atau None bila job tidak ada."""
+        row = self._conn().execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def result(self, job_id: str, timeout: float = RESULT_TIMEOUT) -> bytes:
+        """
+        Tunggu job selesai lalu ambil PDF-nya (job dihapus dari antrean).
+        JobFailed bila build gagal; TimeoutError bila lewat `timeout` detik
+        (job yang belum sempat diambil worker dibatalkan).
+        """
+        conn = self._conn()
+        deadline = time.monotonic() + timeout
+        for delay in _backoff():
+            row = conn.execute("SELECT status, error FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"job {job_id} tidak ada di antrean")
+            status, error = row
+            if status == "done":
+                (data,) = conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+                return data
+            if status == "failed":
+                conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+                get_registry().incr("pdf_queue_failed")
+                raise JobFailed(error)
+            if time.monotonic() >= deadline:
+                self.cancel(job_id)
+                get_registry().incr("pdf_queue_timeouts")
+                raise TimeoutError(f"job PDF {job_id} belum selesai setelah {timeout:.0f} detik ({status})")
+            time.sleep(delay)
+
+    def cancel(self, job_id: str) -> bool:
+        """Hapus job yang belum diambil worker."""
+        cur = self._conn().execute("DELETE FROM jobs WHERE id = ? AND status = 'queued'", (job_id,))
+        return cur.rowcount > 0
+
+    def run(self, kind: str, kwargs: dict, timeout: float = RESULT_TIMEOUT) -> bytes:
+        """submit + result: PDF dari tier worker."""
+        return self.result(self.submit(kind, kwargs), timeout)
+
+    # ---- sisi worker ----
+    def claim(self, worker: int) -> tuple[str, str, str] | None:
+        """Ambil job antre tertua: (id, jenis, JSON argumen), atau None."""
+        conn = self._conn()
+        # Cek baca dulu: worker yang menganggur tidak perlu mengambil kunci tulis
+        if conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' LIMIT 1").fetchone() is None:
+            return None
+        rows = conn.execute(
+            "UPDATE jobs SET status = 'running', worker = ?, started = ?, attempts = attempts + 1 "
+            "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1) "
+            "RETURNING id, kind, args",
+            (worker, time.time()),
+        ).fetchall()
+        return rows[0] if rows else None
+
+    def finish(self, job_id: str, data: bytes | None = None, error: str | None = None) -> None:
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ? WHERE id = ?",
+            ("failed" if error else "done", data, error, time.time(), job_id),
+        )
+
+    def requeue(self, worker: int) -> int:
+        """Job milik worker yang mati: antre ulang, atau gagal setelah MAX_ATTEMPTS."""
+        conn = self._conn()
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished = ? "
+            "WHERE status = 'running' AND worker = ? AND attempts >= ?",
+            (f"worker berhenti {MAX_ATTEMPTS}x saat membangun surat ini", time.time(), worker, MAX_ATTEMPTS),
+        )
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL WHERE status = 'running' AND worker = ?",
+            (worker,),
+        )
+        return cur.rowcount
+
+    def prune(self, ttl: float = RESULT_TTL) -> int:
+        """Hapus hasil yang tidak diambil lebih dari `ttl` detik."""
+        cur = self._conn().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished < ?",
+            (time.time() - ttl,),
+        )
+        return cur.rowcount
+
+    def stats(self) -> dict:
+        counts = dict(self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+        return {s: counts.get(s, 0) for s in ("queued", "running", "done", "failed")}
+
+
+@lru_cache(maxsize=1)
+def get_queue() -> JobQueue:
+    """Antrean bersama proses ini (ISI_PERUT_PDF_QUEUE_DB)."""
+    return JobQueue(QUEUE_DB or DEFAULT_DB)
+
+
+# ------------------ WORKER ------------------
+def _build(kind: str, kwargs: dict) -> bytes:
+    # Langsung ke pdf_report (bukan builder pdf_loader, yang akan mengantre lagi)
+    from pdf_loader import load
+
+    pdf = load()
+    builder = pdf.build_pdf_letterhead if kind == "letterhead" else pdf.build_pdf_apcs
+    return builder(**kwargs)
+
+
+def work(queue: JobQueue) -> None:
+    """Loop worker: ambil job, bangun PDF, simpan hasil/galatnya."""
+    pid = os.getpid()
+    sleeps = _backoff()
+    last_prune = 0.0
+    while True:
+        job = queue.claim(pid)
+        if job is None:
+            if time.monotonic() - last_prune > 60:
+                queue.prune()
+                last_prune = time.monotonic()
+            time.sleep(next(sleeps))
+            continue
+        sleeps = _backoff()
+        job_id, kind, args = job
+        try:
+            data = _build(kind, json.loads(args))
+        except Exception as exc:  # noqa: BLE001
+            traceback.print_exc()
+            queue.finish(job_id, error=f"{type(exc).__name__}: {exc}")
+        else:
+            queue.finish(job_id, data)
+
+
+def serve(path: str | Path, workers: int, preload: bool = True) -> None:
+    queue = JobQueue(path)   # skema dibuat sekali sebelum fork
+    if preload:
+        preload_pdf_stack()  # diwarisi semua worker lewat fork
+    print(f"[pdf_queue] {path} — {workers} worker", file=sys.stderr)
+    prefork(
+        workers,
+        lambda: work(JobQueue(path)),
+        "pdf_queue",
+        before_fork=queue.close,   # koneksi SQLite tidak boleh terbawa fork
+        on_exit=lambda pid: f", {queue.requeue(pid)} job diantre ulang",
+    )
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Tier worker PDF ISI PERUT (antrean job SQLite lokal)")
+    ap.add_argument("--db", default=QUEUE_DB or str(DEFAULT_DB),
+                    help="berkas antrean (bawaan: ISI_PERUT_PDF_QUEUE_DB atau .cache/pdf_queue.sqlite3)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="jumlah proses worker (bawaan: jumlah core)")
+    ap.add_argument("--no-preload", action="store_true",
+                    help="jangan muat ReportLab sebelum fork")
+    ap.add_argument("--stats", action="store_true", help="cetak jumlah job per status lalu keluar")
+    args = ap.parse_args(argv)
+    if args.stats:
+        print(json.dumps(JobQueue(args.db).stats()))
+        return 0
+    serve(args.db, args.workers, preload=not args.no_preload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
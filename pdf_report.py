@@ -0,0 +1,502 @@
+# pdf_report.py — ISI PERUT
+# Surat hasil skrining (PDF) dengan kop surat RSUP Dr. Kariadi.
+#
+# Stylesheet dan kop surat dirakit sekali per proses (LetterheadTemplate);
+# per permintaan hanya flowable data pasien yang dibangun dan dialirkan di
+# bawah kop yang sudah ditata sebelumnya.
+
+import threading
+from functools import lru_cache
+from io import BytesIO
+
+from reportlab.graphics.barcode.qrencoder import QRCode, QRErrorCorrectLevel
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import (
+    BaseDocTemplate,
+    Flowable,
+    Frame,
+    PageTemplate,
+    Paragraph,
+    Spacer,
+    Table,
+    TableStyle,
+)
+
+from pdf_images import logo_flowable
+from response_code import display as display_code, normalize as normalize_code, restore_url
+
+KOP_TEXT = (
+    "<para align='center'>"
+    "<b>RUMAH SAKIT UMUM PUSAT DOKTER KARIADI</b><br/>"
+    "Jalan Dr. Sutomo No 16 Semarang PO BOX 1104<br/>"
+    "Telepon: (024) 8413993<br/>"
+    "Website: www.rskariadi.co.id"
+    "</para>"
+)
+
+PAGE_MARGINS = dict(leftMargin=40, rightMargin=40, topMargin=30, bottomMargin=28)
+FRAME_PADDING = 6  # padding bawaan reportlab Frame
+
+# Gaya teks alamat di kop: surat hasil skrining vs surat APCS
+LETTERHEAD_KOP = "Normal"
+APCS_KOP = "Small"
+
+
+def build_styles():
+    """Stylesheet bersama untuk semua jenis surat."""
+    styles = getSampleStyleSheet()
+
+    # --- surat hasil skrining (GERD-Q, EGD, kolonoskopi) ---
+    styles.add(
+        ParagraphStyle(
+            name="H1C",
+            parent=styles["Title"],
+            alignment=1,
+            leading=22,
+            spaceAfter=12,
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            name="SmallGray",
+            parent=styles["Normal"],
+            textColor=colors.HexColor("#444"),
+            fontSize=10,
+        )
+    )
+    styles.add(ParagraphStyle(name="Label", parent=styles["Normal"], spaceAfter=2))
+    styles.add(
+        ParagraphStyle(
+            name="Bold",
+            parent=styles["Normal"],
+            fontName=styles["Heading4"].fontName,
+            spaceAfter=4,
+        )
+    )
+
+    # --- surat hasil APCS ---
+    styles.add(
+        ParagraphStyle(
+            name="Judul",
+            parent=styles["Title"],
+            alignment=1,
+            fontSize=14,
+            leading=18,
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            name="Small",
+            parent=styles["Normal"],
+            fontSize=10,
+            textColor=colors.HexColor("#555"),
+        )
+    )
+    styles.add(
+        ParagraphStyle(name="LabelAPCS", parent=styles["Normal"], fontSize=11, spaceAfter=4)
+    )
+
+    # --- kode respons di samping identitas (kedua surat) ---
+    styles.add(
+        ParagraphStyle(
+            name="CodeCaption",
+            parent=styles["Normal"],
+            fontSize=8,
+            leading=10,
+            textColor=colors.HexColor("#444"),
+        )
+    )
+    return styles
+
+
+class LetterheadTemplate:
+    """
+    Kop surat RS Kariadi (logo kiri, alamat, logo kanan, garis hijau)
+    beserta stylesheet-nya. Dibuat sekali per proses lewat get_letterhead().
+
+    Tata letak kop dihitung (wrap) sekali saja, lalu cukup digambar ulang di
+    halaman pertama tiap dokumen lewat callback PageTemplate. Story dokumen
+    hanya berisi teks pasien, dimulai tepat di bawah kop.
+    """
+
+    def __init__(self, logo_rs_path: str | None, logo_isi_path: str | None):
+        self.styles = build_styles()
+        self.left_img = logo_flowable(logo_rs_path, 130, 55)
+        self.right_img = logo_flowable(logo_isi_path, 145, 145)
+
+        page_w, page_h = A4
+        self._avail_w = page_w - PAGE_MARGINS["leftMargin"] - PAGE_MARGINS["rightMargin"]
+        self._avail_w -= 2 * FRAME_PADDING
+        self._headers = {
+            kop_style: self._layout(self.header(kop_style))
+            for kop_style in (LETTERHEAD_KOP, APCS_KOP)
+        }
+        # Flowable kop dipakai bersama; gambar ulang tidak boleh tumpang tindih
+        self._draw_lock = threading.Lock()
+
+    def header(self, kop_style: str = "Normal") -> list:
+        """Flowable kop surat + garis hijau, dengan teks alamat bergaya `kop_style`."""
+        kop_text = Paragraph(KOP_TEXT, self.styles[kop_style])
+
+        # Lebar konten 555 pt, dengan kolom kiri & kanan agak lebih ke dalam
+        header_tbl = Table(
+            [[self.left_img, kop_text, self.right_img]],
+            colWidths=[150, 255, 150],
+            hAlign="CENTER",
+        )
+        header_tbl.setStyle(
+            TableStyle(
+                [
+                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                    ("ALIGN", (1, 0), (1, 0), "CENTER"),
+                    # Logo kiri agak masuk ke dalam
+                    ("LEFTPADDING", (0, 0), (0, 0), 14),
+                    ("RIGHTPADDING", (0, 0), (0, 0), 0),
+                    # Logo kanan agak masuk ke dalam
+                    ("LEFTPADDING", (2, 0), (2, 0), 0),
+                    ("RIGHTPADDING", (2, 0), (2, 0), 20),
+                ]
+            )
+        )
+
+        return [
+            header_tbl,
+            Spacer(1, 8),   # jarak kop -> garis hijau
+            Table(
+                [[""]],
+                colWidths=[555],
+                style=[("LINEBELOW", (0, 0), (0, 0), 2, colors.HexColor("#2fa3a0"))],
+            ),
+            Spacer(1, 20),  # jarak garis hijau -> judul
+        ]
+
+    def _layout(self, elems: list) -> tuple[list, float]:
+        """Wrap flowable kop sekali; kembalikan [(flowable, w, h)] dan tinggi total."""
+        placed, total = [], 0.0
+        for f in elems:
+            w, h = f.wrap(self._avail_w, A4[1])
+            placed.append((f, w, h))
+            total += h
+        return placed, total
+
+    def _draw_header(self, kop_style: str):
+        placed, _ = self._headers[kop_style]
+
+        def on_first_page(canv, doc):
+            x = doc.leftMargin + FRAME_PADDING
+            y = doc.pagesize[1] - PAGE_MARGINS["topMargin"] - FRAME_PADDING
+            with self._draw_lock:
+                for f, w, h in placed:
+                    y -= h
+                    f.drawOn(canv, x, y, _sW=self._avail_w - w)
+
+        return on_first_page
+
+    def _doc(self, target, first_style: str) -> BaseDocTemplate:
+        """
+        Dokumen A4 dengan PageTemplate "First<gaya kop>" (kop surat + frame
+        di bawahnya) untuk tiap gaya kop, dan "Later" untuk halaman lanjutan.
+        """
+        doc = BaseDocTemplate(target, pagesize=A4, **PAGE_MARGINS)
+        firsts = {}
+        for kop_style, (_, header_h) in self._headers.items():
+            first = Frame(
+                doc.leftMargin,
+                doc.bottomMargin,
+                doc.width,
+                doc.height - header_h,
+                id=f"first{kop_style}",
+            )
+            firsts[kop_style] = PageTemplate(
+                id=f"First{kop_style}",
+                frames=first,
+                onPage=self._draw_header(kop_style),
+                autoNextPageTemplate="Later",
+            )
+        later = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id="later")
+
+        # template pertama dalam daftar dipakai untuk halaman 1
+        templates = [firsts.pop(first_style), *firsts.values()]
+        doc.addPageTemplates(templates + [PageTemplate(id="Later", frames=later)])
+        return doc
+
+    def build(self, story: list, kop_style: str = "Normal") -> bytes:
+        """Rakit kop surat + `story` menjadi dokumen A4."""
+        buf = BytesIO()
+        self._doc(buf, kop_style).build(story)
+        return buf.getvalue()
+
+
+@lru_cache(maxsize=8)
+def get_letterhead(logo_rs_path: str | None, logo_isi_path: str | None) -> LetterheadTemplate:
+    return LetterheadTemplate(logo_rs_path, logo_isi_path)
+
+
+# ------------------ KODE RESPONS ------------------
+QR_SIZE = 52  # pt (± 1,8 cm)
+QR_BORDER = 4  # modul zona kosong di tiap sisi (standar QR)
+
+
+@lru_cache(maxsize=256)
+def qr_path(data: str, size: float = QR_SIZE) -> str:
+    """
+    Operator PDF (`re` per deretan modul gelap + satu `f`) untuk QR `data`
+    seluas `size` pt, titik asal di kiri bawah. Encode QR (± 6 ms, sebagian
+    besar pemilihan mask) dan format angkanya cukup sekali per kode; surat
+    hasil & surat APCS pasien yang sama berbagi hasilnya.
+    """
+    qr = QRCode(None, QRErrorCorrectLevel.M)
+    qr.addData(data)
+    qr.make()
+    box = size / (qr.getModuleCount() + 2 * QR_BORDER)
+    ops = []
+    for r, row in enumerate(qr.modules):
+        y = size - (r + QR_BORDER + 1) * box
+        c = 0
+        while c < len(row):
+            if not row[c]:
+                c += 1
+                continue
+            start = c
+            while c < len(row) and row[c]:
+                c += 1
+            ops.append(f"{(start + QR_BORDER) * box:.3f} {y:.3f} {(c - start) * box:.3f} {box:.3f} re")
+    ops.append("f")
+    return "\n".join(ops)
+
+
+class QrFlowable(Flowable):
+    """
+    QR berukuran tetap `size` pt, digambar langsung dari qr_path(): tanpa
+    QrCodeWidget/Drawing, yang meng-encode ulang & membuat ratusan shape
+    tervalidasi di setiap gambar.
+    """
+
+    def __init__(self, data: str, size: float = QR_SIZE):
+        super().__init__()
+        self.data = data
+        self.width = self.height = size
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.setFillColor(colors.black)
+        self.canv.addLiteral(qr_path(self.data, self.width))
+
+
+def with_response_code(ident: list, code: str | None, style: str) -> list:
+    """
+    Baris identitas pasien, dengan QR + kode respons (response_code.py) di
+    sebelah kanannya bila `code` diisi: petugas memuat ulang jawaban pasien
+    lewat ?kode=... tanpa mengisi ulang. Tidak menambah tinggi surat.
+    """
+    if not code:
+        return ident
+    qr = QrFlowable(restore_url(code) or normalize_code(code))
+    label = Paragraph(f"<para align='center'>Kode respons<br/><b>{display_code(code)}</b></para>", style)
+    table = Table([[ident, [qr, label]]], colWidths=[None, 90])
+    table.setStyle(
+        TableStyle(
+            [
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("ALIGN", (1, 0), (1, 0), "CENTER"),
+                ("LEFTPADDING", (0, 0), (-1, -1), 0),
+                ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+                ("TOPPADDING", (0, 0), (-1, -1), 0),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 0),
+            ]
+        )
+    )
+    return [table]
+
+
+# ------------------ PDF EXPORT (kop surat RS Kariadi) ------------------
+def letterhead_story(
+    styles,
+    name: str,
+    age: int,
+    sex: str,
+    today: str,
+    v_egd: str,
+    a_egd: str,
+    r_egd: list,
+    gerd_q_summary: str,
+    v_colo: str,
+    a_colo: str,
+    r_colo: list,
+    response_code: str | None = None,
+) -> list:
+    """
+    Isi surat hasil skrining (di bawah kop):
+    1) Hasil skrining GERD (GERD-Q)
+    2) Kebutuhan EGD
+    3) Kebutuhan kolonoskopi
+    """
+    elems = []
+    elems.append(Paragraph("HASIL SKRINING SALURAN CERNA", styles["H1C"]))
+    elems.append(Paragraph("(GERD, kebutuhan EGD, dan kolonoskopi)", styles["SmallGray"]))
+    elems.append(Spacer(1, 6))
+
+    ident = [
+        Paragraph(f"<b>Tanggal:</b> {today}", styles["Label"]),
+        Paragraph(f"<b>Nama:</b> {name if name else '-'}", styles["Label"]),
+        Paragraph(f"<b>Usia:</b> {age} tahun", styles["Label"]),
+        Paragraph(f"<b>Jenis kelamin:</b> {sex}", styles["Label"]),
+    ]
+    elems.extend(with_response_code(ident, response_code, styles["CodeCaption"]))
+    elems.append(Spacer(1, 10))
+
+    # 1) Hasil skrining GERD (GERD-Q)
+    elems.append(Paragraph("<b>1) Hasil Skrining GERD (GERD-Q)</b>", styles["Bold"]))
+    if gerd_q_summary:
+        elems.append(Paragraph(gerd_q_summary, styles["Label"]))
+    else:
+        elems.append(
+            Paragraph(
+                "Formulir GERD-Q belum terisi lengkap pada saat skrining.",
+                styles["Label"],
+            )
+        )
+    elems.append(Spacer(1, 8))
+
+    # 2) Kebutuhan EGD
+    elems.append(
+        Paragraph("<b>2) Kebutuhan Endoskopi Saluran Cerna Atas (EGD)</b>", styles["Bold"])
+    )
+    elems.append(Paragraph(f"<b>Kesimpulan:</b> {v_egd}", styles["Label"]))
+    elems.append(Paragraph(a_egd, styles["Label"]))
+    if r_egd:
+        elems.append(Spacer(1, 2))
+        elems.append(Paragraph("<b>Gejala yang terdeteksi:</b>", styles["Label"]))
+        for r in r_egd:
+            elems.append(Paragraph(f"• {r}", styles["Label"]))
+
+    elems.append(Spacer(1, 8))
+
+    # 3) Kebutuhan kolonoskopi
+    elems.append(
+        Paragraph("<b>3) Kebutuhan Kolonoskopi (Saluran Cerna Bawah)</b>", styles["Bold"])
+    )
+    elems.append(Paragraph(f"<b>Kesimpulan:</b> {v_colo}", styles["Label"]))
+    elems.append(Paragraph(a_colo, styles["Label"]))
+    if r_colo:
+        elems.append(Spacer(1, 2))
+        elems.append(
+            Paragraph("<b>Gejala / faktor yang terdeteksi:</b>", styles["Label"])
+        )
+        for r in r_colo:
+            elems.append(Paragraph(f"• {r}", styles["Label"]))
+    elems.append(Spacer(1, 12))
+
+    elems.append(
+        Paragraph(
+            "Hasil ini bersifat edukatif dan tidak menggantikan penilaian dokter. "
+            "Jika keluhan berat, mendadak, atau menetap, segera konsultasikan ke dokter penyakit dalam.",
+            styles["SmallGray"],
+        )
+    )
+    return elems
+
+
+def build_pdf_letterhead(
+    name: str,
+    age: int,
+    sex: str,
+    today: str,
+    v_egd: str,
+    a_egd: str,
+    r_egd: list,
+    gerd_q_summary: str,
+    v_colo: str,
+    a_colo: str,
+    r_colo: list,
+    logo_rs_path: str | None,
+    logo_isi_path: str | None,
+    response_code: str | None = None,
+) -> bytes:
+    """Bangun PDF hasil skrining (GERD-Q, kebutuhan EGD, dan kolonoskopi)."""
+    tpl = get_letterhead(logo_rs_path, logo_isi_path)
+    return tpl.build(
+        letterhead_story(
+            tpl.styles, name, age, sex, today,
+            v_egd, a_egd, r_egd, gerd_q_summary, v_colo, a_colo, r_colo, response_code,
+        ),
+        kop_style=LETTERHEAD_KOP,
+    )
+
+
+def apcs_story(
+    styles,
+    name: str,
+    age: int,
+    sex: str,
+    today: str,
+    score_apcs: int,
+    kategori_apcs: str,
+    pesan_apcs: str,
+    response_code: str | None = None,
+) -> list:
+    """Isi surat hasil skrining risiko kanker kolorektal (APCS)."""
+    elems = []
+    elems.append(
+        Paragraph("HASIL SKRINING RISIKO KANKER KOLOREKTAL", styles["Judul"])
+    )
+    elems.append(
+        Paragraph("(APCS – Asia-Pacific Colorectal Screening Score)", styles["Small"])
+    )
+    elems.append(Spacer(1, 12))
+
+    ident = [
+        Paragraph(f"<b>Tanggal:</b> {today}", styles["LabelAPCS"]),
+        Paragraph(f"<b>Nama:</b> {name}", styles["LabelAPCS"]),
+        Paragraph(f"<b>Usia:</b> {age} tahun", styles["LabelAPCS"]),
+        Paragraph(f"<b>Jenis Kelamin:</b> {sex}", styles["LabelAPCS"]),
+    ]
+    elems.extend(with_response_code(ident, response_code, styles["CodeCaption"]))
+    elems.append(Spacer(1, 12))
+
+    elems.append(Paragraph("<b>Hasil Perhitungan APCS:</b>", styles["LabelAPCS"]))
+    elems.append(
+        Paragraph(
+            f"<b>Skor:</b> {score_apcs} — <b>Kategori Risiko:</b> {kategori_apcs}",
+            styles["LabelAPCS"],
+        )
+    )
+    elems.append(Spacer(1, 6))
+    elems.append(Paragraph(pesan_apcs, styles["LabelAPCS"]))
+    elems.append(Spacer(1, 12))
+
+    elems.append(
+        Paragraph(
+            "Catatan: Hasil ini merupakan skrining awal berdasarkan formulir APCS. "
+            "Pemeriksaan lanjutan seperti Tes Darah Samar Feses (iFOBT), colok dubur, "
+            "atau kolonoskopi akan ditentukan oleh dokter sesuai protokol nasional.",
+            styles["Small"],
+        )
+    )
+    return elems
+
+
+def build_pdf_apcs(
+    name: str,
+    age: int,
+    sex: str,
+    today: str,
+    score_apcs: int,
+    kategori_apcs: str,
+    pesan_apcs: str,
+    logo_rs_path: str | None,
+    logo_isi_path: str | None,
+    response_code: str | None = None,
+) -> bytes:
+    """Bangun PDF hasil skrining risiko kanker kolorektal (APCS)."""
+    tpl = get_letterhead(logo_rs_path, logo_isi_path)
+    return tpl.build(
+        apcs_story(
+            tpl.styles, name, age, sex, today, score_apcs, kategori_apcs, pesan_apcs, response_code
+        ),
+        kop_style=APCS_KOP,
+    )
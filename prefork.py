@@ -0,0 +1,83 @@
+# prefork.py — ISI PERUT
+# Model proses pra-fork bersama api.py dan tier worker pdf_queue.py: proses
+# induk memuat yang mahal sekali (ReportLab + kop surat), lalu menjalankan
+# beberapa worker hasil fork yang mewarisinya; worker yang mati diganti.
+
+import os
+import signal
+import sys
+import time
+from importlib.util import find_spec
+from typing import Callable
+
+from assets import get_manifest
+
+
+def preload_pdf_stack() -> None:
+    """Impor ReportLab + stylesheet + kop surat (bila reportlab terpasang)."""
+    # Bukan pdf_loader.HAS_RL: itu juga benar di mode antrean tanpa ReportLab
+    from pdf_loader import load
+
+    if find_spec("reportlab") is not None:
+        manifest = get_manifest()
+        load().get_letterhead(manifest.path("logo_kariadi"), manifest.path("logo_isi"))
+
+
+def prefork(
+    workers: int,
+    run: Callable[[], None],
+    label: str,
+    before_fork: Callable[[], None] | None = None,
+    on_exit: Callable[[int], str] | None = None,
+) -> None:
+    """
+    Jalankan `run()` di `workers` proses anak hasil fork (semua mewarisi yang
+    sudah dimuat induk) dan ganti anak yang mati, sampai SIGTERM/SIGINT.
+    `before_fork()` dipanggil sebelum tiap fork (mis. tutup koneksi yang tidak
+    boleh terbawa); `on_exit(pid)` setelah anak berhenti, hasilnya ikut
+    dicetak. Tanpa fork (Windows) atau workers <= 1: `run()` di proses ini.
+    """
+    if workers <= 1 or not hasattr(os, "fork"):
+        run()
+        return
+
+    children: set[int] = set()
+    stopping = False
+
+    def spawn():
+        if before_fork is not None:
+            before_fork()
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                run()
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        note = on_exit(pid) if on_exit is not None else ""
+        if not stopping:
+            print(f"[{label}] worker {pid} berhenti (status {status}){note}, diganti", file=sys.stderr)
+            time.sleep(0.5)  # jangan berputar cepat bila worker langsung mati
+            spawn()
@@ -0,0 +1,355 @@
+# questionnaires.py — ISI PERUT
+# Kompilator definisi kuesioner deklaratif (questionnaires.json): pertanyaan,
+# kategori checklist, bobot skor, dan pita hasil. Berkas JSON dibaca &
+# divalidasi sekali per proses menjadi struktur beku (tuple, tabel hasil per
+# skor), jadi rerun tidak pernah mem-parse ulang apa pun.
+#
+# Instrumen berskor dihitung di muka untuk SELURUH ruang jawaban: `table`
+# (bytes) memetakan kode kombinasi jawaban (mixed radix, pertanyaan pertama
+# paling signifikan) ke skor, dan `outcomes` memetakan skor ke kategori,
+# badge, dan teks. Skoring = satu indeks ke tiap tabel. GERD-Q: 4^6 = 4096
+# kombinasi; APCS: 3 pita usia × 3 × 2 × 2 = 36. Verifikasi terhadap logika
+# acuan: tests/test_scoring_tables.py.
+#
+# Jenis instrumen:
+#   frequency  pilihan ganda per pertanyaan, skor = jumlah bobot (GERD-Q)
+#   checklist  kategori gejala (alarm/risk/other) -> verdikt per organ
+#   points     poin per butir (sebagian dari data pribadi), skor -> pita (APCS)
+#
+# Instrumen baru (mis. dispepsia / Rome IV) cukup ditambahkan ke JSON; app.py
+# merender & menskor semuanya lewat jalur generik yang sama.
+#
+#   python questionnaires.py    # validasi skema & ringkas isinya
+#   python -m pytest tests/test_questionnaires.py   # penolakan skema cacat
+
+import itertools
+import json
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping, NamedTuple, Sequence
+
+SCHEMA_PATH = Path(__file__).resolve().parent / "questionnaires.json"
+
+# Urutan level checklist = urutan butir terpilih di ringkasan & PDF
+LEVELS = ("alarm", "risk", "other")
+
+
+class SchemaError(ValueError):
+    """questionnaires.json tidak sesuai skema."""
+
+
+class Outcome(NamedTuple):
+    """Hasil satu skor: pita yang cocok, teks sudah diisi skornya."""
+
+    score: int
+    label: str
+    badge: str
+    title: str
+    text: str
+    summary: str
+    positive: bool
+
+
+@dataclass(frozen=True)
+class Image:
+    asset: str        # nama aset di assets.py
+    width: int
+    caption: str
+
+
+@dataclass(frozen=True)
+class Instrument:
+    id: str
+    kind: str
+    title: str
+    submit_label: str
+    expander: bool = True
+    intro: str = ""
+    notes: str = ""
+    image: Image | None = None
+
+
+# ------------------ FREQUENCY ------------------
+@dataclass(frozen=True)
+class Question:
+    key: str | None   # key widget Streamlit
+    text: str
+    weights: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class FrequencyInstrument(Instrument):
+    options: tuple[str, ...] = ()
+    questions: tuple[Question, ...] = ()
+    outcomes: tuple[Outcome, ...] = ()  # indeks = skor
+    table: bytes = b""                  # indeks = code(jawaban), isi = skor
+
+    @property
+    def threshold(self) -> int | None:
+        """Skor terendah yang hasilnya positif."""
+        return next((o.score for o in self.outcomes if o.positive), None)
+
+    def index(self, answer) -> int:
+        idx = answer if isinstance(answer, int) else self.options.index(answer)
+        if not 0 <= idx < len(self.options):
+            raise ValueError(f"jawaban {self.id} harus 0–{len(self.options) - 1}, diterima {answer!r}")
+        return idx
+
+    def code(self, answers: Sequence) -> int:
+        """Kode kombinasi jawaban (teks opsi atau indeks) = indeks ke `table`."""
+        if len(answers) != len(self.questions):
+            raise ValueError(
+                f"{self.id} membutuhkan {len(self.questions)} jawaban, diterima {len(answers)}"
+            )
+        code, radix = 0, len(self.options)
+        for a in answers:
+            code = code * radix + self.index(a)
+        return code
+
+    def score(self, answers: Sequence) -> Outcome:
+        """Hasil dari jawaban sesuai urutan pertanyaan (satu lookup tabel)."""
+        return self.outcomes[self.table[self.code(answers)]]
+
+
+# ------------------ CHECKLIST ------------------
+@dataclass(frozen=True)
+class Category:
+    level: str        # salah satu LEVELS
+    key_prefix: str   # key widget = f"{key_prefix}_{i}"
+    title: str
+    items: tuple[str, ...]
+    caption: str = ""
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        return tuple(f"{self.key_prefix}_{i}" for i in range(len(self.items)))
+
+
+@dataclass(frozen=True)
+class ChecklistInstrument(Instrument):
+    organ: str = ""
+    columns: bool = False
+    categories: tuple[Category, ...] = ()
+
+    def category(self, level: str) -> Category | None:
+        return next((c for c in self.categories if c.level == level), None)
+
+    def select(self, checked: Mapping[str, Sequence[bool]]) -> dict[str, list[str]]:
+        """{level: butir terpilih} dari {key_prefix: [centang per butir]}."""
+        out = {level: [] for level in LEVELS}
+        for cat in self.categories:
+            flags = checked.get(cat.key_prefix, ())
+            out[cat.level] += [q for q, on in zip(cat.items, flags) if on]
+        return out
+
+
+# ------------------ POINTS ------------------
+@dataclass(frozen=True)
+class PointItem:
+    id: str
+    text: str = ""
+    source: str | None = None        # diambil dari data pribadi, tidak dirender
+    options: tuple[str, ...] = ()
+    points: tuple[int, ...] = ()     # poin per opsi
+    bands: tuple[tuple[int | None, int], ...] = ()  # (nilai maks inklusif, poin)
+    key: str | None = None           # key widget (butir yang dirender)
+
+    @property
+    def radix(self) -> int:
+        return len(self.bands) or len(self.options)
+
+    def choice(self, value) -> int:
+        """Indeks pita (nilai numerik) atau opsi (teks, indeks, atau bool)."""
+        if self.bands:
+            return next(i for i, (hi, _) in enumerate(self.bands) if hi is None or value <= hi)
+        idx = int(value) if isinstance(value, (bool, int)) else self.options.index(value)
+        if not 0 <= idx < len(self.options):
+            raise ValueError(f"nilai {self.id} harus 0–{len(self.options) - 1}, diterima {value!r}")
+        return idx
+
+    def choice_points(self, idx: int) -> int:
+        return self.bands[idx][1] if self.bands else self.points[idx]
+
+    def value_points(self, value) -> int:
+        return self.choice_points(self.choice(value))
+
+
+@dataclass(frozen=True)
+class PointsInstrument(Instrument):
+    items: tuple[PointItem, ...] = ()
+    outcomes: tuple[Outcome, ...] = ()  # indeks = skor
+    table: bytes = b""                  # indeks = code(nilai), isi = skor
+
+    @property
+    def max_score(self) -> int:
+        return len(self.outcomes) - 1
+
+    def item(self, item_id: str) -> PointItem:
+        return next(i for i in self.items if i.id == item_id)
+
+    def code(self, values: Mapping[str, object]) -> int:
+        """Kode kombinasi pilihan per butir = indeks ke `table`."""
+        code = 0
+        for item in self.items:
+            code = code * item.radix + item.choice(values[item.id])
+        return code
+
+    def score(self, values: Mapping[str, object]) -> Outcome:
+        """Hasil dari {id butir: nilai} (satu lookup tabel)."""
+        return self.outcomes[self.table[self.code(values)]]
+
+
+# ------------------ KOMPILASI ------------------
+def _require(spec: dict, key: str, where: str):
+    if key not in spec:
+        raise SchemaError(f"{where}: '{key}' wajib ada")
+    return spec[key]
+
+
+def _outcomes(bands: list, max_score: int, where: str) -> tuple[Outcome, ...]:
+    """Tabel Outcome untuk setiap skor 0..max_score (pita = nilai maks inklusif)."""
+    if not bands or "max" in bands[-1]:
+        raise SchemaError(f"{where}: pita terakhir tidak boleh punya 'max'")
+    highs = [b["max"] for b in bands[:-1]]
+    if highs != sorted(highs):
+        raise SchemaError(f"{where}: 'max' pita harus naik")
+    table = []
+    for score in range(max_score + 1):
+        band = next(b for b in bands if "max" not in b or score <= b["max"])
+        label = band.get("label", "")
+        fmt = dict(score=score, label=label)
+        table.append(Outcome(
+            score=score,
+            label=label,
+            badge=band.get("badge", ""),
+            title=band.get("title", "").format(**fmt),
+            text=band.get("text", "").format(**fmt),
+            summary=band.get("summary", "").format(**fmt),
+            positive=bool(band.get("positive", False)),
+        ))
+    return tuple(table)
+
+
+def _score_table(choice_points: list[list[int]], where: str) -> bytes:
+    """Skor untuk setiap kombinasi pilihan (urutan itertools.product = urutan kode)."""
+    if sum(max(p) for p in choice_points) > 255:
+        raise SchemaError(f"{where}: skor maksimum harus ≤255 (tabel 1 byte per kombinasi)")
+    return bytes(sum(combo) for combo in itertools.product(*choice_points))
+
+
+def _common(spec: dict, where: str) -> dict:
+    image = spec.get("image")
+    return dict(
+        id=_require(spec, "id", where),
+        kind=spec["kind"],
+        title=_require(spec, "title", where),
+        submit_label=spec.get("submit_label", "Kirim"),
+        expander=spec.get("expander", True),
+        intro=spec.get("intro", ""),
+        notes=spec.get("notes", ""),
+        image=Image(image["asset"], int(image["width"]), image.get("caption", "")) if image else None,
+    )
+
+
+def _frequency(spec: dict, where: str) -> FrequencyInstrument:
+    options = tuple(_require(spec, "options", where))
+    questions = tuple(
+        Question(q.get("key"), q["text"], tuple(q["weights"])) for q in _require(spec, "questions", where)
+    )
+    for q in questions:
+        if len(q.weights) != len(options):
+            raise SchemaError(f"{where}: bobot '{q.text[:30]}…' harus {len(options)} angka")
+    max_score = sum(max(q.weights) for q in questions)
+    return FrequencyInstrument(
+        **_common(spec, where),
+        options=options,
+        questions=questions,
+        outcomes=_outcomes(_require(spec, "bands", where), max_score, where),
+        table=_score_table([list(q.weights) for q in questions], where),
+    )
+
+
+def _checklist(spec: dict, where: str) -> ChecklistInstrument:
+    categories = []
+    for c in _require(spec, "categories", where):
+        if c.get("level") not in LEVELS:
+            raise SchemaError(f"{where}: level kategori harus salah satu dari {LEVELS}")
+        categories.append(Category(c["level"], c["key_prefix"], c["title"], tuple(c["items"]), c.get("caption", "")))
+    return ChecklistInstrument(
+        **_common(spec, where),
+        organ=_require(spec, "organ", where),
+        columns=spec.get("columns", False),
+        categories=tuple(categories),
+    )
+
+
+def _points(spec: dict, where: str) -> PointsInstrument:
+    items = []
+    for i in _require(spec, "items", where):
+        bands = tuple((b.get("max"), b["points"]) for b in i.get("bands", ()))
+        if bands and bands[-1][0] is not None:
+            raise SchemaError(f"{where}: pita poin '{i['id']}' terakhir tidak boleh punya 'max'")
+        options, points = tuple(i.get("options", ())), tuple(i.get("points", ()))
+        if not bands and len(points) != len(options):
+            raise SchemaError(f"{where}: poin '{i['id']}' harus satu per opsi")
+        items.append(
+            PointItem(i["id"], i.get("text", ""), i.get("source"), options, points, bands, i.get("key"))
+        )
+    choice_points = [[i.choice_points(c) for c in range(i.radix)] for i in items]
+    max_score = sum(max(p) for p in choice_points)
+    return PointsInstrument(
+        **_common(spec, where),
+        items=tuple(items),
+        outcomes=_outcomes(_require(spec, "bands", where), max_score, where),
+        table=_score_table(choice_points, where),
+    )
+
+
+COMPILERS = {"frequency": _frequency, "checklist": _checklist, "points": _points}
+
+
+def compile_schema(doc: dict) -> dict[str, Instrument]:
+    """{id: Instrument} sesuai urutan di berkas."""
+    out = {}
+    for n, spec in enumerate(_require(doc, "instruments", "skema")):
+        where = f"instrumen #{n} ({spec.get('id', '?')})"
+        kind = spec.get("kind")
+        if kind not in COMPILERS:
+            raise SchemaError(f"{where}: jenis '{kind}' tidak dikenal ({', '.join(COMPILERS)})")
+        inst = COMPILERS[kind](spec, where)
+        if inst.id in out:
+            raise SchemaError(f"{where}: id ganda")
+        out[inst.id] = inst
+    return out
+
+
+@lru_cache(maxsize=None)
+def load(path: Path = SCHEMA_PATH) -> dict[str, Instrument]:
+    """Instrumen terkompilasi, sekali per proses (per path)."""
+    with open(path, encoding="utf-8") as f:
+        return compile_schema(json.load(f))
+
+
+def get(instrument_id: str) -> Instrument:
+    return load()[instrument_id]
+
+
+def main():
+    for inst in load().values():
+        if isinstance(inst, FrequencyInstrument):
+            detail = (
+                f"{len(inst.questions)} pertanyaan, skor 0–{len(inst.outcomes) - 1}, "
+                f"positif ≥{inst.threshold}, tabel {len(inst.table)} kombinasi"
+            )
+        elif isinstance(inst, ChecklistInstrument):
+            detail = ", ".join(f"{c.level} {len(c.items)}" for c in inst.categories)
+        else:
+            detail = f"{len(inst.items)} butir, skor 0–{inst.max_score}, tabel {len(inst.table)} kombinasi"
+        print(f"{inst.id:8} {inst.kind:10} {detail}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
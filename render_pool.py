@@ -0,0 +1,161 @@
+# render_pool.py — ISI PERUT
+# Pool thread bersama (per proses) untuk membangun PDF di luar thread script
+# Streamlit, dengan batas konkurensi dan antrean terbatas (backpressure).
+#
+# Konfigurasi lewat environment:
+#   ISI_PERUT_PDF_WORKERS         build PDF yang boleh berjalan bersamaan
+#   ISI_PERUT_PDF_QUEUE           build tambahan yang boleh menunggu di antrean
+#   ISI_PERUT_PDF_SUBMIT_TIMEOUT  detik menunggu slot sebelum menyerah
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable
+
+MAX_WORKERS = int(os.environ.get("ISI_PERUT_PDF_WORKERS", min(4, os.cpu_count() or 1)))
+MAX_QUEUE = int(os.environ.get("ISI_PERUT_PDF_QUEUE", 16))
+SUBMIT_TIMEOUT = float(os.environ.get("ISI_PERUT_PDF_SUBMIT_TIMEOUT", 10))
+RESULT_TIMEOUT = 60.0
+
+
+class PoolBusy(RuntimeError):
+    """Antrean render PDF penuh; permintaan ditolak."""
+
+
+class RenderPool:
+    """ThreadPoolExecutor dengan jumlah tugas (berjalan + antre) yang dibatasi."""
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_queue: int = MAX_QUEUE):
+        self.max_workers = max(1, max_workers)
+        self.capacity = self.max_workers + max(0, max_queue)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="isi-perut-pdf"
+        )
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    def submit(self, fn: Callable, *args, timeout: float | None = SUBMIT_TIMEOUT, **kwargs) -> Future:
+        """
+        Jadwalkan `fn(*args, **kwargs)`. Bila antrean penuh, tunggu slot
+        paling lama `timeout` detik (0 = tidak menunggu) lalu PoolBusy.
+        """
+        if timeout == 0:
+            acquired = self._slots.acquire(blocking=False)
+        else:
+            acquired = self._slots.acquire(timeout=timeout)
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            raise PoolBusy(f"antrean PDF penuh ({self.capacity} tugas)")
+
+        with self._lock:
+            self.pending += 1
+        try:
+            fut = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        fut.add_done_callback(self._release)
+        return fut
+
+    def _release(self, _fut):
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+@lru_cache(maxsize=1)
+def get_pool() -> RenderPool:
+    """Pool bersama untuk seluruh sesi dalam proses ini."""
+    return RenderPool()
+
+
+class DocumentSet:
+    """
+    Dokumen PDF milik satu rerun, mis. {"letterhead": fn, "apcs": fn}.
+
+    Saat satu dokumen diminta (klik unduh), semua dokumen di set mulai
+    dibangun paralel di pool; klik unduh berikutnya tinggal mengambil hasil.
+    Aman dipanggil dari thread mana pun (callable unduhan Streamlit dijalankan
+    di luar thread script).
+    """
+
+    def __init__(self, jobs: dict[str, Callable[[], bytes]], pool: RenderPool | None = None):
+        self._jobs = dict(jobs)
+        self._pool = pool
+        self._futures: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _failed(fut: Future) -> bool:
+        return fut.done() and (fut.cancelled() or fut.exception() is not None)
+
+    def _submit(self, key: str, timeout: float | None) -> Future | None:
+        fut = self._futures.get(key)
+        if fut is None or self._failed(fut):
+            # Build yang gagal (timeout antrean, JobFailed, ...) tidak
+            # disimpan: permintaan berikutnya membangun ulang
+            try:
+                fut = (self._pool or get_pool()).submit(self._jobs[key], timeout=timeout)
+            except PoolBusy:
+                if timeout == 0:
+                    return None  # prefetch dilewati; dibangun saat diminta
+                raise
+            self._futures[key] = fut
+        return fut
+
+    def result(self, key: str) -> bytes:
+        with self._lock:
+            fut = self._submit(key, SUBMIT_TIMEOUT)
+            for other in self._jobs:
+                if other != key:
+                    self._submit(other, 0)
+        try:
+            return fut.result(timeout=RESULT_TIMEOUT)
+        finally:
+            if self._failed(fut):
+                with self._lock:
+                    if self._futures.get(key) is fut:
+                        del self._futures[key]
+
+    def getter(self, key: str) -> Callable[[], bytes]:
+        """Callable tanpa argumen untuk `st.download_button(data=...)`."""
+        return lambda: self.result(key)
+
+
+class LiveDocumentSet:
+    """
+    Seperti DocumentSet, tetapi job-nya dibentuk saat tombol diklik lewat
+    `make_jobs()` (dict key -> functools.partial). Dipakai bila jawaban bisa
+    berubah tanpa rerun penuh (fragment): unduhan selalu memakai jawaban
+    terbaru, dan DocumentSet baru dibuat hanya bila argumennya berubah.
+    """
+
+    def __init__(self, make_jobs: Callable[[], dict], pool: RenderPool | None = None):
+        self._make_jobs = make_jobs
+        self._pool = pool
+        self._lock = threading.Lock()
+        self._signature = None
+        self._docs: DocumentSet | None = None
+
+    def current(self) -> DocumentSet:
+        jobs = self._make_jobs()
+        signature = {k: (j.func, j.args, j.keywords) for k, j in jobs.items()}
+        with self._lock:
+            if self._docs is None or signature != self._signature:
+                self._signature = signature
+                self._docs = DocumentSet(jobs, self._pool)
+            return self._docs
+
+    def result(self, key: str) -> bytes:
+        return self.current().result(key)
+
+    def getter(self, key: str) -> Callable[[], bytes]:
+        """Callable tanpa argumen untuk `st.download_button(data=...)`."""
+        return lambda: self.result(key)
@@ -0,0 +1,287 @@
+# response_code.py — ISI PERUT
+# Kode respons: satu respons skrining lengkap (6 jawaban GERD-Q, 7 centang
+# EGD, 15 centang kolonoskopi, usia, jenis kelamin, riwayat keluarga, rokok)
+# dipadatkan menjadi 11 karakter base32, mis. "4000-0002-T1V".
+#
+# Dicetak di surat PDF (teks + QR) dan diterima lewat ?kode=... di app.py
+# sehingga jawaban pasien bisa dimuat ulang tanpa mengisi ulang. Nama TIDAK
+# ikut dikodekan. Karena kanonik (satu respons = satu kode), kode ini juga
+# kunci cache yang murah untuk hasil & surat.
+#
+# Tata letak versi 1 (55 bit, bit paling signifikan lebih dulu):
+#   versi 3 | GERD-Q 6×2 | EGD alarm 7 | kolo alarm 5 | kolo risiko 5 |
+#   kolo lain 5 | usia 7 | jenis kelamin 2 | keluarga 1 | rokok 1 | cek 7
+# Bit cek = CRC-7/UMTS (x^7 + x^6 + x^2 + 1) dari 48 bit pertama. CRC 7 bit
+# menangkap semua galat beruntun ≤ 7 bit, jadi SETIAP salah ketik satu
+# karakter (5 bit) dan tiap pertukaran dua karakter bersebelahan pasti
+# tertolak — pasien lain tidak mungkin termuat karena satu huruf keliru.
+# Huruf memakai alfabet Crockford (tanpa I, L, O, U); saat dibaca, huruf
+# kecil, O/I/L, spasi, dan tanda hubung dimaafkan.
+#
+#   python response_code.py 4000-0002-T1V   # uraikan satu kode
+#   python -m pytest tests/test_response_code.py   # uji bolak-balik & salah ketik
+
+import os
+import sys
+from typing import Mapping
+
+import questionnaires
+from scoring import (
+    ALARM_COLO,
+    ALARM_EGD,
+    FHX_OPTIONS,
+    GERDQ_OPTIONS,
+    OTHER_COLO,
+    RISK_COLO,
+    SEX_OPTIONS,
+    SMOKE_OPTIONS,
+    ScreeningInput,
+    gerdq_index,
+)
+
+VERSION = 1
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+CODE_LENGTH = 11
+MAX_AGE = 120
+DEFAULT_AGE = 45  # nilai awal usia di halaman
+
+# Alamat publik aplikasi (opsional): QR di PDF berisi tautan ?kode=...
+PUBLIC_URL = os.environ.get("ISI_PERUT_PUBLIC_URL", "").rstrip("/")
+
+_GERDQ = questionnaires.get("gerdq")
+_CHECKLISTS = (
+    ("egd_alarm", ALARM_EGD),
+    ("colo_alarm", ALARM_COLO),
+    ("colo_risk", RISK_COLO),
+    ("colo_other", OTHER_COLO),
+)
+
+# (bagian, jumlah bit) versi 1 — JANGAN diubah: kode yang sudah tercetak di
+# surat harus tetap terbaca. Skema berubah => tata letak & VERSION baru.
+_VERSION_BITS = 3
+_CHECK_BITS = 7
+_LAYOUT = (
+    ("gerdq", 12),
+    ("egd_alarm", 7),
+    ("colo_alarm", 5),
+    ("colo_risk", 5),
+    ("colo_other", 5),
+    ("age", 7),
+    ("sex", 2),
+    ("family_history", 1),
+    ("smoker", 1),
+)
+_PAYLOAD_BITS = _VERSION_BITS + sum(bits for _, bits in _LAYOUT)
+assert _PAYLOAD_BITS + _CHECK_BITS == CODE_LENGTH * 5
+
+_GERDQ_BITS = (len(GERDQ_OPTIONS) - 1).bit_length()
+_expected = dict(
+    gerdq=len(_GERDQ.questions) * _GERDQ_BITS,
+    **{prefix: len(catalog) for prefix, catalog in _CHECKLISTS},
+    age=MAX_AGE.bit_length(),
+    sex=(len(SEX_OPTIONS) - 1).bit_length(),
+    family_history=len(FHX_OPTIONS) - 1,
+    smoker=len(SMOKE_OPTIONS) - 1,
+)
+if _expected != dict(_LAYOUT):
+    raise RuntimeError(
+        f"questionnaires.json tidak cocok dengan kode respons versi {VERSION}: "
+        f"{_expected} != {dict(_LAYOUT)} (buat tata letak & VERSION baru)"
+    )
+
+_DECODE = {c: i for i, c in enumerate(ALPHABET)}
+_DECODE.update({"O": 0, "I": 1, "L": 1})
+
+
+_CRC_POLY = 0x45  # CRC-7/UMTS tanpa suku x^7
+
+
+def _crc_table() -> tuple[int, ...]:
+    # table[v] = v·x^7 mod g untuk v 8 bit: (sisa·x + byte) -> sisa baru
+    table = []
+    for v in range(256):
+        reg = v << _CHECK_BITS
+        for shift in range(7, -1, -1):
+            if reg >> (shift + _CHECK_BITS) & 1:
+                reg ^= ((1 << _CHECK_BITS) | _CRC_POLY) << shift
+        table.append(reg)
+    return tuple(table)
+
+
+_CRC_TABLE = _crc_table()
+
+
+def _check(payload: int) -> int:
+    """CRC-7 dari 48 bit payload (6 byte, byte paling signifikan dulu)."""
+    reg = 0
+    for b in payload.to_bytes(6, "big"):
+        reg = _CRC_TABLE[(reg << 1) ^ b]
+    return reg
+
+
+# Bit tiap butir checklist (butir pertama = bit paling signifikan)
+_BITS = {
+    prefix: {q: 1 << (len(catalog) - 1 - i) for i, q in enumerate(catalog)}
+    for prefix, catalog in _CHECKLISTS
+}
+
+
+def _mask(selected, prefix: str) -> int:
+    bits = _BITS[prefix]
+    mask = 0
+    for q in selected:
+        if q not in bits:
+            raise ValueError(f"butir {prefix} tidak dikenal: {q!r}")
+        mask |= bits[q]
+    return mask
+
+
+def _fields(inp: ScreeningInput) -> dict[str, int]:
+    if len(inp.gerdq_answers) != len(_GERDQ.questions):
+        raise ValueError(f"GERD-Q membutuhkan {len(_GERDQ.questions)} jawaban")
+    age = int(inp.age)
+    if not 0 <= age <= MAX_AGE:
+        raise ValueError(f"usia harus 0–{MAX_AGE}, diterima {inp.age}")
+    if inp.sex not in SEX_OPTIONS:
+        raise ValueError(f"jenis kelamin tidak dikenal: {inp.sex!r}")
+    gerdq = 0
+    for a in inp.gerdq_answers:
+        gerdq = (gerdq << _GERDQ_BITS) | gerdq_index(a)
+    return dict(
+        gerdq=gerdq,
+        **{prefix: _mask(getattr(inp, prefix), prefix) for prefix, _ in _CHECKLISTS},
+        age=age,
+        sex=SEX_OPTIONS.index(inp.sex),
+        family_history=int(bool(inp.family_history)),
+        smoker=int(bool(inp.smoker)),
+    )
+
+
+def encode(inp: ScreeningInput) -> str:
+    """Kode respons kanonik (11 karakter, tanpa tanda hubung) untuk `inp`."""
+    fields = _fields(inp)
+    payload = VERSION
+    for name, bits in _LAYOUT:
+        payload = (payload << bits) | fields[name]
+    value = (payload << _CHECK_BITS) | _check(payload)
+    return "".join(ALPHABET[(value >> (5 * k)) & 31] for k in reversed(range(CODE_LENGTH)))
+
+
+def normalize(code: str) -> str:
+    """Bentuk kanonik kode ketikan pengguna; ValueError bila bukan kode respons."""
+    chars = [c for c in str(code).upper() if c not in "- "]
+    if len(chars) != CODE_LENGTH:
+        raise ValueError(f"kode respons harus {CODE_LENGTH} karakter, diterima {len(chars)}")
+    try:
+        return "".join(ALPHABET[_DECODE[c]] for c in chars)
+    except KeyError as exc:
+        raise ValueError(f"karakter tidak dikenal dalam kode respons: {exc.args[0]!r}") from None
+
+
+def decode(code: str) -> ScreeningInput:
+    """ScreeningInput dari kode respons; ValueError bila rusak/salah ketik."""
+    value = 0
+    for c in normalize(code):
+        value = (value << 5) | _DECODE[c]
+    payload = value >> _CHECK_BITS
+    if _check(payload) != value & ((1 << _CHECK_BITS) - 1):
+        raise ValueError("kode respons tidak valid (cek gagal, mungkin salah ketik)")
+    if payload >> (_PAYLOAD_BITS - _VERSION_BITS) != VERSION:
+        raise ValueError(f"versi kode respons {payload >> (_PAYLOAD_BITS - _VERSION_BITS)} tidak didukung")
+
+    fields = {}
+    for name, bits in reversed(_LAYOUT):
+        fields[name] = payload & ((1 << bits) - 1)
+        payload >>= bits
+    if fields["age"] > MAX_AGE or fields["sex"] >= len(SEX_OPTIONS):
+        raise ValueError("kode respons tidak valid (usia/jenis kelamin di luar rentang)")
+
+    n = len(_GERDQ.questions)
+    gerdq = fields["gerdq"]
+    return ScreeningInput(
+        age=fields["age"],
+        sex=SEX_OPTIONS[fields["sex"]],
+        gerdq_answers=tuple(
+            (gerdq >> (_GERDQ_BITS * (n - 1 - i))) & ((1 << _GERDQ_BITS) - 1) for i in range(n)
+        ),
+        family_history=bool(fields["family_history"]),
+        smoker=bool(fields["smoker"]),
+        **{
+            prefix: tuple(
+                q for i, q in enumerate(catalog) if fields[prefix] >> (len(catalog) - 1 - i) & 1
+            )
+            for prefix, catalog in _CHECKLISTS
+        },
+    )
+
+
+def display(code: str) -> str:
+    """Kode dalam kelompok mudah dibaca: XXXX-XXXX-XXX."""
+    code = normalize(code)
+    return f"{code[:4]}-{code[4:8]}-{code[8:]}"
+
+
+def restore_url(code: str) -> str | None:
+    """Tautan ke aplikasi yang memuat ulang respons, bila ISI_PERUT_PUBLIC_URL diisi."""
+    return f"{PUBLIC_URL}/?kode={normalize(code)}" if PUBLIC_URL else None
+
+
+# ------------------ WIDGET app.py ------------------
+# Key widget sama dengan kolom masukan batch.py: gerdq1..6, egd_alarm_0..,
+# age, sex, family_history, smoker (butir APCS ber-`source` memakai key data
+# pribadinya)
+_POINT_KEYS = {item.id: item.key or item.source for item in questionnaires.get("apcs").items}
+
+
+def widget_state(inp: ScreeningInput) -> dict:
+    """{key widget: nilai} untuk st.session_state — memuat ulang respons di halaman."""
+    state = {
+        _POINT_KEYS["age"]: int(inp.age),
+        _POINT_KEYS["sex"]: inp.sex,
+        _POINT_KEYS["family_history"]: FHX_OPTIONS[int(bool(inp.family_history))],
+        _POINT_KEYS["smoker"]: SMOKE_OPTIONS[int(bool(inp.smoker))],
+    }
+    for q, a in zip(_GERDQ.questions, inp.gerdq_answers):
+        state[q.key] = GERDQ_OPTIONS[gerdq_index(a)]
+    for inst_id in ("egd", "colo"):
+        for cat in questionnaires.get(inst_id).categories:
+            chosen = set(getattr(inp, cat.key_prefix, ()))
+            state.update((k, q in chosen) for q, k in zip(cat.items, cat.keys))
+    return state
+
+
+def from_widget_state(state: Mapping) -> ScreeningInput:
+    """Kebalikan widget_state: respons dari nilai widget (key yang belum ada = nilai awal)."""
+    selected = {}
+    for inst_id in ("egd", "colo"):
+        for cat in questionnaires.get(inst_id).categories:
+            selected[cat.key_prefix] = tuple(
+                q for q, k in zip(cat.items, cat.keys) if state.get(k, False)
+            )
+    return ScreeningInput(
+        age=int(state.get(_POINT_KEYS["age"], DEFAULT_AGE)),
+        sex=state.get(_POINT_KEYS["sex"], SEX_OPTIONS[0]),
+        gerdq_answers=tuple(gerdq_index(state.get(q.key, 0)) for q in _GERDQ.questions),
+        family_history=state.get(_POINT_KEYS["family_history"]) == FHX_OPTIONS[1],
+        smoker=state.get(_POINT_KEYS["smoker"]) == SMOKE_OPTIONS[1],
+        **selected,
+    )
+
+
+def main(argv=None):
+    """Uraikan kode respons dari argumen baris perintah."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("pemakaian: python response_code.py KODE [KODE ...]", file=sys.stderr)
+        return 2
+    for code in argv:
+        try:
+            print(f"{display(code)}: {decode(code)}")
+        except ValueError as exc:
+            print(f"{code}: {exc}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+# rules.py — ISI PERUT
+# Mesin aturan triase: tabel keputusan deklaratif (rules.json) untuk verdikt
+# kebutuhan EGD/kolonoskopi, dikompilasi sekali per proses.
+#
+# Tiap tabel berisi aturan berurutan {"when": {fakta: syarat}, "then": hasil};
+# aturan pertama yang cocok menang (seperti if/elif). Fakta yang dikenal:
+#   alarm / risk / other     ada butir terpilih di kategori checklist itu
+#   <id instrumen berskor>   skor instrumen itu dalam rentang, mis.
+#                            {"apcs": {"min": 4}} atau {"gerdq": {"max": 7}}
+#
+# Kompilasi: tiap aturan menjadi pasangan bitmask (mask, value) atas bit
+# fakta, lalu SELURUH kombinasi fakta yang mungkin dievaluasi di muka menjadi
+# `table` (bytes, kode fakta -> indeks hasil). Evaluasi = susun kode fakta +
+# satu indeks tabel, berapa pun jumlah aturannya; skor dipetakan ke bit
+# faktanya lewat tabel per skor. Tabel yang tidak lengkap (ada kombinasi
+# tanpa hasil) atau punya aturan yang tidak pernah terpakai ditolak saat
+# kompilasi.
+#
+#   python rules.py    # validasi & cetak tabel kebenaran tiap tabel
+#   python -m pytest tests/test_rules.py   # penolakan tabel cacat
+
+import itertools
+import json
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping, NamedTuple, Sequence
+
+import questionnaires
+from questionnaires import LEVELS
+
+RULES_PATH = Path(__file__).resolve().parent / "rules.json"
+
+MAX_FACTS = 16       # tabel 2^16 entri
+IMPOSSIBLE = 255     # kode fakta yang tidak mungkin muncul
+
+
+class RuleError(ValueError):
+    """rules.json tidak sesuai skema atau tabel keputusannya cacat."""
+
+
+class Outcome(NamedTuple):
+    """Hasil triase; `text` masih berisi {organ}."""
+
+    id: str
+    level: int       # urutan kedaruratan: 0 pemantauan, 1 elektif, 2 segera
+    label: str
+    text: str
+    badge: str
+    advice: str
+
+
+@dataclass(frozen=True)
+class Fact:
+    name: str                 # mis. "alarm", "apcs>=4"
+    source: str               # level checklist atau id instrumen berskor
+    min: int | None = None
+    max: int | None = None
+
+    def holds(self, score: int) -> bool:
+        return (self.min is None or score >= self.min) and (self.max is None or score <= self.max)
+
+
+@dataclass(frozen=True)
+class Rule:
+    mask: int      # bit fakta yang disyaratkan
+    value: int     # nilai bit-bit itu
+    outcome: int   # indeks ke Ruleset.outcomes
+    row: int       # nomor aturan di tabel (untuk pesan galat)
+
+    def matches(self, code: int) -> bool:
+        return code & self.mask == self.value
+
+
+@dataclass(frozen=True)
+class DecisionTable:
+    id: str
+    instruments: tuple[str, ...]
+    facts: tuple[Fact, ...]                               # bit i = facts[i]
+    rules: tuple[Rule, ...]
+    level_bits: tuple[int, ...]                           # bit per LEVELS (0 = tidak dipakai)
+    score_bits: tuple[tuple[str, tuple[int, ...]], ...]   # (id instrumen, bit per skor)
+    table: bytes                                          # kode fakta -> indeks hasil
+
+    @property
+    def scores(self) -> tuple[str, ...]:
+        """Instrumen yang skornya dibutuhkan tabel ini."""
+        return tuple(source for source, _ in self.score_bits)
+
+    def code(self, flags: Sequence, scores: Mapping[str, int] | None = None) -> int:
+        """Kode fakta dari (alarm, risk, other) + {id instrumen: skor}."""
+        code = 0
+        for flag, bit in zip(flags, self.level_bits):
+            if flag:
+                code |= bit
+        for source, bits in self.score_bits:
+            if scores is None or source not in scores:
+                raise ValueError(f"tabel '{self.id}' membutuhkan skor {source}")
+            code |= bits[scores[source]]
+        return code
+
+    def evaluate(self, flags: Sequence, scores: Mapping[str, int] | None = None) -> int:
+        """Indeks hasil (Ruleset.outcomes) untuk satu respons."""
+        return self.table[self.code(flags, scores)]
+
+    def fired(self, code: int) -> Rule:
+        """Aturan yang menghasilkan `code` (untuk penjelasan/debug)."""
+        return next(r for r in self.rules if r.matches(code))
+
+
+@dataclass(frozen=True)
+class Ruleset:
+    outcomes: tuple[Outcome, ...]
+    tables: dict[str, DecisionTable]
+
+    def for_instrument(self, instrument_id: str) -> DecisionTable:
+        return next(t for t in self.tables.values() if instrument_id in t.instruments)
+
+
+# ------------------ KOMPILASI ------------------
+def _require(spec: dict, key: str, where: str):
+    if key not in spec:
+        raise RuleError(f"{where}: '{key}' wajib ada")
+    return spec[key]
+
+
+def _fact(name: str, cond, where: str) -> tuple[Fact, bool]:
+    """(fakta, nilai yang disyaratkan) dari satu syarat `when`."""
+    if name in LEVELS:
+        if not isinstance(cond, bool):
+            raise RuleError(f"{where}: syarat '{name}' harus true/false")
+        return Fact(name, name), cond
+    instruments = questionnaires.load()
+    if name not in instruments or not hasattr(instruments[name], "outcomes"):
+        raise RuleError(f"{where}: fakta '{name}' tidak dikenal ({', '.join(LEVELS)} atau id instrumen berskor)")
+    if not isinstance(cond, dict) or not cond.keys() & {"min", "max"} or cond.keys() - {"min", "max"}:
+        raise RuleError(f"{where}: syarat skor '{name}' harus {{\"min\": n}} dan/atau {{\"max\": n}}")
+    lo, hi = cond.get("min"), cond.get("max")
+    label = f"{name}>={lo}" if hi is None else f"{name}<={hi}" if lo is None else f"{lo}<={name}<={hi}"
+    return Fact(label, name, lo, hi), True
+
+
+def _max_score(source: str) -> int:
+    return len(questionnaires.get(source).outcomes) - 1
+
+
+def _table(spec: dict, outcome_ids: dict[str, int], where: str) -> DecisionTable:
+    facts: list[Fact] = []
+    rows = []
+    for n, r in enumerate(_require(spec, "rules", where), start=1):
+        at = f"{where}, aturan #{n}"
+        if _require(r, "then", at) not in outcome_ids:
+            raise RuleError(f"{at}: hasil '{r['then']}' tidak dikenal ({', '.join(outcome_ids)})")
+        mask = value = 0
+        for name, cond in r.get("when", {}).items():
+            fact, want = _fact(name, cond, at)
+            if fact not in facts:
+                facts.append(fact)
+            bit = 1 << facts.index(fact)
+            mask |= bit
+            value |= bit if want else 0
+        rows.append(Rule(mask, value, outcome_ids[r["then"]], n))
+    if len(facts) > MAX_FACTS:
+        raise RuleError(f"{where}: paling banyak {MAX_FACTS} fakta, diterima {len(facts)}")
+
+    bit_of = {f: 1 << i for i, f in enumerate(facts)}
+    level_bits = tuple(sum(b for f, b in bit_of.items() if f.source == level) for level in LEVELS)
+    sources = list(dict.fromkeys(f.source for f in facts if f.source not in LEVELS))
+    score_bits = tuple(
+        (src, tuple(
+            sum(b for f, b in bit_of.items() if f.source == src and f.holds(s))
+            for s in range(_max_score(src) + 1)
+        ))
+        for src in sources
+    )
+
+    # Semua kode fakta yang mungkin: kombinasi level × pola bit tiap skor
+    level_codes = {
+        sum(b for b, on in zip(level_bits, flags) if on)
+        for flags in itertools.product((False, True), repeat=len(LEVELS))
+    }
+    reachable = {
+        lv | sum(combo)
+        for lv in level_codes
+        for combo in itertools.product(*(set(bits) for _, bits in score_bits))
+    }
+    table = bytearray([IMPOSSIBLE]) * (1 << len(facts))
+    used = set()
+    for code in sorted(reachable):
+        rule = next((r for r in rows if r.matches(code)), None)
+        if rule is None:
+            names = [f.name for f in facts if code & bit_of[f]] or ["(tidak ada)"]
+            raise RuleError(f"{where}: tidak ada aturan untuk fakta {', '.join(names)}")
+        table[code] = rule.outcome
+        used.add(rule.row)
+    unused = [r.row for r in rows if r.row not in used]
+    if unused:
+        raise RuleError(f"{where}: aturan #{', #'.join(map(str, unused))} tidak pernah terpakai")
+
+    return DecisionTable(
+        id=_require(spec, "id", where),
+        instruments=tuple(_require(spec, "instruments", where)),
+        facts=tuple(facts),
+        rules=tuple(rows),
+        level_bits=level_bits,
+        score_bits=score_bits,
+        table=bytes(table),
+    )
+
+
+def compile_rules(doc: dict) -> Ruleset:
+    outcomes = tuple(
+        Outcome(o["id"], int(o["level"]), o["label"], o["text"], o["badge"], o["advice"])
+        for o in _require(doc, "outcomes", "aturan")
+    )
+    if len(outcomes) >= IMPOSSIBLE:
+        raise RuleError(f"paling banyak {IMPOSSIBLE - 1} hasil")
+    outcome_ids = {o.id: i for i, o in enumerate(outcomes)}
+    tables = {}
+    for n, spec in enumerate(_require(doc, "tables", "aturan")):
+        t = _table(spec, outcome_ids, f"tabel #{n} ({spec.get('id', '?')})")
+        if t.id in tables:
+            raise RuleError(f"tabel #{n}: id ganda '{t.id}'")
+        tables[t.id] = t
+
+    # Tiap instrumen checklist tepat satu tabel
+    covered = [i for t in tables.values() for i in t.instruments]
+    for inst in questionnaires.load().values():
+        if inst.kind == "checklist" and covered.count(inst.id) != 1:
+            raise RuleError(f"instrumen checklist '{inst.id}' harus ada di tepat satu tabel")
+    return Ruleset(outcomes, tables)
+
+
+@lru_cache(maxsize=None)
+def load(path: Path = RULES_PATH) -> Ruleset:
+    """Tabel keputusan terkompilasi, sekali per proses (per path)."""
+    with open(path, encoding="utf-8") as f:
+        return compile_rules(json.load(f))
+
+
+def main():
+    ruleset = load()
+    for t in ruleset.tables.values():
+        print(f"{t.id} ({', '.join(t.instruments)}): {len(t.rules)} aturan, {len(t.facts)} fakta")
+        for code, idx in enumerate(t.table):
+            if idx == IMPOSSIBLE:
+                continue
+            names = [f.name for i, f in enumerate(t.facts) if code >> i & 1] or ["-"]
+            print(f"  {', '.join(names):40} -> {ruleset.outcomes[idx].id:9} (aturan #{t.fired(code).row})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
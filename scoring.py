@@ -0,0 +1,206 @@
+# scoring.py — ISI PERUT
+# Logika skoring murni: GERD-Q, APCS, dan verdikt kebutuhan EGD/kolonoskopi.
+#
+# Modul ini sengaja tidak mengimpor Streamlit maupun ReportLab sehingga bisa
+# dipakai oleh halaman Streamlit, proses batch, API, maupun pengujian.
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from math import prod
+from typing import Mapping, NamedTuple, Sequence
+
+import questionnaires
+import rules
+
+# Pertanyaan, bobot, dan pita hasil ada di questionnaires.json (dikompilasi
+# sekali per proses oleh questionnaires.py); modul ini membungkusnya menjadi
+# API bertipe yang dipakai halaman, batch, kohort, dan PDF.
+_GERDQ = questionnaires.get("gerdq")
+_APCS = questionnaires.get("apcs")
+_EGD = questionnaires.get("egd")
+_COLO = questionnaires.get("colo")
+
+# ------------------ GERD-Q ------------------
+GERDQ_OPTIONS = list(_GERDQ.options)
+
+# Pertanyaan yang diskor terbalik (Q3 nyeri ulu hati & Q4 mual: 3,2,1,0)
+GERDQ_REVERSED = tuple(i for i, q in enumerate(_GERDQ.questions) if q.weights[0] > q.weights[-1])
+GERDQ_THRESHOLD = _GERDQ.threshold
+
+
+def gerdq_index(ans) -> int:
+    return _GERDQ.index(ans)
+
+
+@dataclass(frozen=True)
+class GerdQResult:
+    score: int
+    badge: str
+    title: str
+    text: str
+    summary: str
+
+    @property
+    def positive(self) -> bool:
+        return self.score >= GERDQ_THRESHOLD
+
+
+def score_gerdq(answers: Sequence) -> GerdQResult:
+    """
+    Skor GERD-Q dari 6 jawaban (teks GERDQ_OPTIONS atau indeks 0–3)
+    sesuai urutan pertanyaan Q1..Q6.
+    """
+    if len(answers) != 6:
+        raise ValueError(f"GERD-Q membutuhkan 6 jawaban, diterima {len(answers)}")
+    return _GERDQ_RESULTS[_GERDQ.table[_GERDQ.code(answers)]]
+
+
+# Hasil per skor (0–18), dibuat sekali; skoring = dua indeks tabel
+_GERDQ_RESULTS = tuple(GerdQResult(o.score, o.badge, o.title, o.text, o.summary) for o in _GERDQ.outcomes)
+
+
+# ------------------ APCS ------------------
+SEX_OPTIONS = list(_APCS.item("sex").options)
+FHX_OPTIONS = list(_APCS.item("family_history").options)
+SMOKE_OPTIONS = list(_APCS.item("smoker").options)
+
+
+@dataclass(frozen=True)
+class ApcsInput:
+    age: int
+    sex: str
+    family_history: bool = False
+    smoker: bool = False
+
+
+@dataclass(frozen=True)
+class ApcsResult:
+    score: int
+    kategori: str
+    pesan: str
+    badge: str
+
+
+def apcs_age_score(age: int) -> int:
+    return _APCS.item("age").value_points(age)
+
+
+def score_apcs(inp: ApcsInput) -> ApcsResult:
+    """Skor Asia-Pacific Colorectal Screening (0–7) beserta kategorinya."""
+    try:
+        sex = _SEX_INDEX[inp.sex]
+    except KeyError:
+        raise ValueError(f"jenis kelamin tidak dikenal: {inp.sex!r}") from None
+    code = (
+        bisect_right(_AGE_EDGES, inp.age) * _APCS_STRIDES[0]
+        + sex * _APCS_STRIDES[1]
+        + bool(inp.family_history) * _APCS_STRIDES[2]
+        + bool(inp.smoker) * _APCS_STRIDES[3]
+    )
+    return _APCS_RESULTS[_APCS.table[code]]
+
+
+def apcs_category(score_apcs: int) -> tuple[str, str, str]:
+    """(kategori, pesan, badge) untuk skor APCS."""
+    o = _APCS.outcomes[max(0, min(score_apcs, _APCS.max_score))]
+    return o.label, o.text, o.badge
+
+
+# Hasil per skor (0–7), dibuat sekali; kode tabel dihitung langsung dari
+# ApcsInput (urutan butir di skema: usia, jenis kelamin, keluarga, rokok)
+_APCS_RESULTS = tuple(ApcsResult(o.score, o.label, o.text, o.badge) for o in _APCS.outcomes)
+assert [i.id for i in _APCS.items] == ["age", "sex", "family_history", "smoker"]
+_APCS_STRIDES = [prod(i.radix for i in _APCS.items[k + 1:]) for k in range(len(_APCS.items))]
+_AGE_EDGES = [hi + 1 for hi, _ in _APCS.item("age").bands[:-1]]   # 45, 70
+_SEX_INDEX = {opt: i for i, opt in enumerate(SEX_OPTIONS)}
+
+
+# ------------------ ITEM CHECKLIST EGD & KOLO ------------------
+ALARM_EGD = list(_EGD.category("alarm").items)
+
+ALARM_COLO = list(_COLO.category("alarm").items)
+RISK_COLO = list(_COLO.category("risk").items)
+OTHER_COLO = list(_COLO.category("other").items)
+
+
+# ------------------ VERDIKT EGD & KOLO ------------------
+# Aturan triase (alarm ⇒ segera, risiko/lain ⇒ elektif, selain itu ⇒
+# pemantauan) ada sebagai tabel keputusan di rules.json, dikompilasi sekali
+# per proses oleh rules.py; verdikt = kode fakta + satu indeks tabel.
+ORGAN_EGD = _EGD.organ
+ORGAN_COLO = _COLO.organ
+
+
+class Verdict(NamedTuple):
+    text: str
+    badge: str
+    advice: str
+    id: str      # id hasil di rules.json (mis. "urgent")
+    label: str   # pemantauan / elektif / segera
+
+
+_RULES = rules.load()
+# Per organ: (tabel keputusan, Verdict per hasil dengan nama organ terisi)
+_TRIAGE = {
+    inst.organ: (
+        _RULES.for_instrument(inst.id),
+        tuple(Verdict(o.text.format(organ=inst.organ), o.badge, o.advice, o.id, o.label) for o in _RULES.outcomes),
+    )
+    for inst in questionnaires.load().values()
+    if inst.kind == "checklist"
+}
+
+
+def verdict(alarm, risk, other, organ, scores: Mapping[str, int] | None = None) -> Verdict:
+    """
+    Verdikt kebutuhan pemeriksaan `organ` dari butir alarm/risiko/lain yang
+    terpilih. `scores` ({id instrumen: skor}) hanya wajib bila tabel
+    keputusannya memakai skor (mis. APCS).
+    """
+    table, verdicts = _TRIAGE[organ]
+    if table.score_bits:
+        return verdicts[table.evaluate((alarm, risk, other), scores)]
+    # Jalur cepat (hanya fakta checklist): kode fakta langsung dari level_bits
+    b_alarm, b_risk, b_other = table.level_bits
+    return verdicts[table.table[(b_alarm if alarm else 0) | (b_risk if risk else 0) | (b_other if other else 0)]]
+
+
+# ------------------ SKRINING LENGKAP ------------------
+@dataclass(frozen=True)
+class ScreeningInput:
+    """Satu respons ISI PERUT lengkap (item checklist berupa teks pertanyaan)."""
+
+    age: int
+    sex: str
+    gerdq_answers: Sequence = (0, 0, 0, 0, 0, 0)
+    egd_alarm: Sequence[str] = ()
+    colo_alarm: Sequence[str] = ()
+    colo_risk: Sequence[str] = ()
+    colo_other: Sequence[str] = ()
+    family_history: bool = False
+    smoker: bool = False
+
+
+@dataclass(frozen=True)
+class ScreeningResult:
+    gerdq: GerdQResult
+    apcs: ApcsResult
+    egd: Verdict
+    colo: Verdict
+    r_egd: list = field(default_factory=list)
+    r_colo: list = field(default_factory=list)
+
+
+def screen(inp: ScreeningInput) -> ScreeningResult:
+    """Jalankan seluruh skoring ISI PERUT untuk satu respons."""
+    gerdq = score_gerdq(inp.gerdq_answers)
+    apcs = score_apcs(ApcsInput(inp.age, inp.sex, inp.family_history, inp.smoker))
+    scores = {"gerdq": gerdq.score, "apcs": apcs.score}
+    return ScreeningResult(
+        gerdq=gerdq,
+        apcs=apcs,
+        egd=verdict(inp.egd_alarm, [], [], ORGAN_EGD, scores),
+        colo=verdict(inp.colo_alarm, inp.colo_risk, inp.colo_other, ORGAN_COLO, scores),
+        r_egd=list(inp.egd_alarm),
+        r_colo=list(inp.colo_alarm) + list(inp.colo_risk) + list(inp.colo_other),
+    )
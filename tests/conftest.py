@@ -0,0 +1,5 @@
+# Modul aplikasi berupa berkas datar di root repo: buat bisa diimpor tes
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
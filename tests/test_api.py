@@ -0,0 +1,88 @@
+# Validasi masukan api.py (dan batch.parse_row yang dipakainya): masukan
+# yang salah dijawab 400 dengan nama kolomnya, bukan diskor dengan jawaban
+# bawaan.
+
+import pytest
+
+from api import ApiError, parse_response, score_batch, score_one
+
+VALID = {"name": "Budi", "age": 50, "sex": "Laki-laki", "gerdq1": 2, "egd_alarm_0": 1}
+
+
+def rejected(obj, fn=score_one) -> str:
+    with pytest.raises(ApiError) as info:
+        fn(obj)
+    assert info.value.status == 400
+    return str(info.value)
+
+
+def test_valid_response_is_scored():
+    out = score_one(VALID)
+    assert (out["name"], out["age"], out["sex"]) == ("Budi", 50, "Laki-laki")
+    name, today, inp = parse_response({**VALID, "today": " 1 Jan 2026 "})
+    assert today == "1 Jan 2026" and inp.gerdq_answers[0] == 2 and inp.egd_alarm
+
+
+def test_batch_envelope_on_single_endpoint_is_rejected():
+    assert "'responses'" in rejected({"responses": [VALID]})
+
+
+@pytest.mark.parametrize("key", ["responses", "gerdq_1", "umur"])
+def test_unknown_key(key):
+    assert repr(key) in rejected({**VALID, key: 1})
+
+
+@pytest.mark.parametrize("key", ["age", "gerdq3"])
+def test_bool_in_numeric_field(key):
+    assert repr(key) in rejected({**VALID, key: True})
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [("egd_alarm_0", {"x": 1}), ("smoker", [1]), ("sex", {"v": "L"}), ("today", {"d": 1})],
+)
+def test_non_scalar_value(key, value):
+    assert repr(key) in rejected({**VALID, key: value})
+
+
+@pytest.mark.parametrize("key", ["name", "today"])
+def test_text_field_must_be_text(key):
+    assert repr(key) in rejected({**VALID, key: 17})
+
+
+@pytest.mark.parametrize("key", ["age", "sex"])
+@pytest.mark.parametrize("blank", [None, "", "  "])
+def test_age_and_sex_required(key, blank):
+    assert repr(key) in rejected({**VALID, key: blank})
+    assert repr(key) in rejected({k: v for k, v in VALID.items() if k != key})
+
+
+@pytest.mark.parametrize(
+    "key, value", [("age", 121), ("age", "1e400"), ("age", "tua"), ("sex", "x"), ("gerdq2", 4)]
+)
+def test_out_of_range_names_field(key, value):
+    assert repr(key) in rejected({**VALID, key: value})
+
+
+def test_kode_form():
+    out = score_one({"kode": "4000-0002-T1V", "name": "Budi"})
+    assert out["name"] == "Budi"
+    assert "'age'" in rejected({"kode": "4000-0002-T1V", "age": 50})
+    assert "'kode'" in rejected({"kode": 40000002})
+    assert "'kode'" in rejected({"kode": ""})
+    assert "kode respons" in rejected({"kode": "4000-0002-T1W"})
+
+
+def test_batch_reports_item_index():
+    assert "#1" in rejected({"responses": [VALID, {**VALID, "age": True}]}, score_batch)
+    assert "responses" in rejected({"responses": [VALID], "extra": 1}, score_batch)
+    assert len(score_batch({"responses": [VALID, VALID]})["results"]) == 2
+    assert len(score_batch([VALID])["results"]) == 1
+
+
+def test_single_and_batch_records_match():
+    rows = [VALID, {**VALID, "age": 80, "sex": "P", "colo_risk_1": "ya"}, {"kode": "4000-0002-T1V"}]
+    singles = [score_one(r) for r in rows]
+    assert score_batch({"responses": rows})["results"] == singles
+    assert singles[2]["kode"] == "4000-0002-T1V"
+    assert singles[0]["egd_verdict"] == "segera" and singles[2]["colo_verdict"] == "pemantauan"
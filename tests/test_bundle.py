@@ -0,0 +1,68 @@
+# PDF gabungan bundle.py dan keluaran batch.py: surat dirender sekali, lalu
+# bytes yang sama masuk ke direktori PDF, ZIP, dan jilid gabungan.
+
+import json
+import zipfile
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+import batch
+from bundle import VolumeWriter, _xref, read_pages
+from scoring import ScreeningInput
+
+
+@pytest.fixture(scope="module")
+def docs():
+    inp = ScreeningInput(age=60, sex="Laki-laki", smoker=True)
+    return [batch.render_documents(f"Pasien {i}", "1 Jan 2026", inp) for i in range(3)]
+
+
+def images(data: bytes) -> int:
+    _, objects = read_pages(data)
+    return sum(b"/Subtype /Image" in objects[n][0] for n in _xref(data)[1])
+
+
+def test_merged_volumes(docs, tmp_path):
+    with VolumeWriter(tmp_path / "surat.pdf", patients=3, volume_size=2) as v:
+        names = [v.add(d) for d in docs]
+    assert names == ["surat-0001.pdf", "surat-0001.pdf", "surat-0002.pdf"]
+
+    per_letter = images(docs[0][0])
+    for name, patients in (("surat-0001.pdf", 2), ("surat-0002.pdf", 1)):
+        data = (tmp_path / name).read_bytes()
+        pages, objects = read_pages(data)
+        assert len(pages) == 2 * patients
+        # Logo disimpan sekali per jilid, bukan sekali per surat
+        assert images(data) == per_letter
+        # Tiap entri xref menunjuk ke awal objeknya
+        for num, offset in _xref(data)[1].items():
+            assert data.startswith(b"%d 0 obj" % num, offset)
+
+
+def test_single_volume_keeps_name(docs, tmp_path):
+    with VolumeWriter(tmp_path / "surat.pdf", patients=1) as v:
+        assert v.add(docs[0]) == "surat.pdf"
+    assert len(read_pages((tmp_path / "surat.pdf").read_bytes())[0]) == 2
+
+
+def test_batch_all_outputs_share_bytes(tmp_path):
+    src = tmp_path / "pasien.jsonl"
+    src.write_text("".join(
+        json.dumps({"name": f"Pasien {i}", "age": 40 + i, "sex": "Perempuan", "today": "1 Jan 2026"}) + "\n"
+        for i in range(3)
+    ))
+    pdf_dir, zip_path, merged = tmp_path / "pdf", tmp_path / "surat.zip", tmp_path / "surat.pdf"
+    batch.main([
+        str(src), "-o", str(tmp_path / "hasil.jsonl"), "--workers", "1",
+        "--pdf-dir", str(pdf_dir), "--zip", str(zip_path), "--merged", str(merged),
+    ])
+
+    records = [json.loads(line) for line in (tmp_path / "hasil.jsonl").read_text().splitlines()]
+    files = [r[k] for r in records for k in ("pdf_letterhead", "pdf_apcs")]
+    with zipfile.ZipFile(zip_path) as z:
+        assert z.namelist() == files
+        for f in files:
+            assert z.read(f) == (pdf_dir / f).read_bytes()
+    assert len(read_pages(merged.read_bytes())[0]) == len(files)
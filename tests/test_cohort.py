@@ -0,0 +1,116 @@
+# Skoring kohort (cohort.py) harus identik dengan jalur interaktif
+# scoring.screen(), dan menolak masukan yang tidak valid alih-alih
+# membungkus/menebak nilainya.
+
+import numpy as np
+import pytest
+
+from cohort import (
+    APCS_CATEGORIES,
+    arrays_from_inputs,
+    score_cohort,
+    verdict_for_class,
+)
+from scoring import (
+    ALARM_COLO,
+    ALARM_EGD,
+    ORGAN_COLO,
+    ORGAN_EGD,
+    OTHER_COLO,
+    RISK_COLO,
+    SEX_OPTIONS,
+    ScreeningInput,
+    screen,
+)
+
+
+def random_inputs(n: int, seed: int = 0) -> list[ScreeningInput]:
+    rng = np.random.default_rng(seed)
+
+    def pick(catalog, p):
+        return tuple(q for q in catalog if rng.random() < p)
+
+    return [
+        ScreeningInput(
+            age=int(rng.integers(0, 121)),
+            sex=SEX_OPTIONS[rng.integers(0, len(SEX_OPTIONS))],
+            gerdq_answers=tuple(int(a) for a in rng.integers(0, 4, 6)),
+            egd_alarm=pick(ALARM_EGD, 0.1),
+            colo_alarm=pick(ALARM_COLO, 0.1),
+            colo_risk=pick(RISK_COLO, 0.2),
+            colo_other=pick(OTHER_COLO, 0.2),
+            family_history=bool(rng.random() < 0.3),
+            smoker=bool(rng.random() < 0.3),
+        )
+        for _ in range(n)
+    ]
+
+
+def arrays(n: int = 4, **overrides) -> dict:
+    return dict(arrays_from_inputs(random_inputs(n)), **overrides)
+
+
+# ------------------ KESAMAAN DENGAN screen() ------------------
+def test_cohort_matches_screen():
+    inputs = random_inputs(5_000, seed=6)
+    res = score_cohort(**arrays_from_inputs(inputs))
+    mismatches = []
+    for i, inp in enumerate(inputs):
+        ref = screen(inp)
+        got = (
+            int(res.gerdq_score[i]),
+            bool(res.gerdq_positive[i]),
+            int(res.apcs_score[i]),
+            APCS_CATEGORIES[res.apcs_category[i]],
+            verdict_for_class(res.egd_verdict[i], ORGAN_EGD),
+            verdict_for_class(res.colo_verdict[i], ORGAN_COLO),
+        )
+        expected = (ref.gerdq.score, ref.gerdq.positive, ref.apcs.score, ref.apcs.kategori, ref.egd, ref.colo)
+        if got != expected:
+            mismatches.append(f"#{i} {inp}: {got} != {expected}")
+    assert not mismatches, mismatches[:10]
+
+
+def test_bool_sex_matches_text_sex():
+    inputs = [inp for inp in random_inputs(500, seed=7) if inp.sex in SEX_OPTIONS[:2]]
+    args = arrays_from_inputs(inputs)
+    as_text = score_cohort(**args)
+    as_bool = score_cohort(**dict(args, sex=args["sex"] == SEX_OPTIONS[0]))
+    assert np.array_equal(as_text.apcs_score, as_bool.apcs_score)
+
+
+# ------------------ MASUKAN TIDAK VALID ------------------
+def test_unknown_sex_names_rows():
+    args = arrays(4)
+    sex = args["sex"].astype(object)
+    sex[1], sex[3] = "L", "pria"
+    with pytest.raises(ValueError, match=r"2 baris: #1 'L', #3 'pria'"):
+        score_cohort(**dict(args, sex=sex))
+
+
+@pytest.mark.parametrize("bad", [4, -1, 256, 2**40, 2**64 - 1])
+def test_gerdq_out_of_range_rejected(bad):
+    args = arrays(3)
+    gerdq = args["gerdq"].astype(np.uint64 if bad >= 2**63 else np.int64)
+    gerdq[2, 4] = bad
+    with pytest.raises(ValueError, match="0–3"):
+        score_cohort(**dict(args, gerdq=gerdq))
+
+
+def test_gerdq_out_of_range_in_python_lists_rejected():
+    args = arrays(2)
+    gerdq = args["gerdq"].tolist()
+    gerdq[0][0] = 256  # int8 akan menjadi 0 dan lolos
+    with pytest.raises(ValueError, match="0–3"):
+        score_cohort(**dict(args, gerdq=gerdq))
+
+
+@pytest.mark.parametrize("gerdq", [np.full((2, 6), 1.5), np.full((2, 6), "1")])
+def test_gerdq_must_be_integers(gerdq):
+    with pytest.raises(ValueError, match="bilangan bulat"):
+        score_cohort(**dict(arrays(2), gerdq=gerdq))
+
+
+def test_gerdq_shape_checked():
+    with pytest.raises(ValueError, match=r"\(n, 6\)"):
+        score_cohort(**dict(arrays(2), gerdq=np.zeros((2, 5), dtype=np.int8)))
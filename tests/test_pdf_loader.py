@@ -0,0 +1,38 @@
+# Mode antrean (pdf_queue.py): proses UI/API membangun PDF lewat tier worker,
+# jadi tetap bisa menawarkan unduhan walau reportlab tidak terpasang.
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Proses anak yang tidak bisa menemukan reportlab (seperti deployment UI saja)
+WITHOUT_REPORTLAB = """
+import importlib.util, sys
+find_spec = importlib.util.find_spec
+importlib.util.find_spec = lambda n, *a: None if n.split(".")[0] == "reportlab" else find_spec(n, *a)
+sys.modules["reportlab"] = None
+import pdf_loader, prefork
+prefork.preload_pdf_stack()
+print(pdf_loader.HAS_RL)
+"""
+
+
+def has_rl(tmp_path, queue: bool) -> str:
+    env = {"PATH": "", "PYTHONPATH": str(ROOT)}
+    if queue:
+        env["ISI_PERUT_PDF_QUEUE_DB"] = str(tmp_path / "queue.sqlite3")
+    out = subprocess.run(
+        [sys.executable, "-c", WITHOUT_REPORTLAB], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    assert out.returncode == 0, out.stderr
+    return out.stdout.strip()
+
+
+def test_queue_mode_does_not_need_reportlab(tmp_path):
+    assert has_rl(tmp_path, queue=True) == "True"
+
+
+def test_without_queue_reportlab_is_required(tmp_path):
+    assert has_rl(tmp_path, queue=False) == "False"
@@ -0,0 +1,100 @@
+# Kompilasi questionnaires.json (questionnaires.py): definisi kuesioner yang
+# cacat harus ditolak dengan SchemaError saat kompilasi.
+
+import copy
+import json
+
+import pytest
+
+import questionnaires
+from questionnaires import SchemaError, compile_schema
+
+with open(questionnaires.SCHEMA_PATH, encoding="utf-8") as f:
+    DOC = json.load(f)
+
+
+def edited(inst_id: str, edit) -> dict:
+    """Salinan DOC dengan edit(spec) diterapkan ke instrumen `inst_id`."""
+    doc = copy.deepcopy(DOC)
+    edit(next(s for s in doc["instruments"] if s["id"] == inst_id))
+    return doc
+
+
+def item(spec: dict, item_id: str) -> dict:
+    return next(i for i in spec["items"] if i["id"] == item_id)
+
+
+def rejected(doc, match: str) -> None:
+    with pytest.raises(SchemaError, match=match):
+        compile_schema(doc)
+
+
+def test_shipped_schema_compiles():
+    instruments = compile_schema(copy.deepcopy(DOC))
+    assert list(instruments) == [s["id"] for s in DOC["instruments"]]
+
+
+def test_unknown_kind_rejected():
+    rejected(edited("gerdq", lambda s: s.update(kind="skala")), "jenis 'skala' tidak dikenal")
+
+
+def test_duplicate_id_rejected():
+    doc = copy.deepcopy(DOC)
+    doc["instruments"].append(copy.deepcopy(doc["instruments"][0]))
+    rejected(doc, r"\(gerdq\): id ganda")
+
+
+@pytest.mark.parametrize("inst_id, key", [("gerdq", "title"), ("gerdq", "bands"), ("egd", "organ"), ("apcs", "items")])
+def test_missing_required_key_rejected(inst_id, key):
+    rejected(edited(inst_id, lambda s: s.pop(key)), f"'{key}' wajib ada")
+
+
+def test_missing_instruments_rejected():
+    rejected({}, "'instruments' wajib ada")
+
+
+# ------------------ frequency ------------------
+def test_weights_must_match_options():
+    rejected(edited("gerdq", lambda s: s["questions"][2].update(weights=[3, 2, 1])), "harus 4 angka")
+
+
+def test_last_band_must_be_open():
+    rejected(edited("gerdq", lambda s: s["bands"][-1].update(max=18)), "pita terakhir tidak boleh punya 'max'")
+
+
+def test_bands_must_ascend():
+    def edit(s):
+        s["bands"].insert(0, dict(s["bands"][0], max=9))
+
+    rejected(edited("gerdq", edit), "'max' pita harus naik")
+
+
+def test_max_score_must_fit_one_byte():
+    rejected(
+        edited("gerdq", lambda s: s["questions"][0].update(weights=[0, 1, 2, 250])),
+        "skor maksimum harus ≤255",
+    )
+
+
+# ------------------ checklist ------------------
+def test_checklist_level_must_be_known():
+    rejected(edited("egd", lambda s: s["categories"][0].update(level="darurat")), "level kategori")
+
+
+# ------------------ points ------------------
+def test_points_one_per_option():
+    rejected(edited("apcs", lambda s: item(s, "smoker").update(points=[0])), "poin 'smoker' harus satu per opsi")
+
+
+def test_points_last_band_must_be_open():
+    rejected(
+        edited("apcs", lambda s: item(s, "age")["bands"][-1].update(max=120)),
+        "pita poin 'age' terakhir tidak boleh punya 'max'",
+    )
+
+
+def test_schema_error_reaches_load(tmp_path):
+    bad = tmp_path / "questionnaires.json"
+    bad.write_text(json.dumps(edited("gerdq", lambda s: s.update(kind="skala"))), encoding="utf-8")
+    with pytest.raises(SchemaError):
+        questionnaires.load(bad)
@@ -0,0 +1,209 @@
+# Kode respons (response_code.py): encode/decode bolak-balik untuk tiap nilai
+# tiap bagian respons, cek CRC-7 terhadap salah ketik, normalisasi ketikan,
+# dan widget_state/from_widget_state.
+
+import itertools
+import random
+
+import pytest
+
+import response_code
+from response_code import (
+    ALPHABET,
+    CODE_LENGTH,
+    DEFAULT_AGE,
+    MAX_AGE,
+    decode,
+    display,
+    encode,
+    from_widget_state,
+    normalize,
+    widget_state,
+)
+from scoring import (
+    ALARM_COLO,
+    ALARM_EGD,
+    GERDQ_OPTIONS,
+    OTHER_COLO,
+    RISK_COLO,
+    SEX_OPTIONS,
+    ScreeningInput,
+)
+
+CHECKLISTS = {
+    "egd_alarm": ALARM_EGD,
+    "colo_alarm": ALARM_COLO,
+    "colo_risk": RISK_COLO,
+    "colo_other": OTHER_COLO,
+}
+
+
+def random_input(rng: random.Random, **fixed) -> ScreeningInput:
+    fields = dict(
+        age=rng.randint(0, MAX_AGE),
+        sex=rng.choice(SEX_OPTIONS),
+        gerdq_answers=tuple(rng.randrange(len(GERDQ_OPTIONS)) for _ in range(6)),
+        family_history=rng.random() < 0.5,
+        smoker=rng.random() < 0.5,
+        **{prefix: tuple(q for q in catalog if rng.random() < 0.3) for prefix, catalog in CHECKLISTS.items()},
+    )
+    fields.update(fixed)
+    return ScreeningInput(**fields)
+
+
+def subsets(catalog) -> list[tuple]:
+    return [
+        tuple(q for q, on in zip(catalog, mask) if on)
+        for mask in itertools.product((False, True), repeat=len(catalog))
+    ]
+
+
+def all_field_values():
+    """(bagian, nilai) untuk SETIAP nilai tiap bagian tata letak kode."""
+    for answers in itertools.product(range(len(GERDQ_OPTIONS)), repeat=6):
+        yield "gerdq_answers", answers
+    for prefix, catalog in CHECKLISTS.items():
+        for selected in subsets(catalog):
+            yield prefix, selected
+    for age in range(MAX_AGE + 1):
+        yield "age", age
+    for sex in SEX_OPTIONS:
+        yield "sex", sex
+    for flag in (False, True):
+        yield "family_history", flag
+        yield "smoker", flag
+
+
+def sample_codes(n: int = 300) -> list[str]:
+    rng = random.Random(1)
+    return [encode(random_input(rng)) for _ in range(n)]
+
+
+# ------------------ BOLAK-BALIK ------------------
+def test_round_trip_every_field_value():
+    # Tiap nilai tiap bagian, bagian lain acak: semua bit tata letak terpakai
+    rng = random.Random(0)
+    mismatches = []
+    for name, value in all_field_values():
+        inp = random_input(rng, **{name: value})
+        code = encode(inp)
+        if decode(code) != inp:
+            mismatches.append(f"{name}={value!r}: {code} -> {decode(code)}")
+    assert not mismatches, mismatches[:10]
+
+
+def test_round_trip_random_responses_unique():
+    rng = random.Random(0)
+    seen = {}
+    mismatches = []
+    for _ in range(20_000):
+        inp = random_input(rng)
+        code = encode(inp)
+        if len(code) != CODE_LENGTH or set(code) - set(ALPHABET) or decode(code) != inp:
+            mismatches.append(f"{inp}: {code}")
+        if seen.setdefault(code, inp) != inp:
+            mismatches.append(f"{code}: dua respons berbeda ({seen[code]} / {inp})")
+    assert not mismatches, mismatches[:10]
+
+
+def test_gerdq_text_answers_encode_like_indices():
+    inp = ScreeningInput(age=50, sex=SEX_OPTIONS[1], gerdq_answers=(0, 1, 2, 3, 2, 1))
+    as_text = ScreeningInput(
+        age=50, sex=SEX_OPTIONS[1], gerdq_answers=tuple(GERDQ_OPTIONS[a] for a in inp.gerdq_answers)
+    )
+    assert encode(as_text) == encode(inp)
+
+
+@pytest.mark.parametrize(
+    "inp",
+    [
+        ScreeningInput(age=MAX_AGE + 1, sex=SEX_OPTIONS[0]),
+        ScreeningInput(age=-1, sex=SEX_OPTIONS[0]),
+        ScreeningInput(age=50, sex="x"),
+        ScreeningInput(age=50, sex=SEX_OPTIONS[0], gerdq_answers=(0,) * 5),
+        ScreeningInput(age=50, sex=SEX_OPTIONS[0], egd_alarm=("bukan butir",)),
+    ],
+)
+def test_encode_rejects_invalid_input(inp):
+    with pytest.raises(ValueError):
+        encode(inp)
+
+
+# ------------------ SALAH KETIK (CRC-7) ------------------
+def test_every_single_character_typo_rejected():
+    missed = []
+    for code in sample_codes():
+        for pos in range(CODE_LENGTH):
+            for c in ALPHABET.replace(code[pos], ""):
+                typo = code[:pos] + c + code[pos + 1:]
+                try:
+                    decode(typo)
+                except ValueError:
+                    continue
+                missed.append(f"{code} -> {typo}")
+    assert not missed, missed[:10]
+
+
+def test_every_adjacent_swap_rejected():
+    missed = []
+    for code in sample_codes():
+        for pos in range(CODE_LENGTH - 1):
+            if code[pos] == code[pos + 1]:
+                continue
+            swapped = code[:pos] + code[pos + 1] + code[pos] + code[pos + 2:]
+            try:
+                decode(swapped)
+            except ValueError:
+                continue
+            missed.append(f"{code} -> {swapped}")
+    assert not missed, missed[:10]
+
+
+@pytest.mark.parametrize("code", ["", "4000-0002-T1", "4000-0002-T1VV", "4000-0002-T1U", "4000-0002-T1*"])
+def test_malformed_codes_rejected(code):
+    with pytest.raises(ValueError):
+        decode(code)
+
+
+# ------------------ NORMALISASI ------------------
+def test_normalize_forgives_case_separators_and_ambiguous_letters():
+    code = encode(ScreeningInput(age=DEFAULT_AGE, sex=SEX_OPTIONS[0]))
+    assert code == "40000002T1V"
+    assert display(code) == "4000-0002-T1V"
+    for typed in ("4000-0002-t1v", "4000 0002 T1V", "4OOO-OOO2-TIV", "4ooo-ooo2-tlv", " 40000002T1V "):
+        assert normalize(typed) == code
+        assert decode(typed) == decode(code)
+
+
+def test_display_round_trips():
+    for code in sample_codes(50):
+        assert normalize(display(code)) == code
+        assert decode(display(code).lower()) == decode(code)
+
+
+# ------------------ WIDGET app.py ------------------
+def test_widget_state_round_trip():
+    rng = random.Random(2)
+    mismatches = []
+    for _ in range(2_000):
+        inp = random_input(rng)
+        if from_widget_state(widget_state(inp)) != inp:
+            mismatches.append(str(inp))
+    assert not mismatches, mismatches[:10]
+
+
+def test_widget_state_keys_match_page():
+    state = widget_state(ScreeningInput(age=DEFAULT_AGE, sex=SEX_OPTIONS[0]))
+    expected = {"age", "sex", "family_history", "smoker", *(f"gerdq{i}" for i in range(1, 7))}
+    expected |= {f"{prefix}_{i}" for prefix, catalog in CHECKLISTS.items() for i in range(len(catalog))}
+    assert set(state) == expected
+
+
+def test_empty_widget_state_is_default_response():
+    assert encode(from_widget_state({})) == "40000002T1V"
+
+
+def test_main_decodes_arguments(capsys):
+    assert response_code.main(["4000-0002-t1v"]) == 0
+    assert capsys.readouterr().out.startswith("4000-0002-T1V: ")
+    assert response_code.main(["4000-0002-T1W"]) == 1
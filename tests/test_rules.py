@@ -0,0 +1,126 @@
+# Kompilasi tabel keputusan (rules.py): rules.json yang cacat harus ditolak
+# dengan RuleError saat kompilasi, bukan menghasilkan verdikt diam-diam.
+
+import copy
+import json
+
+import pytest
+
+import rules
+from rules import IMPOSSIBLE, RuleError, compile_rules
+
+with open(rules.RULES_PATH, encoding="utf-8") as f:
+    DOC = json.load(f)
+
+
+def doc_with(*tables) -> dict:
+    doc = copy.deepcopy(DOC)
+    doc["tables"] = [copy.deepcopy(t) for t in tables]
+    return doc
+
+
+def table(*rule_list, id="t", instruments=("egd", "colo")) -> dict:
+    return {"id": id, "instruments": list(instruments), "rules": list(rule_list)}
+
+
+ALARM = {"when": {"alarm": True}, "then": "urgent"}
+RISK = {"when": {"risk": True}, "then": "elective"}
+OTHER = {"when": {"other": True}, "then": "elective"}
+ELSE = {"then": "monitor"}
+
+
+def rejected(doc, match: str) -> None:
+    with pytest.raises(RuleError, match=match):
+        compile_rules(doc)
+
+
+# ------------------ TABEL YANG SAH ------------------
+def test_shipped_rules_compile():
+    ruleset = compile_rules(copy.deepcopy(DOC))
+    t = ruleset.for_instrument("colo")
+    assert ruleset.for_instrument("egd") is t
+    assert IMPOSSIBLE not in t.table  # hanya fakta checklist: semua kode mungkin
+
+
+def test_score_facts_compile_and_evaluate():
+    gerdq_rule = {"when": {"gerdq": {"min": 8}}, "then": "elective"}
+    ruleset = compile_rules(doc_with(table(ALARM, gerdq_rule, RISK, OTHER, ELSE)))
+    t = ruleset.for_instrument("egd")
+    assert t.scores == ("gerdq",)
+    ids = [o.id for o in ruleset.outcomes]
+    assert ids[t.evaluate((False, False, False), {"gerdq": 8})] == "elective"
+    assert ids[t.evaluate((False, False, False), {"gerdq": 7})] == "monitor"
+    assert ids[t.evaluate((True, False, False), {"gerdq": 18})] == "urgent"
+    with pytest.raises(ValueError, match="membutuhkan skor gerdq"):
+        t.evaluate((False, False, False))
+
+
+# ------------------ TABEL TIDAK LENGKAP ------------------
+def test_missing_catch_all_rejected():
+    rejected(doc_with(table(ALARM, RISK, OTHER)), r"tidak ada aturan untuk fakta \(tidak ada\)")
+
+
+def test_uncovered_level_combination_rejected():
+    nothing = {"when": {"alarm": False, "risk": False, "other": False}, "then": "monitor"}
+    rejected(doc_with(table(ALARM, RISK, nothing)), "tidak ada aturan untuk fakta other")
+
+
+def test_uncovered_score_band_rejected():
+    low = {"when": {"apcs": {"max": 2}}, "then": "monitor"}
+    high = {"when": {"apcs": {"min": 4}}, "then": "elective"}
+    rejected(doc_with(table(ALARM, RISK, OTHER, low, high)), "tidak ada aturan untuk fakta")
+
+
+# ------------------ ATURAN TIDAK TERPAKAI ------------------
+def test_rule_after_catch_all_rejected():
+    rejected(doc_with(table(ALARM, RISK, OTHER, ELSE, RISK)), r"aturan #5 tidak pernah terpakai")
+
+
+def test_shadowed_rule_rejected():
+    shadowed = {"when": {"alarm": True, "risk": True}, "then": "elective"}
+    rejected(doc_with(table(ALARM, shadowed, RISK, OTHER, ELSE)), r"aturan #2 tidak pernah terpakai")
+
+
+def test_impossible_score_range_rejected():
+    never = {"when": {"gerdq": {"min": 99}}, "then": "urgent"}
+    rejected(doc_with(table(never, ALARM, RISK, OTHER, ELSE)), r"aturan #1 tidak pernah terpakai")
+
+
+# ------------------ SKEMA ------------------
+@pytest.mark.parametrize(
+    "rule, match",
+    [
+        ({"when": {"alarm": True}, "then": "darurat"}, "hasil 'darurat' tidak dikenal"),
+        ({"when": {"demam": True}, "then": "urgent"}, "fakta 'demam' tidak dikenal"),
+        ({"when": {"egd": {"min": 1}}, "then": "urgent"}, "fakta 'egd' tidak dikenal"),
+        ({"when": {"alarm": 1}, "then": "urgent"}, "syarat 'alarm' harus true/false"),
+        ({"when": {"apcs": 4}, "then": "urgent"}, "syarat skor 'apcs'"),
+        ({"when": {"apcs": {"min": 4, "lebih": 1}}, "then": "urgent"}, "syarat skor 'apcs'"),
+        ({"when": {"alarm": True}}, "'then' wajib ada"),
+    ],
+)
+def test_bad_rule_rejected(rule, match):
+    rejected(doc_with(table(rule, ALARM, RISK, OTHER, ELSE)), match)
+
+
+def test_checklist_without_table_rejected():
+    rejected(doc_with(table(ALARM, RISK, OTHER, ELSE, instruments=["egd"])), "'colo' harus ada di tepat satu tabel")
+
+
+def test_checklist_in_two_tables_rejected():
+    t = table(ALARM, RISK, OTHER, ELSE)
+    rejected(doc_with(t, dict(t, id="t2", instruments=["colo"])), "'colo' harus ada di tepat satu tabel")
+
+
+def test_duplicate_table_id_rejected():
+    rejected(
+        doc_with(table(ALARM, ELSE, instruments=["egd"]), table(ALARM, ELSE, instruments=["colo"])),
+        "id ganda 't'",
+    )
+
+
+@pytest.mark.parametrize("key", ["outcomes", "tables"])
+def test_missing_top_level_key_rejected(key):
+    doc = copy.deepcopy(DOC)
+    del doc[key]
+    rejected(doc, f"'{key}' wajib ada")
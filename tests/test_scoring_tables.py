@@ -0,0 +1,113 @@
+# Tabel GERD-Q & APCS (questionnaires.py) dan tabel keputusan verdikt
+# (rules.py) dibandingkan dengan aturan acuan aslinya, ditulis ulang apa
+# adanya di bawah, untuk SELURUH ruang masukan. Ikut dijalankan setiap kali
+# questionnaires.json atau rules.json berubah:
+#   python -m pytest tests/test_scoring_tables.py
+
+import itertools
+from typing import Sequence
+
+import questionnaires
+from scoring import (
+    GERDQ_OPTIONS,
+    ORGAN_COLO,
+    ORGAN_EGD,
+    SEX_OPTIONS,
+    ApcsInput,
+    apcs_category,
+    score_apcs,
+    score_gerdq,
+    verdict,
+)
+
+GERDQ = questionnaires.get("gerdq")
+APCS = questionnaires.get("apcs")
+
+
+# ------------------ ATURAN ACUAN ------------------
+def reference_gerdq(answers: Sequence[int]) -> int:
+    """GERD-Q: Q1,2,5,6 diskor 0,1,2,3; Q3 (nyeri ulu hati) & Q4 (mual) 3,2,1,0."""
+    return sum(3 - a if i in (2, 3) else a for i, a in enumerate(answers))
+
+
+def reference_apcs(age: int, male: bool, family_history: bool, smoker: bool) -> int:
+    """APCS: usia <45 = 0, 45–69 = 2, ≥70 = 3; laki-laki +1; keluarga +2; rokok +1."""
+    age_score = 0 if age < 45 else 2 if age <= 69 else 3
+    return age_score + int(male) + 2 * int(family_history) + int(smoker)
+
+
+def reference_apcs_category(score: int) -> tuple[str, str]:
+    """(awal label kategori, badge): 0–1 rendah, 2–3 sedang, 4–7 tinggi."""
+    if score <= 1:
+        return "Risiko Rendah", "badge badge-green"
+    if score <= 3:
+        return "Risiko Sedang", "badge badge-gray"
+    return "Risiko Tinggi", "badge badge-red"
+
+
+def reference_verdict(alarm: bool, risk: bool, other: bool) -> str:
+    """Badge verdikt: alarm ⇒ segera (merah), risiko/lain ⇒ elektif (hijau), selain itu abu-abu."""
+    if alarm:
+        return "badge badge-red"
+    if risk or other:
+        return "badge badge-green"
+    return "badge badge-gray"
+
+
+# ------------------ TES ------------------
+def test_gerdq_table_covers_all_answers():
+    assert len(GERDQ.table) == 4 ** 6
+
+
+def test_gerdq_table_matches_reference():
+    mismatches = []
+    for answers in itertools.product(range(4), repeat=6):
+        expected = reference_gerdq(answers)
+        positive = expected >= 8
+        for given in (answers, [GERDQ_OPTIONS[a] for a in answers]):
+            res = score_gerdq(given)
+            if (
+                res.score != expected
+                or res.positive != positive
+                or res.badge != ("badge badge-red" if positive else "badge badge-green")
+                or f"Skor GERD-Q: {expected} " not in res.title
+                or f"Skor GERD-Q {expected} " not in res.summary
+                or ("≥8" if positive else "<8") not in res.summary
+                or not res.text
+            ):
+                mismatches.append(f"{answers}: {res} (acuan skor {expected})")
+    assert not mismatches, mismatches[:10]
+
+
+def test_apcs_table_covers_all_inputs():
+    assert len(APCS.table) == 3 * len(SEX_OPTIONS) * 2 * 2
+
+
+def test_apcs_table_matches_reference():
+    mismatches = []
+    for age, sex, fhx, smoker in itertools.product(range(121), SEX_OPTIONS, (False, True), (False, True)):
+        expected = reference_apcs(age, sex == "Laki-laki", fhx, smoker)
+        prefix, badge = reference_apcs_category(expected)
+        res = score_apcs(ApcsInput(age, sex, fhx, smoker))
+        if (
+            res.score != expected
+            or not res.kategori.startswith(prefix)
+            or res.badge != badge
+            or not res.pesan
+            or (res.kategori, res.pesan, res.badge) != apcs_category(expected)
+        ):
+            mismatches.append(f"usia {age} {sex} fhx={fhx} rokok={smoker}: {res} (acuan {expected})")
+    assert not mismatches, mismatches[:10]
+
+
+def test_verdict_table_matches_reference():
+    # Tiap kombinasi fakta checklist, di semua skor GERD-Q & APCS
+    mismatches = []
+    for organ in (ORGAN_EGD, ORGAN_COLO):
+        for flags in itertools.product((False, True), repeat=3):
+            selected = [["x"] if f else [] for f in flags]
+            for g, a in itertools.product(range(len(GERDQ.outcomes)), range(APCS.max_score + 1)):
+                res = verdict(*selected, organ, {"gerdq": g, "apcs": a})
+                if res.badge != reference_verdict(*flags) or organ not in res.text or not res.advice:
+                    mismatches.append(f"{organ} {flags} GERD-Q {g} APCS {a}: {res}")
+    assert not mismatches, mismatches[:10]
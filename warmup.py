@@ -0,0 +1,254 @@
+# warmup.py — ISI PERUT
+# Fase pemanasan server: siapkan semua yang mahal di pemakaian pertama
+# (manifest aset, kuesioner terkompilasi, varian gambar web, impor ReportLab +
+# stylesheet + kop surat dengan logo yang sudah diperkecil, satu PDF buangan
+# tiap jenis) sebelum pasien pertama datang, lalu tandai server "siap".
+#
+# Penanda siap:
+#   - berkas JSON ISI_PERUT_READY_FILE (bawaan .cache/ready.json) berisi pid
+#     proses server & waktu tiap langkah; dihapus saat proses berhenti
+#   - GET /ready di endpoint metrik (ISI_PERUT_METRICS_PORT): 200 / 503
+#
+#   python warmup.py --serve [argumen streamlit ...]
+#       jalankan `streamlit run app.py` di proses ini dengan pemanasan di
+#       thread latar; berkas siap ditulis setelah pemanasan selesai DAN server
+#       menjawab /_stcore/health
+#   python warmup.py --check    # kode 0 bila server siap (untuk health check LB)
+#   python warmup.py            # pemanasan saja (cache disk), cetak waktunya
+#
+# Dengan `streamlit run app.py` biasa TIDAK ada pemanasan: halaman pertama
+# tidak boleh berebut CPU dengan impor ReportLab & build PDF. ISI_PERUT_WARMUP=1
+# menyalakannya di latar sejak rerun pertama (app.py) bila --serve tidak bisa
+# dipakai.
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+from assets import get_manifest
+from metrics import get_registry, timed
+
+HERE = Path(__file__).resolve().parent
+READY_FILE = Path(os.environ.get("ISI_PERUT_READY_FILE", HERE / ".cache" / "ready.json"))
+ENABLED = os.environ.get("ISI_PERUT_WARMUP", "0") == "1"
+
+
+# ------------------ LANGKAH ------------------
+def _sample_kwargs() -> tuple[dict, dict]:
+    """Argumen surat terpanjang (semua gejala dicentang) untuk PDF buangan."""
+    from response_code import encode
+    from scoring import ALARM_COLO, ALARM_EGD, OTHER_COLO, RISK_COLO, ScreeningInput, screen
+
+    inp = ScreeningInput(
+        age=60,
+        sex="Laki-laki",
+        gerdq_answers=(3, 3, 0, 0, 3, 3),
+        egd_alarm=ALARM_EGD,
+        colo_alarm=ALARM_COLO,
+        colo_risk=RISK_COLO,
+        colo_other=OTHER_COLO,
+        family_history=True,
+        smoker=True,
+    )
+    res = screen(inp)
+    manifest = get_manifest()
+    logos = dict(logo_rs_path=manifest.path("logo_kariadi"), logo_isi_path=manifest.path("logo_isi"))
+    common = dict(
+        name="Pemanasan", age=inp.age, sex=inp.sex, today="1 Jan 2000", response_code=encode(inp), **logos
+    )
+    letter = dict(
+        common,
+        v_egd=res.egd.text,
+        a_egd=res.egd.advice,
+        r_egd=res.r_egd,
+        gerd_q_summary=res.gerdq.summary,
+        v_colo=res.colo.text,
+        a_colo=res.colo.advice,
+        r_colo=res.r_colo,
+    )
+    apcs = dict(common, score_apcs=res.apcs.score, kategori_apcs=res.apcs.kategori, pesan_apcs=res.apcs.pesan)
+    return letter, apcs
+
+
+def _web_images():
+    from web_images import build_all
+
+    build_all()
+
+
+def _pdf_stack():
+    # Mode antrean (pdf_queue.py): ReportLab dimuat tier worker, bukan di sini
+    import pdf_queue
+    from prefork import preload_pdf_stack
+
+    if not pdf_queue.ENABLED:
+        preload_pdf_stack()
+
+
+def _pdf_samples():
+    # Langsung ke builder (bukan pdf_cache): PDF buangan tidak perlu disimpan
+    import pdf_queue
+    from pdf_loader import HAS_RL, build_pdf_apcs, build_pdf_letterhead
+
+    if HAS_RL and not pdf_queue.ENABLED:
+        letter, apcs = _sample_kwargs()
+        build_pdf_letterhead(**letter)
+        build_pdf_apcs(**apcs)
+
+
+def _questionnaires():
+    import questionnaires
+    import rules
+
+    questionnaires.load()
+    rules.load()
+
+
+STEPS = (
+    ("manifest", get_manifest),
+    ("questionnaires", _questionnaires),
+    ("web_images", _web_images),
+    ("pdf_stack", _pdf_stack),
+    ("pdf_samples", _pdf_samples),
+)
+
+
+# ------------------ PENANDA SIAP ------------------
+def _write_ready(path: Path, steps: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({
+        "pid": os.getpid(),
+        "ready_at": datetime.now().isoformat(timespec="seconds"),
+        "steps_ms": steps,
+    }, indent=1))
+    os.replace(tmp, path)
+
+
+def _clear_ready(path: Path = READY_FILE) -> None:
+    # Hanya hapus penanda milik proses ini
+    try:
+        if json.loads(path.read_text()).get("pid") == os.getpid():
+            path.unlink()
+    except (OSError, ValueError):
+        pass
+
+
+def _wait_for_server(port: int, timeout: float = 120.0) -> bool:
+    url = f"http://127.0.0.1:{port}/_stcore/health"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=2) as resp:
+                if resp.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def warm_up(ready_file: Path | None = READY_FILE, port: int | None = None) -> dict:
+    """
+    Jalankan semua langkah pemanasan; {langkah: ms}. Bila `ready_file`
+    diberikan, berkas itu ditulis setelahnya (dan setelah server di `port`
+    menjawab, bila `port` diberikan). Langkah yang gagal dicatat lalu
+    dilewati: pemanasan tidak boleh menjatuhkan server.
+    """
+    if ready_file is not None:
+        _clear_ready(ready_file)
+    steps = {}
+    for name, fn in STEPS:
+        t0 = time.perf_counter()
+        try:
+            with timed(f"warmup_{name}"):
+                fn()
+        except Exception as exc:  # noqa: BLE001
+            print(f"[warmup] {name} gagal: {exc!r}", file=sys.stderr)
+            get_registry().incr("warmup_errors")
+        steps[name] = round((time.perf_counter() - t0) * 1000, 1)
+    if port is not None and not _wait_for_server(port):
+        print(f"[warmup] server di port {port} tidak menjawab", file=sys.stderr)
+        return steps
+    if ready_file is not None:
+        _write_ready(ready_file, steps)
+        atexit.register(_clear_ready, ready_file)
+    get_registry().ready = True
+    return steps
+
+
+_lock = threading.Lock()
+_thread: threading.Thread | None = None
+
+
+def start_background(port: int | None = None) -> threading.Thread:
+    """Pemanasan di thread daemon, sekali per proses (panggilan berikutnya no-op)."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(
+                target=warm_up, kwargs=dict(port=port), name="isi-perut-warmup", daemon=True
+            )
+            _thread.start()
+    return _thread
+
+
+def is_ready(path: Path = READY_FILE) -> bool:
+    """Berkas siap ada dan proses yang menulisnya masih hidup."""
+    try:
+        pid = json.loads(path.read_text())["pid"]
+        os.kill(pid, 0)
+    except (OSError, ValueError, KeyError):
+        return False
+    return True
+
+
+# ------------------ CLI ------------------
+def _port(streamlit_args: list[str]) -> int:
+    for i, arg in enumerate(streamlit_args):
+        if arg.startswith("--server.port="):
+            return int(arg.split("=", 1)[1])
+        if arg == "--server.port" and i + 1 < len(streamlit_args):
+            return int(streamlit_args[i + 1])
+    return 8501
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pemanasan & penanda siap server ISI PERUT")
+    ap.add_argument("--check", action="store_true", help="kode 0 bila server siap, 1 bila belum")
+    ap.add_argument(
+        "--serve",
+        nargs=argparse.REMAINDER,
+        metavar="ARG",
+        help="jalankan streamlit run app.py (+ argumen ini) dengan pemanasan",
+    )
+    args = ap.parse_args()
+
+    if args.check:
+        return 0 if is_ready() else 1
+
+    if args.serve is not None:
+        from streamlit.web import cli as stcli
+
+        # app.py mengimpor modul `warmup`, bukan __main__ ini: pakai status
+        # modul itu supaya rerun pertama tidak memulai pemanasan kedua
+        import warmup
+
+        warmup.start_background(_port(args.serve))
+        sys.argv = ["streamlit", "run", str(HERE / "app.py"), *args.serve]
+        return stcli.main()
+
+    for name, ms in warm_up(ready_file=None).items():
+        print(f"{name:14} {ms:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# web_images.py — ISI PERUT
+# Varian gambar UI yang ramah jaringan seluler.
+#
+# Logo header & ilustrasi aslinya PNG 0,2–2 MB, padahal halaman paling lebar
+# hanya 1000 px (.block-container). Modul ini membuat salinan WebP (+ JPEG,
+# atau PNG berpalet bila sumbernya transparan, sebagai cadangan) di beberapa
+# lebar.
+# Nama berkas memuat hash isi sumber, jadi varian lama otomatis tidak dipakai
+# lagi begitu gambar sumber diganti.
+#
+#   python web_images.py     # langkah build aset: buat semua varian sekarang
+#
+# Tanpa langkah build pun aman: varian yang belum ada dibuat saat pertama
+# kali diminta, lalu dipakai ulang oleh semua sesi.
+#
+# Bila static serving Streamlit aktif (.streamlit/config.toml), halaman
+# merujuk varian langsung lewat URL app/static/img/... (picture_html) sehingga
+# browser memilih sendiri varian & format yang pas dan bisa menyimpannya
+# selamanya — nama berkas berubah bila isi gambar berubah.
+
+import argparse
+import html
+import os
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from PIL import Image as PILImage
+
+from assets import get_manifest, lookup
+
+HERE = Path(__file__).resolve().parent
+STATIC_DIR = HERE / "static" / "img"
+# URL relatif STATIC_DIR saat server.enableStaticServing = true
+STATIC_URL = "app/static/img"
+
+# Lebar maksimum konten halaman (lihat .block-container di app.py)
+CONTAINER_WIDTH = 1000
+WIDTHS = (480, 768, 1000)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+# Aset (nama di manifest assets.py) yang tampil di halaman
+UI_IMAGES = (
+    "logo_header",
+    "ilustrasi_endoskopi",
+    "ilustrasi_egd",
+    "ilustrasi_kolonoskopi",
+)
+
+
+class Variant(NamedTuple):
+    path: str
+    width: int
+    height: int
+    format: str  # "webp" / "jpg" / "png"
+    bytes: int
+
+
+class Source(NamedTuple):
+    path: Path
+    digest: str
+    width: int
+    height: int
+    alpha: bool
+
+    @property
+    def widths(self) -> list[int]:
+        # Lebar di atas ukuran asli tidak dibuat (tidak ada upscaling)
+        return sorted({min(w, self.width) for w in WIDTHS})
+
+    @property
+    def fallback(self) -> str:
+        return "png" if self.alpha else "jpg"
+
+
+_lock = threading.Lock()
+_sources: dict[str, Source] = {}         # sha256 -> info sumber
+_built: dict[tuple, Variant] = {}        # (sha256, lebar, format) -> varian
+
+
+def source(src) -> Source:
+    """Info gambar sumber (hash isi, ukuran, transparansi), di-memo per hash."""
+    asset = lookup(src)
+    info = _sources.get(asset.sha256)
+    if info is None:
+        with PILImage.open(asset.path) as im:
+            alpha = "A" in im.getbands() and im.getchannel("A").getextrema()[0] < 255
+        info = _sources[asset.sha256] = Source(
+            Path(asset.path), asset.sha256, asset.width, asset.height, alpha
+        )
+    return info
+
+
+def _save(im, path: Path, fmt: str) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    if fmt == "webp":
+        # method 4: method 6 hanya ±3% lebih kecil tetapi 50x lebih lambat
+        # untuk gambar transparan
+        im.save(tmp, format="WEBP", quality=WEBP_QUALITY, method=4)
+    elif fmt == "jpg":
+        im.convert("RGB").save(tmp, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        # Palet 256 warna + dithering (ala pngquant): ±5x lebih kecil dari PNG
+        # RGBA penuh, galat rata-rata ±2/255 per kanal pada logo & ilustrasi
+        im = im.quantize(256, method=PILImage.Quantize.FASTOCTREE, dither=PILImage.Dither.FLOYDSTEINBERG)
+        im.save(tmp, format="PNG", optimize=True)
+    os.replace(tmp, path)  # sesi lain tidak pernah membaca berkas setengah jadi
+
+
+def variant(src, width: int, fmt: str) -> Variant:
+    """Satu varian (lebar dari Source.widths, format webp/jpg/png); dibuat bila belum ada."""
+    info = source(src)
+    key = (info.digest, width, fmt)
+    found = _built.get(key)
+    if found is not None:
+        return found
+    with _lock:
+        found = _built.get(key)
+        if found is None:
+            height = max(1, round(info.height * width / info.width))
+            path = STATIC_DIR / f"{info.path.stem}-{info.digest[:12]}-{width}w.{fmt}"
+            if not path.exists():
+                STATIC_DIR.mkdir(parents=True, exist_ok=True)
+                with PILImage.open(info.path) as im:
+                    im = im.convert("RGBA" if info.alpha else "RGB")
+                    if width != info.width:
+                        im = im.resize((width, height), PILImage.LANCZOS)
+                    _save(im, path, fmt)
+            found = _built[key] = Variant(str(path), width, height, fmt, path.stat().st_size)
+    return found
+
+
+def variants(src) -> list[Variant]:
+    """Semua varian web untuk gambar `src` (WebP + cadangan, tiap lebar)."""
+    info = source(src)
+    return [variant(src, w, fmt) for w in info.widths for fmt in ("webp", info.fallback)]
+
+
+def pick(src, display_width: int = CONTAINER_WIDTH, fmt: str | None = None) -> str | None:
+    """
+    Path varian terkecil dengan lebar ≥ `display_width` (atau varian terbesar
+    bila gambar aslinya lebih kecil). Hanya varian itu yang dibuat.
+
+    `fmt` None = format cadangan (JPEG, atau PNG bila transparan): st.image
+    hanya meneruskan JPEG/PNG/GIF apa adanya dan meng-encode ulang WebP.
+    None bila `src` None/tidak ada.
+    """
+    if lookup(src) is None:
+        return None
+    info = source(src)
+    width = next((w for w in info.widths if w >= display_width), info.widths[-1])
+    return variant(src, width, fmt or info.fallback).path
+
+
+def _srcset(vs: list[Variant]) -> str:
+    return ", ".join(f"{STATIC_URL}/{Path(v.path).name} {v.width}w" for v in vs)
+
+
+def picture_html(src, display_width: int = CONTAINER_WIDTH, alt: str = "", lazy: bool = False) -> str:
+    """
+    Elemen <picture> untuk static serving: WebP + cadangan JPEG/PNG di semua
+    lebar; browser memilih berdasarkan lebar layar & kepadatan piksel.
+    String kosong bila `src` None/tidak ada.
+    """
+    if lookup(src) is None:
+        return ""
+    info = source(src)
+    vs = variants(src)
+    webp = [v for v in vs if v.format == "webp"]
+    fallback = [v for v in vs if v.format == info.fallback]
+    default = next((v for v in fallback if v.width >= display_width), fallback[-1])
+    sizes = f"(max-width: {display_width}px) 100vw, {display_width}px"
+    loading = ' loading="lazy"' if lazy else ""
+    return (
+        f'<picture><source type="image/webp" srcset="{_srcset(webp)}" sizes="{sizes}">'
+        f'<img src="{STATIC_URL}/{Path(default.path).name}" srcset="{_srcset(fallback)}" '
+        f'sizes="{sizes}" width="{default.width}" height="{default.height}" '
+        f'alt="{html.escape(alt)}" decoding="async"{loading} '
+        f'style="width:100%;max-width:{display_width}px;height:auto"></picture>'
+    )
+
+
+def prune(keep: list[Variant]) -> int:
+    """Hapus varian di STATIC_DIR yang bukan milik gambar sumber saat ini."""
+    keep_paths = {Path(v.path).name for v in keep}
+    removed = 0
+    for f in STATIC_DIR.glob("*w.*"):
+        if f.name not in keep_paths:
+            f.unlink()
+            removed += 1
+    return removed
+
+
+def build_all(names=UI_IMAGES) -> list[tuple[Path, list[Variant]]]:
+    """Langkah build: buat varian untuk semua gambar UI yang ada di repo."""
+    manifest = get_manifest()
+    out = []
+    for name in names:
+        src = manifest.path(name)
+        if src:
+            out.append((Path(src), variants(src)))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bangun varian gambar web ISI PERUT")
+    ap.add_argument("--prune", action="store_true", help="hapus varian lama yang tidak dipakai")
+    args = ap.parse_args()
+
+    built = build_all()
+    for src, vs in built:
+        print(f"{src.name}: {src.stat().st_size / 1024:7.0f} KiB asli")
+        for v in vs:
+            print(f"  {Path(v.path).name:48} {v.width:5}x{v.height:<5} {v.bytes / 1024:7.0f} KiB")
+    if args.prune:
+        removed = prune([v for _, vs in built for v in vs])
+        print(f"{removed} varian lama dihapus")
+
+
+if __name__ == "__main__":
+    main()